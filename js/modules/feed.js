@@ -1,13 +1,50 @@
 import { el, icon, clear } from '../utils/dom.js';
 
 const FEED_URL = 'data/weekly-feed.json';
+const SHARD_BASE = 'data/feed/';
+const MANIFEST_URL = SHARD_BASE + 'manifest.json';
 const CONFIG_URL = 'data/config.json';
+const HISTORY_API = 'api/history/';
 
 let feedData = null;
 let configData = null;
 let currentTab = 'liturgy';
+let currentDay = null;
+let feedManifest = null;
+let patristicTexts = null;
+let historyWeeks = null;
+let newsWeek = null;
+const archivedWeeks = {};
+
+async function fetchJson(url, options) {
+  const res = await fetch(url, options);
+  if (!res.ok) throw new Error(`${url}: ${res.status}`);
+  return res.json();
+}
 
+/**
+ * The collector writes content-hashed shards listed in a manifest. Only the
+ * manifest is revalidated; shard names change with their content, so the
+ * browser cache can keep them. Falls back to the single weekly-feed.json.
+ */
 async function loadFeed() {
+  try {
+    feedManifest = await fetchJson(MANIFEST_URL, { cache: 'no-cache' });
+    const [liturgy, ...sections] = await Promise.all([
+      fetchJson(SHARD_BASE + feedManifest.liturgy),
+      ...feedManifest.sections.map(s => fetchJson(SHARD_BASE + s.file))
+    ]);
+    feedData = {
+      generated_at: feedManifest.generated_at,
+      week: feedManifest.week,
+      liturgy: liturgy.liturgy,
+      liturgy_days: liturgy.liturgy_days,
+      sections
+    };
+    return;
+  } catch {
+    feedManifest = null;
+  }
   try {
     const res = await fetch(FEED_URL + '?t=' + Date.now());
     feedData = await res.json();
@@ -16,6 +53,17 @@ async function loadFeed() {
   }
 }
 
+/** Full patristic texts are only downloaded the first time one is expanded */
+function loadPatristicText(textId) {
+  if (!patristicTexts) {
+    patristicTexts = fetchJson(SHARD_BASE + feedManifest.patristic).catch(() => {
+      patristicTexts = null;
+      return {};
+    });
+  }
+  return patristicTexts.then(texts => texts[textId]);
+}
+
 async function loadConfig() {
   try {
     const res = await fetch(CONFIG_URL + '?t=' + Date.now());
@@ -64,8 +112,9 @@ function renderTabs(container, activeTab, onSwitch) {
 
 // ── Expandable text block ──
 
-function renderExpandable(text, previewLen = 250, style = {}) {
-  if (!text || text.length <= previewLen + 50) {
+/** `loadFull`, if given, resolves the full text when `text` is only a preview */
+function renderExpandable(text, previewLen = 250, style = {}, loadFull = null) {
+  if (!text || (!loadFull && text.length <= previewLen + 50)) {
     // Short enough to show in full
     return el('div', { className: 'card-body', style }, text || '');
   }
@@ -84,7 +133,14 @@ function renderExpandable(text, previewLen = 250, style = {}) {
       fontSize: '0.8rem', cursor: 'pointer', padding: '6px 0 0', display: 'flex',
       alignItems: 'center', gap: '4px'
     },
-    onClick: () => {
+    onClick: async () => {
+      if (loadFull && !expanded) {
+        const full = await loadFull();
+        if (full) {
+          text = full;
+          loadFull = null;
+        }
+      }
       expanded = !expanded;
       textEl.textContent = expanded ? text : preview;
       toggleBtn.innerHTML = '';
@@ -100,8 +156,34 @@ function renderExpandable(text, previewLen = 250, style = {}) {
 
 // ── Liturgy Tab ──
 
+/** Multi-day feeds (collector --week / --from) carry one liturgy block per day */
+function renderDayPicker(container, days, activeDate) {
+  const picker = el('div', { style: { display: 'flex', gap: '6px', flexWrap: 'wrap', marginBottom: '16px' } });
+  for (const day of days) {
+    const label = new Date(day.date + 'T12:00:00').toLocaleDateString('es-ES', { weekday: 'short', day: 'numeric' });
+    picker.appendChild(el('button', {
+      className: 'tag',
+      style: {
+        cursor: 'pointer', color: 'var(--text-primary)',
+        border: day.date === activeDate ? '1px solid var(--accent-purple)' : '1px solid transparent'
+      },
+      onClick: () => {
+        currentDay = day.date;
+        clear(container);
+        renderLiturgyTab(container);
+      }
+    }, label));
+  }
+  container.appendChild(picker);
+}
+
 function renderLiturgyTab(container) {
-  const liturgy = feedData?.liturgy;
+  const days = feedData?.liturgy_days || [];
+  let liturgy = feedData?.liturgy;
+  if (days.length > 1) {
+    liturgy = days.find(d => d.date === currentDay) || liturgy || days[0];
+    renderDayPicker(container, days, liturgy.date);
+  }
 
   if (!liturgy || !liturgy.readings || liturgy.readings.length === 0) {
     container.appendChild(el('div', { className: 'empty-state' }, [
@@ -124,7 +206,9 @@ function renderLiturgyTab(container) {
         style: { fontSize: '0.9rem', fontWeight: '600' }
       }, formatFeedDate(liturgy.date))
     ]),
-    el('span', { className: 'badge badge-purple' }, liturgy.season || 'Tiempo Ordinario')
+    el('span', { className: 'badge badge-purple' }, liturgy.season || 'Tiempo Ordinario'),
+    // Filled from an earlier run when this run's fetches missed the deadline
+    liturgy.stale ? el('span', { className: 'badge badge-orange', style: { marginLeft: '6px' } }, 'Datos anteriores') : null
   ]);
   container.appendChild(dateHeader);
 
@@ -242,8 +326,10 @@ function renderLiturgyTab(container) {
       header.appendChild(metaRight);
       card.appendChild(header);
 
-      // Expandable text
-      card.appendChild(renderExpandable(comment.text || '', 200, { fontStyle: 'italic' }));
+      // Expandable text; long comments arrive as a preview plus a text_id
+      const loadFull = comment.text_id ? () => loadPatristicText(comment.text_id) : null;
+      card.appendChild(renderExpandable(comment.text || comment.preview || '', 200,
+        { fontStyle: 'italic' }, loadFull));
 
       container.appendChild(card);
     }
@@ -278,8 +364,48 @@ function renderLiturgyTab(container) {
 
 // ── News Tab ──
 
+/** Past weeks come from scripts/serve.py's history API; static hosting has none */
+async function loadHistoryWeeks() {
+  if (historyWeeks === null) {
+    historyWeeks = await fetchJson(HISTORY_API + 'weeks', { cache: 'no-cache' }).catch(() => []);
+  }
+  return historyWeeks;
+}
+
+function renderWeekPicker(container, picker) {
+  loadHistoryWeeks().then(weeks => {
+    const past = weeks.filter(w => w.week !== feedData?.week);
+    if (past.length === 0) return;
+    picker.style.marginBottom = '16px';
+    const choices = [{ week: null, label: 'Esta semana' }, ...past.map(w => ({ week: w.week, label: w.week }))];
+    for (const choice of choices) {
+      picker.appendChild(el('button', {
+        className: 'tag',
+        style: {
+          cursor: 'pointer', color: 'var(--text-primary)',
+          border: choice.week === newsWeek ? '1px solid var(--accent-purple)' : '1px solid transparent'
+        },
+        onClick: async () => {
+          if (choice.week && !archivedWeeks[choice.week]) {
+            archivedWeeks[choice.week] = await fetchJson(HISTORY_API + 'weeks/' + encodeURIComponent(choice.week))
+              .catch(() => null);
+          }
+          newsWeek = choice.week;
+          clear(container);
+          renderNewsTab(container);
+        }
+      }, choice.label));
+    }
+  });
+}
+
 function renderNewsTab(container) {
-  const sections = feedData?.sections;
+  const shown = newsWeek ? archivedWeeks[newsWeek] : feedData;
+  const sections = shown?.sections;
+
+  const picker = el('div', { style: { display: 'flex', gap: '6px', flexWrap: 'wrap' } });
+  container.appendChild(picker);
+  renderWeekPicker(container, picker);
 
   if (!sections || sections.length === 0) {
     container.appendChild(el('div', { className: 'empty-state' }, [
@@ -291,10 +417,10 @@ function renderNewsTab(container) {
   }
 
   // Week info
-  if (feedData?.generated_at) {
+  if (shown?.generated_at) {
     container.appendChild(el('div', {
       style: { fontSize: '0.8rem', color: 'var(--text-muted)', marginBottom: '16px' }
-    }, `Actualizado: ${formatFeedDate(feedData.generated_at)}`));
+    }, `Actualizado: ${formatFeedDate(shown.generated_at)}`));
   }
 
   for (const section of sections) {
@@ -372,6 +498,7 @@ function renderNewsTab(container) {
       // Meta: source + comments
       const meta = [];
       if (item.source) meta.push(item.source);
+      if (item.stale) meta.push('datos anteriores');
       if (item.reddit_comments) meta.push(`${item.reddit_comments} comments`);
       if (item.why_it_matters) meta.push(item.why_it_matters);
       if (meta.length) {
@@ -408,7 +535,8 @@ function renderSettingsTab(container) {
   }, 'Edita data/config.json en tu repo para cambiar estas preferencias. Los cambios se aplicaran en la proxima ejecucion del recolector.'));
 
   // Topics
-  renderConfigSection(container, 'Temas de interes', configData.topics || [], 'globe');
+  renderConfigSection(container, 'Temas de interes',
+    (configData.topics || []).map(t => typeof t === 'string' ? t : t.title || t.id), 'globe');
 
   // Subreddits
   renderConfigSection(container, 'Subreddits', (configData.subreddits || []).map(s => `r/${s}`), 'rss');
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the collector and the fathers indexer.
+
+Everything runs against local data: the collector replays HTTP fixtures
+through a stand-in server (scripts/replay.py), the indexer parses a
+generated multi-MB corpus. Each benchmark reports wall time and peak
+traced memory (tracemalloc); results can be saved as a baseline and
+later runs are compared against it. Times are taken with tracemalloc
+running, so they are only comparable with other runs of this script.
+
+Usage:
+  python3 scripts/benchmark.py                    # run all, compare with the baseline
+  python3 scripts/benchmark.py --save-baseline    # run all, store as the new baseline
+  python3 scripts/benchmark.py --only indexer,lookup --corpus-mb 16
+  python3 scripts/benchmark.py --fixtures DIR     # replay recorded fixtures instead
+
+Exits with status 1 when a result regressed by more than --threshold.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import collect_feed
+import fathers_search
+import index_fathers
+import replay
+import transport
+from fathers_store import FathersStore, JsonFathersIndex
+
+BASELINE_PATH = collect_feed.DATA_DIR / '.bench' / 'baseline.json'
+DEFAULT_THRESHOLD = 0.25
+BENCHMARKS = ('collector', 'indexer', 'lookup')
+
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.01
+MIN_PEAK_KB = 256
+
+
+def measure(fn, quiet=True):
+    """Run fn() and return (result, seconds, peak_kb)."""
+    out = io.StringIO() if quiet else sys.stdout
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(out):
+            result = fn()
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak / 1024
+
+
+@contextlib.contextmanager
+def patched(module, **attrs):
+    """Temporarily replace module globals (paths, caches) for one run."""
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+# ── Synthetic corpus ──
+
+CORPUS_BOOKS = ['Génesis', 'Éxodo', '1 Reyes', 'Salmos', 'Isaías', 'Mateo', 'Marcos',
+                'Lucas', 'Juan', 'Hechos', 'Romanos', '1 Corintios', 'Hebreos']
+CORPUS_FATHERS = ['San Agustín', 'San Juan Crisóstomo', 'Orígenes', 'San Ambrosio',
+                  'San Jerónimo', 'Beda', 'San Gregorio Magno', 'San Cirilo de Alejandría']
+CORPUS_WORDS = ('misericordia gracia fe caridad señor pueblo reino cielo palabra luz '
+                'verdad camino vida pan agua espíritu padre hijo iglesia pecado perdón '
+                'esperanza oración ley profeta templo cruz resurrección').split()
+
+
+def synth_corpus(path, target_mb, seed=1):
+    """Write a padres-style text of about `target_mb` MB, wrapped at 80 columns."""
+    rng = random.Random(seed)
+    target = target_mb * 1024 * 1024
+    written = 0
+    with open(path, 'w', encoding='utf-8') as out:
+        while written < target:
+            for book in CORPUS_BOOKS:
+                for chapter in range(1, 29):
+                    verse = 1
+                    while verse < 40 and written < target:
+                        end = verse + rng.randint(0, 4)
+                        ref = f'{verse}-{end}' if end > verse else f'{verse}'
+                        block = [f'\n{book} {chapter}:{ref}\n\n']
+                        for _ in range(rng.randint(1, 3)):
+                            words = ' '.join(rng.choice(CORPUS_WORDS)
+                                             for _ in range(rng.randint(30, 200)))
+                            para = f'{rng.choice(CORPUS_FATHERS)}: {words}.'
+                            block.extend(para[i:i + 80] + '\n' for i in range(0, len(para), 80))
+                        text = ''.join(block)
+                        out.write(text)
+                        written += len(text.encode('utf-8'))
+                        verse = end + 1
+    return path
+
+
+# ── Benchmarks ──
+
+def bench_indexer(workdir, corpus_mb, quiet=True):
+    """Corpus -> index_text -> build_lookup_index, then full and no-op store builds."""
+    corpus = synth_corpus(workdir / 'corpus.txt', corpus_mb)
+    size_mb = corpus.stat().st_size / (1024 * 1024)
+    store_path = workdir / 'fathers_index.sqlite'
+    results = {}
+
+    index, seconds, peak = measure(lambda: index_fathers.index_text(corpus), quiet)
+    results['indexer.index_text'] = {'seconds': seconds, 'peak_kb': peak,
+                                     'mb_per_s': size_mb / seconds, 'entries': len(index)}
+    lookup, seconds, peak = measure(lambda: index_fathers.build_lookup_index(index), quiet)
+    results['indexer.build_lookup_index'] = {'seconds': seconds, 'peak_kb': peak,
+                                             'chapters': len(lookup)}
+    _, seconds, peak = measure(lambda: index_fathers.build_store(corpus, store_path, full=True), quiet)
+    results['indexer.build_store'] = {'seconds': seconds, 'peak_kb': peak,
+                                      'mb_per_s': size_mb / seconds}
+    _, seconds, peak = measure(lambda: index_fathers.build_store(corpus, store_path), quiet)
+    results['indexer.build_store_unchanged'] = {'seconds': seconds, 'peak_kb': peak}
+    (_, terms, postings_bytes), seconds, peak = measure(
+        lambda: fathers_search.build_search_index(store_path), quiet)
+    results['indexer.build_search_index'] = {'seconds': seconds, 'peak_kb': peak,
+                                             'terms': terms, 'postings_kb': postings_bytes / 1024}
+
+    json_path = workdir / 'fathers_index.json'
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(lookup, f, ensure_ascii=False)
+    return results, store_path, json_path
+
+
+SEARCH_QUERIES = ('misericordia', 'Agustín', 'gracia fe', '"reino de los cielos"', 'pan vida agua')
+
+
+def bench_lookup(store_path, json_path, rounds=200, quiet=True):
+    """lookup_fathers latency on the SQLite store and on the JSON index, and search latency."""
+    references = [ref for day in replay.SYNTH_READINGS for ref in day]
+    results = {}
+
+    def run(index):
+        latencies = []
+        for i in range(rounds):
+            ref = references[i % len(references)]
+            started = time.perf_counter()
+            collect_feed.lookup_fathers(index, ref)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def load_json():
+        with open(json_path, encoding='utf-8') as f:
+            return JsonFathersIndex(json.load(f))
+
+    for name, opener in (('store', lambda: FathersStore(store_path)), ('json', load_json)):
+        index, load_seconds, load_peak = measure(opener, quiet)
+        latencies, seconds, peak = measure(lambda: run(index), quiet)
+        latencies.sort()
+        results[f'lookup.{name}'] = {
+            'seconds': seconds,
+            'peak_kb': peak,
+            'load_seconds': load_seconds,
+            'load_peak_kb': load_peak,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        }
+
+    def run_search(search):
+        latencies = []
+        for i in range(rounds // 4):
+            started = time.perf_counter()
+            search.search(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    search, load_seconds, load_peak = measure(lambda: fathers_search.FathersSearch(store_path), quiet)
+    latencies, seconds, peak = measure(lambda: run_search(search), quiet)
+    latencies.sort()
+    results['lookup.search'] = {
+        'seconds': seconds,
+        'peak_kb': peak,
+        'load_seconds': load_seconds,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+    return results
+
+
+def bench_collector(workdir, store_path, fixtures_dir=None, days=7, quiet=True):
+    """collect_feed.main() end to end against replayed fixtures, per stage."""
+    first = datetime(2026, 2, 9)
+    dates = [(first + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days)]
+    if fixtures_dir is None:
+        config = collect_feed.load_config()
+        feeds = [url for url, _kind in collect_feed.feed_sources(config)]
+        fixtures = replay.synthetic_fixtures(workdir / 'fixtures', dates,
+                                             config.get('subreddits', []), feeds=feeds)
+    else:
+        fixtures = replay.FixtureSet(fixtures_dir)
+
+    out_dir = workdir / 'collector'
+    with patched(collect_feed,
+                 OUTPUT_PATH=out_dir / 'weekly-feed.json',
+                 SHARD_DIR=out_dir / 'feed',
+                 METRICS_PATH=out_dir / 'run-metrics.json',
+                 HISTORY_PATH=out_dir / 'history.sqlite',
+                 CHECKPOINT_DIR=out_dir / '.checkpoints',
+                 FATHERS_STORE_PATH=Path(store_path),
+                 FATHERS_INDEX_PATH=out_dir / 'missing.json',
+                 READING_STORE_PATH=out_dir / 'readings.sqlite',
+                 HTTP_CACHE=transport.HttpCache(out_dir / 'http', enabled=False),
+                 RATE_LIMITER=transport.RateLimiter(hosts=dict(collect_feed.RATE_LIMITER.hosts)),
+                 _fathers_index=None,
+                 _reading_store=None):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with replay.replaying(fixtures) as server:
+            # Collect the same dates the fixtures were recorded for
+            argv = ['--no-cache', *fixtures.collector_args]
+            stages, seconds, peak = measure(lambda: collect_feed.main(argv), quiet)
+
+    results = {'collector.main': {
+        'seconds': seconds,
+        'peak_kb': peak,
+        'requests': server.stats.get('requests', 0),
+        'throttled': server.stats.get('throttled', 0),
+        'bytes': server.stats.get('bytes', 0),
+    }}
+    # Per-stage wall times, summed over dates (readings-*, usccb-*, fathers-*)
+    for name, res in stages.items():
+        kind = name.split('-')[0]
+        entry = results.setdefault(f'collector.stage.{kind}', {'seconds': 0.0, 'runs': 0, 'failed': 0})
+        entry['seconds'] += res.elapsed
+        entry['runs'] += 1
+        entry['failed'] += 0 if res.succeeded else 1
+    return results
+
+
+# ── Baseline ──
+
+def compare(results, baseline, threshold):
+    """Return [(name, metric, old, new)] for results that got worse."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, floor in (('seconds', MIN_SECONDS), ('peak_kb', MIN_PEAK_KB)):
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"\n{'benchmark':<34} {'seconds':>9} {'peak KB':>10} {'vs base':>8}  details")
+    for name, r in results.items():
+        old = (baseline.get(name) or {}).get('seconds')
+        delta = f"{(r['seconds'] / old - 1) * 100:+.0f}%" if old else ''
+        extra = ', '.join(f'{k}={v:.2f}' if isinstance(v, float) else f'{k}={v}'
+                          for k, v in r.items() if k not in ('seconds', 'peak_kb'))
+        print(f"  {name:<32} {r['seconds']:>9.3f} {r.get('peak_kb', 0):>10.0f} {delta:>8}  {extra}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Offline collector / indexer benchmarks')
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help=f"Comma-separated subset of {', '.join(BENCHMARKS)}")
+    parser.add_argument('--corpus-mb', type=float, default=8, help='Synthetic corpus size')
+    parser.add_argument('--fixtures', help='Recorded fixture directory (default: synthetic)')
+    parser.add_argument('--days', type=int, default=7, help='Days collected with synthetic fixtures')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown before a result counts as a regression')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help="Show the scripts' own output")
+    args = parser.parse_args(argv)
+    args.only = [b.strip() for b in args.only.split(',') if b.strip()]
+    unknown = set(args.only) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    quiet = not args.verbose
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='bench-') as tmp:
+        workdir = Path(tmp)
+        # The lookup and collector benchmarks need a store, so the indexer always runs
+        print(f"Indexing a {args.corpus_mb:g} MB synthetic corpus...")
+        indexer, store_path, json_path = bench_indexer(workdir, args.corpus_mb, quiet)
+        if 'indexer' in args.only:
+            results.update(indexer)
+        if 'lookup' in args.only:
+            print("Timing fathers lookups...")
+            results.update(bench_lookup(store_path, json_path, quiet=quiet))
+        if 'collector' in args.only:
+            print("Running the collector against replayed fixtures...")
+            results.update(bench_collector(workdir, store_path, args.fixtures, args.days, quiet))
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists():
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+    print_results(results, baseline)
+
+    record = {'saved_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0],
+              'corpus_mb': args.corpus_mb, 'results': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+
+    if not baseline:
+        print(f"\nNo baseline at {baseline_path} (run with --save-baseline)")
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"\nNo regressions beyond {args.threshold:.0%} of the baseline")
+        return 0
+    print(f"\nRegressions beyond {args.threshold:.0%}:")
+    for name, metric, old, new in regressions:
+        print(f"  {name} {metric}: {old:.3f} -> {new:.3f}")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,26 +7,88 @@ Outputs data/weekly-feed.json for the dashboard.
 Usage:
   python3 scripts/collect_feed.py              # Today's readings + Reddit
   python3 scripts/collect_feed.py 2026-02-11   # Specific date
+  python3 scripts/collect_feed.py --week       # Every day of this week
+  python3 scripts/collect_feed.py --from 2026-02-09 --to 2026-02-15
+  python3 scripts/collect_feed.py --resume     # Re-run only failed/stale stages
+  python3 scripts/collect_feed.py --deadline 60s   # Stop fetching after ~60s, filling gaps from earlier runs
 
 No AI tokens needed for this script. AI ranking is optional (separate step).
+Exits with status 1 when a stage failed with no earlier result to fall
+back on.
 """
 
+import argparse
+import codecs
+import heapq
 import json
 import re
-import sys
+import threading
 import time
-import urllib.request
 import urllib.error
-from datetime import datetime, timedelta
+import urllib.parse
+from datetime import datetime, timedelta, timezone
 from html.parser import HTMLParser
 from pathlib import Path
 
+import metrics
+import transport
+import verse_ids
+from fathers_store import FathersStore, JsonFathersIndex
+from feed_shards import shards_size, write_compressed, write_feed_shards
+from history_store import HistoryStore
+from pipeline import Stage, StageFailed, run_stages
+from reading_store import ReadingStore
+from syndication import FeedParser
+from topics import TopicClassifier
+
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_DIR = SCRIPT_DIR.parent
 DATA_DIR = PROJECT_DIR / 'data'
 CONFIG_PATH = DATA_DIR / 'config.json'
 FATHERS_INDEX_PATH = DATA_DIR / 'fathers_index.json'
+FATHERS_STORE_PATH = DATA_DIR / 'fathers_index.sqlite'
+READING_STORE_PATH = DATA_DIR / 'readings.sqlite'
 OUTPUT_PATH = DATA_DIR / 'weekly-feed.json'
+SHARD_DIR = DATA_DIR / 'feed'
+HISTORY_PATH = DATA_DIR / 'history.sqlite'
+METRICS_PATH = DATA_DIR / 'run-metrics.json'
+PROFILE_DIR = DATA_DIR / '.profiles'
+CHECKPOINT_DIR = DATA_DIR / '.checkpoints'
+CHECKPOINT_MAX_AGE_HOURS = 12
+# Patristic comments shown per reading, best verse overlap first
+FATHERS_PER_READING = 3
+STAGE_WORKERS = 8
+
+REDDIT_USER_AGENT = 'linux:life-dashboard:v1.0 (personal feed aggregator by /u/nachohb)'
+REDDIT_WORKERS = 4
+REDDIT_LIMIT = 5
+
+FEED_WORKERS = 8
+FEED_ITEM_LIMIT = 10
+FEED_MAX_AGE_DAYS = 7
+
+# Share of a --deadline kept for assembling and writing the output
+DEADLINE_RESERVE = 0.1
+# Archived weeks searched for a day's liturgy when this run has none
+LITURGY_LOOKBACK_WEEKS = 8
+
+# Unauthenticated Reddit starts at ~1 request every 2s with a small burst;
+# x-ratelimit-* headers then take over.
+RATE_LIMITER = transport.RateLimiter(hosts={
+    'www.reddit.com': (0.5, 4),
+})
+
+# Shared on-disk HTTP cache. Reading pages for a given date never change,
+# so they can be served from disk for days; Reddit's weekly top moves.
+# Overridable via the "http_cache" key in config.json.
+HTTP_CACHE_DIR = DATA_DIR / '.cache' / 'http'
+HTTP_CACHE = transport.HttpCache(HTTP_CACHE_DIR, max_bytes=50 * 1024 * 1024)
+CACHE_TTL = {
+    'readings': 7 * 24 * 3600,
+    'usccb': 7 * 24 * 3600,
+    'reddit': 3600,
+    'feeds': 3600,
+}
 
 # ── Config ──
 
@@ -41,18 +103,31 @@ def load_config():
     }
 
 
+def configure_http_cache(config, enabled=True):
+    """Apply config.json's optional "http_cache" settings to HTTP_CACHE."""
+    cache_cfg = config.get('http_cache', {})
+    HTTP_CACHE.enabled = enabled and cache_cfg.get('enabled', True)
+    if 'max_mb' in cache_cfg:
+        HTTP_CACHE.max_bytes = int(cache_cfg['max_mb'] * 1024 * 1024)
+    for kind, hours in cache_cfg.get('ttl_hours', {}).items():
+        if kind in CACHE_TTL:
+            CACHE_TTL[kind] = hours * 3600
+
+
 # ── Liturgical Readings ──
 
+def readings_url(date_str):
+    year = date_str[:4]
+    month_day = date_str[5:]  # MM-DD
+    return f'https://cpbjr.github.io/catholic-readings-api/readings/{year}/{month_day}.json'
+
+
 def fetch_readings(date_str):
     """Fetch reading references from cpbjr Catholic Readings API."""
     try:
-        year = date_str[:4]
-        month_day = date_str[5:]  # MM-DD
-        url = f'https://cpbjr.github.io/catholic-readings-api/readings/{year}/{month_day}.json'
-        req = urllib.request.Request(url, headers={'User-Agent': 'DashboardCollector/1.0'})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read().decode())
-        return data
+        resp = transport.get(readings_url(date_str), limiter=RATE_LIMITER,
+                             cache=HTTP_CACHE, ttl=CACHE_TTL['readings'])
+        return json.loads(resp.text())
     except Exception as e:
         print(f"  Warning: Could not fetch readings for {date_str}: {e}")
         return None
@@ -96,8 +171,16 @@ def build_readings_list(api_data):
 
 # ── USCCB Reading Text Scraper ──
 
+READING_SECTIONS = ('Reading 1', 'Reading 2', 'Responsorial Psalm', 'Gospel', 'Alleluia')
+
+
 class USCCBParser(HTMLParser):
-    """Simple parser to extract reading text sections from USCCB page."""
+    """
+    Simple parser to extract reading text sections from USCCB page.
+
+    Meant to be fed incrementally: `done` turns True once the Gospel
+    section has closed, after which the rest of the page is irrelevant.
+    """
     def __init__(self):
         super().__init__()
         self.sections = {}
@@ -108,14 +191,30 @@ class USCCBParser(HTMLParser):
         self._heading_buf = []
         self.in_script = False
         self.in_footer = False
+        self.done = False
+
+    def feed(self, data):
+        if not self.done:
+            super().feed(data)
+
+    def _close_section(self):
+        if self.current_section and self.current_text:
+            self.sections[self.current_section] = ''.join(self.current_text).strip()
+        if self.current_section == 'Gospel':
+            self.done = True
 
     def handle_starttag(self, tag, attrs):
-        attrs_dict = dict(attrs)
+        if self.done:
+            return
         # Stop parsing on script/style/footer regions
         if tag in ('script', 'style', 'noscript'):
             self.in_script = True
             return
-        if tag == 'footer' or (tag == 'div' and 'footer' in attrs_dict.get('class', '')):
+        if tag == 'footer' or (tag == 'div' and any(
+                name == 'class' and value and 'footer' in value for name, value in attrs)):
+            self._close_section()
+            self.current_section = None
+            self.in_content = False
             self.in_footer = True
             return
         if self.in_script or self.in_footer:
@@ -127,6 +226,8 @@ class USCCBParser(HTMLParser):
             self.current_text.append('\n')
 
     def handle_endtag(self, tag):
+        if self.done:
+            return
         if tag in ('script', 'style', 'noscript'):
             self.in_script = False
             return
@@ -135,12 +236,13 @@ class USCCBParser(HTMLParser):
         if tag in ('h3', 'h4') and self.in_heading:
             self.in_heading = False
             heading = ''.join(self._heading_buf).strip()
-            # Save previous section
-            if self.current_section and self.current_text:
-                self.sections[self.current_section] = ''.join(self.current_text).strip()
+            # Save previous section; anything after the Gospel is page chrome
+            self._close_section()
+            if self.done:
+                return
             # Start new section if it's a reading heading
             matched = False
-            for key in ['Reading 1', 'Reading 2', 'Responsorial Psalm', 'Gospel', 'Alleluia']:
+            for key in READING_SECTIONS:
                 if key.lower() in heading.lower():
                     self.current_section = key
                     self.current_text = []
@@ -149,14 +251,13 @@ class USCCBParser(HTMLParser):
                     break
             # Stop collecting on unrelated headings
             if not matched and self.current_section:
-                self.sections[self.current_section] = ''.join(self.current_text).strip()
                 self.current_section = None
                 self.in_content = False
         if tag == 'p' and self.in_content:
             self.current_text.append('\n')
 
     def handle_data(self, data):
-        if self.in_script or self.in_footer:
+        if self.done or self.in_script or self.in_footer:
             return
         if self.in_heading:
             self._heading_buf.append(data)
@@ -183,14 +284,18 @@ def _clean_reading_text(text):
 def fetch_reading_texts(usccb_url):
     """Scrape actual reading texts from the USCCB daily readings page."""
     try:
-        req = urllib.request.Request(usccb_url, headers={
-            'User-Agent': 'Mozilla/5.0 (compatible; LifeDashboard/1.0)'
-        })
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            html = resp.read().decode('utf-8', errors='replace')
-
         parser = USCCBParser()
-        parser.feed(html)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        def feed(chunk):
+            parser.feed(decoder.decode(chunk))
+            return parser.done
+
+        # Stop downloading as soon as the Gospel has been read
+        transport.get(usccb_url, headers={
+            'User-Agent': 'Mozilla/5.0 (compatible; LifeDashboard/1.0)'
+        }, limiter=RATE_LIMITER, cache=HTTP_CACHE, ttl=CACHE_TTL['usccb'],
+            on_chunk=feed)
         sections = parser.get_results()
 
         # Clean up text
@@ -205,358 +310,799 @@ def fetch_reading_texts(usccb_url):
         return {}
 
 
-def attach_reading_texts(readings, usccb_texts):
-    """Match USCCB scraped sections to our reading objects."""
-    type_to_usccb = {
-        'first_reading': 'Reading 1',
-        'psalm': 'Responsorial Psalm',
-        'second_reading': 'Reading 2',
-        'gospel': 'Gospel',
-    }
+# USCCB page section holding each reading type
+USCCB_SECTIONS = {
+    'first_reading': 'Reading 1',
+    'psalm': 'Responsorial Psalm',
+    'second_reading': 'Reading 2',
+    'gospel': 'Gospel',
+}
+
+_reading_store = None
+_reading_store_lock = threading.Lock()
+
+
+def get_reading_store():
+    """Open the reading text store once per process."""
+    global _reading_store
+    with _reading_store_lock:
+        if _reading_store is None:
+            _reading_store = ReadingStore(READING_STORE_PATH)
+        return _reading_store
+
+
+def store_reading_texts(readings, usccb_texts, store, source='', date=None):
+    """Keep each of a day's scraped texts in the reading store. Returns how many were stored."""
+    stored = 0
+    for reading in readings:
+        text = usccb_texts.get(USCCB_SECTIONS.get(reading['type'], ''))
+        if text and store.put(reading['reference'], reading['type'], text, source, date):
+            stored += 1
+    return stored
+
+
+def attach_reading_texts(readings, usccb_texts, store=None, date=None):
+    """Give each of a day's readings its text: from the reading store first, else the USCCB scrape."""
     for reading in readings:
-        usccb_key = type_to_usccb.get(reading['type'], '')
-        if usccb_key and usccb_key in usccb_texts:
-            reading['text'] = usccb_texts[usccb_key]
+        text = (store.get(reading['reference'], reading['type'], date)
+                if store is not None else None)
+        if not text:
+            text = usccb_texts.get(USCCB_SECTIONS.get(reading['type'], ''))
+        if text:
+            reading['text'] = text
 
 
 # ── Patristic Comments Lookup ──
 
-def load_fathers_index():
-    """Load the pre-built patristic index."""
-    if not FATHERS_INDEX_PATH.exists():
-        print("  Warning: fathers_index.json not found. Run index_fathers.py first.")
-        return {}
-    print(f"  Loading fathers index ({FATHERS_INDEX_PATH.stat().st_size / 1024 / 1024:.1f} MB)...")
-    with open(FATHERS_INDEX_PATH) as f:
-        return json.load(f)
+_fathers_index = None
+_fathers_index_lock = threading.Lock()
 
 
-def parse_reference(ref_str):
-    """
-    Parse a reference like '1 Kings 10:1-10' or 'Mark 7:14-23'
-    Returns (book, chapter, start_verse, end_verse) or None.
-    """
-    # Handle references like "Psalm 37:5-6, 30-31, 39-40" - just take first range
-    ref_str = ref_str.split(',')[0].strip()
+def get_fathers_index():
+    """Load the fathers index once per process, however many days are collected."""
+    global _fathers_index
+    with _fathers_index_lock:
+        if _fathers_index is None:
+            _fathers_index = load_fathers_index()
+        return _fathers_index
+
 
-    m = re.match(r'(\d?\s*\w[\w\s]*?)\s+(\d+):(\d+)(?:\s*[-–]\s*(\d+))?', ref_str)
-    if m:
-        book = m.group(1).strip()
-        chapter = m.group(2)
-        start = int(m.group(3))
-        end = int(m.group(4)) if m.group(4) else start
-        return book, chapter, start, end
-    return None
+def load_fathers_index():
+    """Open the patristic store, falling back to the pre-built JSON index."""
+    started = time.perf_counter()
+    if FATHERS_STORE_PATH.exists():
+        path = FATHERS_STORE_PATH
+        print(f"  Opening fathers store ({path.stat().st_size / 1024 / 1024:.1f} MB)...")
+        index = FathersStore(path)
+    elif FATHERS_INDEX_PATH.exists():
+        path = FATHERS_INDEX_PATH
+        print(f"  Loading fathers index ({path.stat().st_size / 1024 / 1024:.1f} MB)...")
+        with open(path) as f:
+            index = JsonFathersIndex(json.load(f))
+    else:
+        print("  Warning: fathers_index.json not found. Run index_fathers.py first.")
+        return None
+    metrics.set_value('fathers_index', {
+        'path': path.name,
+        'bytes': path.stat().st_size,
+        'load_seconds': round(time.perf_counter() - started, 4),
+    }, stage=metrics.RUN_SCOPE)
+    return index
 
 
-def lookup_fathers(fathers_index, reference):
+def lookup_fathers(fathers_index, reference, limit=FATHERS_PER_READING):
     """
     Look up patristic comments for a Bible reference.
-    Returns a list of comment dicts.
+    Returns a list of comment dicts, best verse overlap first.
     """
-    parsed = parse_reference(reference)
-    if not parsed:
+    ranges = verse_ids.merge(verse_ids.parse(reference))
+    if not ranges:
         return []
 
-    book, chapter, start_verse, end_verse = parsed
-    chapter_key = f"{book} {chapter}"
-
-    entries = fathers_index.get(chapter_key, [])
-    if not entries:
-        return []
+    # Lectionary references stay within one book
+    book = verse_ids.book_of(ranges[0][0])
+    ranges = [r for r in ranges if verse_ids.book_of(r[0]) == book]
 
     comments = []
-    for entry in entries:
-        # Check if this entry overlaps with our verse range
-        entry_ref = entry.get('ref', '')
-        entry_parsed = parse_reference(entry_ref)
-        if not entry_parsed:
-            continue
+    for overlap_score, entry in fathers_index.intervals(book).overlapping(ranges)[:limit]:
+        comments.append({
+            'reading_ref': reference,
+            'father': entry['father'],
+            'text': fathers_index.text(entry),  # Full text for expand/collapse view
+            'verse_ref': entry.get('ref', ''),
+            'overlap_score': round(overlap_score, 3),
+        })
 
-        _, _, e_start, e_end = entry_parsed
-
-        # Check overlap
-        if e_start <= end_verse and e_end >= start_verse:
-            text = entry.get('text', '')
-            # Extract the author from the text (usually "AuthorName: ..." pattern)
-            father = 'Padre de la Iglesia'
-            author_match = re.match(r'^(.+?(?:Agustín|Crisóstomo|Orígenes|Ambrosio|Jerónimo|Gregorio|Basilio|Cirilo|Efrén|Tertuliano|Atanasio|Ireneo|Clemente|Augustine|Chrysostom|Origen|Ambrose|Jerome|Gregory|Basil|Cyril|Ephrem|Tertullian|Athanasius|Irenaeus|Clement)[\w\s]*?)[:.]', text[:200])
-            if author_match:
-                father = author_match.group(1).strip()
-            else:
-                # Try simpler pattern: first sentence as title
-                first_line = text.split('\n')[0][:100] if text else ''
-                if first_line:
-                    father = first_line
-
-            comments.append({
-                'reading_ref': reference,
-                'father': father[:100],
-                'text': text[:2000],  # Full text for expand/collapse view
-                'verse_ref': entry_ref,
-            })
-
-    # Return max 3 most relevant comments
-    return comments[:3]
+    return comments
 
 
 # ── Reddit ──
 
-def fetch_subreddit(subreddit, limit=10, retries=2):
+def subreddit_url(subreddit, limit=10):
+    return f'https://www.reddit.com/r/{subreddit}/top.json?t=week&limit={limit}&raw_json=1'
+
+
+def fetch_subreddit(subreddit, limit=10, retries=transport.DEFAULT_RETRIES):
     """Fetch top posts from a subreddit (last week) with retry logic."""
-    url = f'https://www.reddit.com/r/{subreddit}/top.json?t=week&limit={limit}&raw_json=1'
+    url = subreddit_url(subreddit, limit)
     headers = {
-        'User-Agent': 'linux:life-dashboard:v1.0 (personal feed aggregator by /u/nachohb)',
+        'User-Agent': REDDIT_USER_AGENT,
         'Accept': 'application/json',
     }
 
-    for attempt in range(retries + 1):
+    try:
+        resp = transport.get(url, headers=headers, retries=retries,
+                             limiter=RATE_LIMITER, cache=HTTP_CACHE, ttl=CACHE_TTL['reddit'])
+        data = json.loads(resp.text())
+    except urllib.error.HTTPError as e:
+        print(f"  Warning: HTTP {e.code} fetching r/{subreddit}: {e}")
+        return []
+    except Exception as e:
+        print(f"  Warning: Could not fetch r/{subreddit}: {e}")
+        return []
+
+    posts = []
+    for child in data.get('data', {}).get('children', []):
+        d = child.get('data', {})
+        # Get best thumbnail: prefer preview images, fall back to thumbnail
+        thumb = ''
         try:
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=20) as resp:
-                if resp.status == 429:
-                    wait = 5 * (attempt + 1)
-                    print(f"  Rate limited on r/{subreddit}, waiting {wait}s...")
-                    time.sleep(wait)
-                    continue
-                data = json.loads(resp.read().decode())
-
-            posts = []
-            for child in data.get('data', {}).get('children', []):
-                d = child.get('data', {})
-                # Get best thumbnail: prefer preview images, fall back to thumbnail
-                thumb = ''
-                try:
-                    previews = d.get('preview', {}).get('images', [])
-                    if previews:
-                        # Get a medium resolution preview (~320px wide)
-                        resolutions = previews[0].get('resolutions', [])
-                        for res in resolutions:
-                            if res.get('width', 0) >= 320:
-                                thumb = res.get('url', '')
-                                break
-                        if not thumb and resolutions:
-                            thumb = resolutions[-1].get('url', '')
-                        if not thumb:
-                            thumb = previews[0].get('source', {}).get('url', '')
-                except Exception:
-                    pass
+            previews = d.get('preview', {}).get('images', [])
+            if previews:
+                # Get a medium resolution preview (~320px wide)
+                resolutions = previews[0].get('resolutions', [])
+                for res in resolutions:
+                    if res.get('width', 0) >= 320:
+                        thumb = res.get('url', '')
+                        break
+                if not thumb and resolutions:
+                    thumb = resolutions[-1].get('url', '')
                 if not thumb:
-                    t = d.get('thumbnail', '')
-                    if t and t.startswith('http'):
-                        thumb = t
-
-                posts.append({
-                    'title': d.get('title', ''),
-                    'url': f"https://reddit.com{d.get('permalink', '')}",
-                    'source': f"r/{subreddit}",
-                    'score': d.get('score', 0),
-                    'num_comments': d.get('num_comments', 0),
-                    'created_utc': d.get('created_utc', 0),
-                    'selftext': (d.get('selftext', '') or '')[:200],
-                    'thumbnail': thumb,
-                })
-            return posts
-        except urllib.error.HTTPError as e:
-            if e.code == 429 and attempt < retries:
-                wait = 5 * (attempt + 1)
-                print(f"  Rate limited on r/{subreddit} (429), waiting {wait}s...")
-                time.sleep(wait)
-                continue
-            print(f"  Warning: HTTP {e.code} fetching r/{subreddit}: {e}")
-            return []
-        except Exception as e:
-            if attempt < retries:
-                time.sleep(2)
-                continue
-            print(f"  Warning: Could not fetch r/{subreddit}: {e}")
-            return []
-    return []
-
-
-def categorize_posts(all_posts, config):
-    """Group posts into sections based on subreddit and topic."""
-    sections = {}
-
-    # Define section mappings
-    catholic_subs = {'Catholicism', 'Catholic', 'TraditionalCatholics'}
-    ai_subs = {'ChatGPT', 'OpenAI', 'Artificial', 'ArtificialInteligence',
-               'ChatGPTPro', 'AGI', 'AIPromptProgramming', 'MachineLearning',
-               'LocalLLaMA', 'ClaudeAI'}
-
-    for post in all_posts:
-        sub = post['source'].replace('r/', '')
-
-        if sub in catholic_subs:
-            section_id = 'catholic'
-            section_title = 'Iglesia Catolica'
-        elif sub in ai_subs:
-            section_id = 'ai'
-            section_title = 'Inteligencia Artificial'
+                    thumb = previews[0].get('source', {}).get('url', '')
+        except Exception:
+            pass
+        if not thumb:
+            t = d.get('thumbnail', '')
+            if t and t.startswith('http'):
+                thumb = t
+
+        posts.append({
+            'title': d.get('title', ''),
+            'url': f"https://reddit.com{d.get('permalink', '')}",
+            'source': f"r/{subreddit}",
+            'kind': 'reddit',
+            'score': d.get('score', 0),
+            'num_comments': d.get('num_comments', 0),
+            'created_utc': d.get('created_utc', 0),
+            'selftext': (d.get('selftext', '') or '')[:200],
+            'thumbnail': thumb,
+        })
+    return posts
+
+
+def fetch_subreddits(subreddits, limit=10, max_workers=REDDIT_WORKERS):
+    """Fetch several subreddits in parallel. Returns [(subreddit, posts)] in input order."""
+    results = transport.map_concurrent(
+        lambda sub: fetch_subreddit(sub, limit=limit), subreddits, max_workers=max_workers,
+        skipped=[]
+    )
+    return list(zip(subreddits, results))
+
+
+# Sections for posts that match no topic, by kind
+KIND_SECTIONS = {
+    'rss': ('feeds', 'Blogs y noticias'),
+    'substack': ('substack', 'Substack'),
+    'reddit': ('other', 'Otros temas'),
+}
+
+
+def post_signal(post):
+    """Raw ranking signal: Reddit score plus comments counted double."""
+    return post.get('score', 0) + post.get('num_comments', 0) * 2
+
+
+def categorize_posts(all_posts, config, classifier=None):
+    """
+    Group posts into sections: one per config topic they match, else one
+    per kind. Each section keeps only its max_items_per_section best
+    posts in a bounded min-heap; ties keep the earlier post.
+    """
+    classifier = classifier or TopicClassifier.from_config(config)
+    max_items = config.get('max_items_per_section', 10)
+    titles = {}
+    for section_id, title in [(t['id'], t['title']) for t in classifier.topics] + list(KIND_SECTIONS.values()):
+        titles.setdefault(section_id, title)
+    heaps = {section_id: [] for section_id in titles}
+
+    for seq, post in enumerate(all_posts):
+        index = classifier.classify(post['title'], post.get('selftext', ''), post['source'])
+        if index is not None:
+            section_id = classifier.topics[index]['id']
         else:
-            section_id = 'other'
-            section_title = 'Otros temas'
-
-        if section_id not in sections:
-            sections[section_id] = {
-                'id': section_id,
-                'title': section_title,
-                'items': []
-            }
-
-        sections[section_id]['items'].append({
-            'title': post['title'],
-            'url': post['url'],
-            'source': post['source'],
-            'reddit_score': post['score'],
-            'reddit_comments': post['num_comments'],
-            'score': 0,  # Will be normalized later
-            'summary': post['selftext'][:150] if post['selftext'] else '',
-            'why_it_matters': '',
-            'thumbnail': post.get('thumbnail', ''),
+            section_id = KIND_SECTIONS.get(post.get('kind', 'reddit'), KIND_SECTIONS['reddit'])[0]
+        entry = (post_signal(post), -seq, post)
+        heap = heaps[section_id]
+        if len(heap) < max_items:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+
+    sections = []
+    for section_id, title in titles.items():
+        ranked = sorted(heaps[section_id], key=lambda e: e[:2], reverse=True)
+        if not ranked:
+            continue
+        # Normalize scores to 0-100 within the section
+        max_raw = max(ranked[0][0], 1)
+        sections.append({
+            'id': section_id,
+            'title': title,
+            'items': [{
+                'title': post['title'],
+                'url': post['url'],
+                'source': post['source'],
+                'reddit_score': post['score'],
+                'reddit_comments': post['num_comments'],
+                'score': max(1, int((raw / max_raw) * 100)),
+                'summary': post['selftext'][:150] if post['selftext'] else '',
+                'why_it_matters': '',
+                'thumbnail': post.get('thumbnail', ''),
+                **({'stale': True} if post.get('stale') else {}),
+            } for raw, _seq, post in ranked],
         })
+    return sections
 
-    # Sort items in each section by combined Reddit score + comments
-    for section in sections.values():
-        section['items'].sort(
-            key=lambda x: x.get('reddit_score', 0) + x.get('reddit_comments', 0) * 2,
-            reverse=True
-        )
-        max_items = config.get('max_items_per_section', 10)
-        section['items'] = section['items'][:max_items]
-
-    # Normalize scores to 0-100 within each section
-    for section in sections.values():
-        if not section['items']:
+
+# ── RSS / Atom Feeds ──
+
+def feed_sources(config):
+    """(url, kind) for every configured RSS/Atom feed and Substack."""
+    sources = [(url, 'rss') for url in config.get('rss_feeds', []) if url]
+    for name in config.get('substacks', []):
+        if not name:
             continue
-        # Use combined reddit_score + comments*2 as the raw signal
-        raw_scores = [
-            item.get('reddit_score', 0) + item.get('reddit_comments', 0) * 2
-            for item in section['items']
-        ]
-        max_raw = max(raw_scores) if raw_scores else 1
-        max_raw = max(max_raw, 1)  # Avoid division by zero
-        for item, raw in zip(section['items'], raw_scores):
-            item['score'] = max(1, int((raw / max_raw) * 100))
+        if name.startswith('http'):
+            url = name.rstrip('/')
+            url = url if url.endswith('/feed') else url + '/feed'
+        elif '.' in name:
+            url = f'https://{name.strip("/")}/feed'  # custom domain
+        else:
+            url = f'https://{name}.substack.com/feed'
+        sources.append((url, 'substack'))
+    return sources
 
-    return list(sections.values())
 
+def fetch_feed(url, kind, limit=FEED_ITEM_LIMIT, max_age_days=FEED_MAX_AGE_DAYS):
+    """
+    Fetch one feed, parsing it as it downloads and hanging up once
+    `limit` items from the last `max_age_days` days have been read.
+    Revalidated with ETag / Last-Modified through the HTTP cache.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    parser = FeedParser(limit=limit, since=since)
+    try:
+        transport.get(url, headers={'Accept': 'application/rss+xml, application/atom+xml, */*'},
+                      limiter=RATE_LIMITER, cache=HTTP_CACHE, ttl=CACHE_TTL['feeds'],
+                      on_chunk=parser.feed)
+    except Exception as e:
+        print(f"  Warning: Could not fetch feed {url}: {e}")
+        return []
+    items = parser.close()
+    if parser.error and not items:
+        print(f"  Warning: Could not parse feed {url}: {parser.error}")
+        return []
 
-# ── Main ──
+    source = parser.title or urllib.parse.urlsplit(url).netloc
+    return [{
+        'title': item['title'],
+        'url': item['url'],
+        'source': source,
+        'kind': kind,
+        'score': 0,
+        'num_comments': 0,
+        'created_utc': int(item['published'].timestamp()) if item['published'] else 0,
+        'selftext': item['summary'],
+        'thumbnail': item['thumbnail'],
+    } for item in items if item['title'] and item['url']]
 
-def main():
-    # Parse date argument
-    if len(sys.argv) > 1:
-        date_str = sys.argv[1]
-    else:
-        date_str = datetime.now().strftime('%Y-%m-%d')
 
-    print(f"=== Feed Collector for {date_str} ===\n")
+def fetch_feeds(sources, max_workers=FEED_WORKERS):
+    """Fetch several feeds in parallel. Returns [(url, posts)] in input order."""
+    results = transport.map_concurrent(
+        lambda source: fetch_feed(*source), sources, max_workers=max_workers, skipped=[]
+    )
+    return [(url, posts) for (url, _kind), posts in zip(sources, results)]
 
-    config = load_config()
 
-    # 1. Liturgical readings
-    print("[1/3] Fetching liturgical readings...")
-    liturgy_data = None
-    if config.get('liturgy', {}).get('enabled', True):
-        api_data = fetch_readings(date_str)
-        readings = build_readings_list(api_data)
-
-        liturgy_data = {
-            'date': date_str,
-            'season': api_data.get('season', '') if api_data else '',
-            'readings': readings,
-            'patristic_comments': [],
-            'meditation': '',
-            'prayer': '',
-        }
-
-        print(f"  Found {len(readings)} readings")
-
-        # Fetch actual reading text from USCCB
-        usccb_link = api_data.get('usccbLink', '') if api_data else ''
-        if usccb_link and readings:
-            print(f"  Fetching reading texts from USCCB...")
-            usccb_texts = fetch_reading_texts(usccb_link)
-            if usccb_texts:
-                attach_reading_texts(readings, usccb_texts)
-                for r in readings:
-                    has_text = '✓' if r.get('text') else '✗'
-                    print(f"    {r['reference']}: text {has_text}")
-            else:
-                print("    Could not scrape USCCB texts")
-
-        # 2. Patristic comments
-        if config.get('liturgy', {}).get('include_fathers', True) and readings:
-            print("[2/3] Looking up Fathers of the Church...")
-            fathers_index = load_fathers_index()
-            if fathers_index:
-                all_comments = []
-                for reading in readings:
-                    comments = lookup_fathers(fathers_index, reading['reference'])
-                    all_comments.extend(comments)
-                    if comments:
-                        print(f"  {reading['reference']}: {len(comments)} patristic comment(s)")
-                    else:
-                        print(f"  {reading['reference']}: no match in index")
-                liturgy_data['patristic_comments'] = all_comments
-                print(f"  Total patristic comments: {len(all_comments)}")
+# ── Stages ──
+
+def stage_readings(date_str):
+    """Fetch one day's reading references (cpbjr)."""
+    api_data = fetch_readings(date_str)
+    if not api_data:
+        raise StageFailed(f"no readings for {date_str}")
+    print(f"  [readings {date_str}] Found {len(build_readings_list(api_data))} readings")
+    return api_data
+
+
+def stage_usccb(date_str, api_data):
+    """
+    One day's reading texts by USCCB section. Texts already in the
+    reading store are not scraped again; the page is only fetched when
+    some reading (the psalm included, stored by date) is missing, and
+    its texts are added to the store.
+    """
+    readings = build_readings_list(api_data)
+    if not readings:
+        return {}
+    store = get_reading_store()
+    texts = {}
+    for reading in readings:
+        text = store.get(reading['reference'], reading['type'], date_str)
+        if text:
+            texts[USCCB_SECTIONS[reading['type']]] = text
+    metrics.count('reading_store_hits', len(texts))
+    metrics.count('reading_store_misses', len(readings) - len(texts))
+    if len(texts) == len(readings):
+        print(f"  [usccb {date_str}] All {len(texts)} reading texts from the reading store")
+        return texts
+
+    usccb_link = api_data.get('usccbLink', '')
+    if not usccb_link:
+        return texts
+    print(f"  [usccb {date_str}] Fetching reading texts from USCCB...")
+    scraped = fetch_reading_texts(usccb_link)
+    if not scraped and not texts:
+        raise StageFailed(f"could not scrape USCCB texts for {date_str}")
+    stored = store_reading_texts(readings, scraped, store, usccb_link, date_str)
+    metrics.count('reading_texts_stored', stored)
+    return {**scraped, **texts}
+
+
+def stage_fathers(date_str, api_data):
+    """Look up patristic comments for every reading of one day."""
+    readings = build_readings_list(api_data)
+    if not readings:
+        return []
+    fathers_index = get_fathers_index()
+    if not fathers_index:
+        raise StageFailed("fathers index unavailable")
+    all_comments = []
+    for reading in readings:
+        comments = lookup_fathers(fathers_index, reading['reference'])
+        all_comments.extend(comments)
+        if comments:
+            print(f"  [fathers {date_str}] {reading['reference']}: {len(comments)} patristic comment(s)")
         else:
-            print("[2/3] Skipping Fathers lookup (disabled or no readings)")
-    else:
-        print("[1/3] Liturgy disabled in config")
-        print("[2/3] Skipping Fathers")
+            print(f"  [fathers {date_str}] {reading['reference']}: no match in index")
+    return all_comments
 
-    # 3. Reddit
-    print("[3/3] Fetching Reddit posts...")
-    subreddits = config.get('subreddits', [])
+
+def stage_reddit(config):
+    """Fetch posts from every configured subreddit."""
     all_posts = []
-    for i, sub in enumerate(subreddits):
-        if i > 0:
-            time.sleep(2)  # Rate limit: 2s between subreddits
-        posts = fetch_subreddit(sub, limit=5)
+    for sub, posts in fetch_subreddits(config.get('subreddits', []), limit=REDDIT_LIMIT):
         all_posts.extend(posts)
         if posts:
-            print(f"  r/{sub}: {len(posts)} posts")
+            print(f"  [reddit] r/{sub}: {len(posts)} posts")
         else:
-            print(f"  r/{sub}: 0 posts (blocked or empty)")
+            print(f"  [reddit] r/{sub}: 0 posts (blocked or empty)")
+    waited = RATE_LIMITER.total_wait()
+    if waited >= 1:
+        print(f"  [reddit] Waited {waited:.1f}s on rate limits")
+    if not all_posts:
+        raise StageFailed("Reddit returned no posts")
+    return all_posts
+
+
+def stage_feeds(config):
+    """Fetch recent items from every configured RSS/Atom feed and Substack."""
+    sources = feed_sources(config)
+    all_posts = []
+    for url, posts in fetch_feeds(sources):
+        all_posts.extend(posts)
+        print(f"  [feeds] {url}: {len(posts)} items")
+    if sources and not all_posts:
+        raise StageFailed("no feed returned any item")
+    return all_posts
 
-    sections = categorize_posts(all_posts, config)
 
-    # If Reddit returned nothing, try to keep previous Reddit data
-    if not sections and OUTPUT_PATH.exists():
-        try:
-            with open(OUTPUT_PATH) as f:
-                prev = json.load(f)
-            prev_sections = prev.get('sections', [])
-            if prev_sections:
-                print("  Reddit returned no data. Keeping previous Reddit posts.")
-                sections = prev_sections
-        except Exception:
-            pass
+def build_stages(dates, config):
+    """
+    Collector stage graph. Per date, USCCB and Fathers wait on that
+    date's readings; Reddit and the RSS feeds run alongside everything.
+    """
+    liturgy_cfg = config.get('liturgy', {})
+    stages = []
+    if liturgy_cfg.get('enabled', True):
+        for date_str in dates:
+            readings = f'readings-{date_str}'
+            stages.append(Stage(readings, lambda inputs, d=date_str: stage_readings(d)))
+            stages.append(Stage(f'usccb-{date_str}', deps=[readings],
+                                fn=lambda inputs, d=date_str, r=readings: stage_usccb(d, inputs[r])))
+            if liturgy_cfg.get('include_fathers', True):
+                stages.append(Stage(f'fathers-{date_str}', deps=[readings],
+                                    fn=lambda inputs, d=date_str, r=readings: stage_fathers(d, inputs[r])))
+    stages.append(Stage('reddit', lambda inputs: stage_reddit(config)))
+    if feed_sources(config):
+        stages.append(Stage('feeds', lambda inputs: stage_feeds(config)))
+    return stages
+
+
+def build_liturgy(date_str, results):
+    """Assemble one day's liturgy block from its readings/usccb/fathers stage results."""
+    readings_result = results.get(f'readings-{date_str}')
+    if readings_result is None:
+        return None
+    api_data = readings_result.result if readings_result.succeeded else None
+    readings = build_readings_list(api_data)
+    liturgy_data = {
+        'date': date_str,
+        'season': api_data.get('season', '') if api_data else '',
+        'readings': readings,
+        'patristic_comments': [],
+        'meditation': '',
+        'prayer': '',
+    }
+    usccb = results.get(f'usccb-{date_str}')
+    usccb_texts = usccb.result if usccb and usccb.succeeded and usccb.result else {}
+    if readings:
+        attach_reading_texts(readings, usccb_texts, get_reading_store(), date_str)
+    fathers = results.get(f'fathers-{date_str}')
+    if fathers and fathers.succeeded:
+        liturgy_data['patristic_comments'] = fathers.result
+    return liturgy_data
+
+
+def load_previous_sections(history=None, week=None):
+    """
+    Sections of the newest archived week before `week`, used when Reddit
+    returns nothing. Falls back to the last written feed for a history
+    store that has not archived anything yet.
+    """
+    if history is not None:
+        sections = history.latest_sections(before=week)
+        if sections:
+            return sections
+    if not OUTPUT_PATH.exists():
+        return []
+    try:
+        with open(OUTPUT_PATH) as f:
+            return json.load(f).get('sections', [])
+    except Exception:
+        return []
+
+
+# ── Stale fallbacks ──
+
+def fill_missing_sources(posts, config, history):
+    """
+    Stand in for every configured subreddit and feed with no posts this
+    run (blocked, failed, or cut off by the deadline) with its items from
+    the last week history saw it, marked stale. Feeds are matched by
+    host, and only their items still within FEED_MAX_AGE_DAYS are kept.
+    Returns (stale posts, sources filled).
+    """
+    sources = {post['source'] for post in posts}
+    hosts = {urllib.parse.urlsplit(post['url']).netloc for post in posts}
+    stale, filled = [], []
+    for sub in config.get('subreddits', []):
+        source = f'r/{sub}'
+        found = [] if source in sources else history.last_seen(source=source, limit=REDDIT_LIMIT)
+        if found:
+            stale.extend(found)
+            filled.append(source)
+    since = time.time() - FEED_MAX_AGE_DAYS * 86400
+    for url, _kind in feed_sources(config):
+        host = urllib.parse.urlsplit(url).netloc
+        found = [] if host in hosts else history.last_seen(host=host, since=since,
+                                                           limit=FEED_ITEM_LIMIT)
+        if found:
+            stale.extend(found)
+            filled.append(url)
+    for post in stale:
+        post['stale'] = True
+    return stale, filled
+
+
+def archived_liturgy(history, dates, weeks=LITURGY_LOOKBACK_WEEKS):
+    """{date: liturgy block} for `dates`, from the newest archived weeks that have them."""
+    found, wanted = {}, set(dates)
+    for info in history.weeks()[:weeks]:
+        output = history.week_output(info['week']) or {}
+        for day in output.get('liturgy_days') or [output.get('liturgy')]:
+            date_str = (day or {}).get('date')
+            if date_str in wanted and date_str not in found and day.get('readings'):
+                found[date_str] = day
+        if len(found) == len(wanted):
+            break
+    return found
+
+
+def fill_liturgy_day(day, archived, comments=True):
+    """
+    Fill what a day's liturgy block is missing from an archived block of
+    the same date: all of it without readings, else the reading texts,
+    and the patristic comments if `comments`. Returns True if anything
+    was filled.
+    """
+    if not day['readings']:
+        for key in ('season', 'readings', 'patristic_comments', 'meditation', 'prayer'):
+            day[key] = archived.get(key, day[key])
+        return True
+    filled = False
+    texts = {r['reference']: r.get('text') for r in archived.get('readings', [])}
+    for reading in day['readings']:
+        if not reading.get('text') and texts.get(reading['reference']):
+            reading['text'] = texts[reading['reference']]
+            filled = True
+    if comments and not day['patristic_comments'] and archived.get('patristic_comments'):
+        day['patristic_comments'] = archived['patristic_comments']
+        filled = True
+    return filled
+
+
+def collect_liturgy(dates, results, history):
+    """
+    Every day's liturgy block, with whatever this run could not fetch
+    taken from the archive. Days built from a stale stage result or the
+    archive are marked `stale`. Returns (days, stale dates).
+    """
+    days = [day for day in (build_liturgy(d, results) for d in dates) if day]
+    status = {name: res.status for name, res in results.items()}
+    incomplete = {}
+    for day in days:
+        stages = [status.get(f'{kind}-{day["date"]}') for kind in ('readings', 'usccb', 'fathers')]
+        if 'stale' in stages:
+            day['stale'] = True
+        fathers = stages[2]
+        comments = fathers is not None and fathers not in ('ok', 'cached', 'stale')
+        if not day['readings'] or comments or not all(r.get('text') for r in day['readings']):
+            incomplete[day['date']] = comments
+    if incomplete:
+        archived = archived_liturgy(history, incomplete)
+        for day in days:
+            date_str = day['date']
+            if date_str in archived and fill_liturgy_day(day, archived[date_str],
+                                                         comments=incomplete[date_str]):
+                day['stale'] = True
+    return days, [day['date'] for day in days if day.get('stale')]
+
+
+# ── Main ──
+
+def week_label(date_str):
+    """The '%Y-W%W' week a YYYY-MM-DD date falls in."""
+    return datetime.strptime(date_str, '%Y-%m-%d').strftime('%Y-W%W')
+
+
+def week_dates(week):
+    """Monday..Sunday dates for a '%Y-W%W' week label such as '2026-W06'."""
+    monday = datetime.strptime(f'{week}-1', '%Y-W%W-%w')
+    return [(monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+
+
+def date_range(start, end):
+    """Inclusive list of YYYY-MM-DD dates from start to end."""
+    day = datetime.strptime(start, '%Y-%m-%d')
+    last = datetime.strptime(end, '%Y-%m-%d')
+    if last < day:
+        raise ValueError(f"--to {end} is before --from {start}")
+    dates = []
+    while day <= last:
+        dates.append(day.strftime('%Y-%m-%d'))
+        day += timedelta(days=1)
+    return dates
+
+
+def parse_duration(text):
+    """Seconds in a duration such as '90', '60s', '2m' or '1h'."""
+    m = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*', text or '')
+    if not m or float(m.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid duration {text!r} (expected e.g. 60s, 2m)")
+    return float(m.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[m.group(2)]
+
+
+def parse_args(argv=None):
+    today = datetime.now().strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description='Collect the weekly dashboard feed.')
+    parser.add_argument('date', nargs='?', default=today,
+                        help='Date to collect readings for (YYYY-MM-DD, default: today)')
+    parser.add_argument('--from', dest='date_from', metavar='DATE',
+                        help='Collect every day from DATE (YYYY-MM-DD)...')
+    parser.add_argument('--to', dest='date_to', metavar='DATE',
+                        help='...up to and including DATE (default: --from)')
+    parser.add_argument('--week', nargs='?', const=datetime.now().strftime('%Y-W%W'),
+                        help='Collect Monday..Sunday of a week (YYYY-Www, default: this week)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Reuse checkpoints from a previous run; only re-run failed or stale stages')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the on-disk HTTP cache')
+    parser.add_argument('--max-age', type=float, default=CHECKPOINT_MAX_AGE_HOURS,
+                        help='Hours after which a checkpoint is considered stale '
+                             f'(default: {CHECKPOINT_MAX_AGE_HOURS:g})')
+    parser.add_argument('--deadline', type=parse_duration, metavar='DURATION',
+                        help='Bound the network time of the run to DURATION (e.g. 60s, 2m): fetches '
+                             'that overrun their share are cancelled and what they miss comes from '
+                             'earlier runs; local work already started still finishes')
+    parser.add_argument('--metrics-history', metavar='PATH',
+                        help=f'Also append the {METRICS_PATH.name} record to this JSONL file')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'Run stages one at a time under cProfile; profiles go to {PROFILE_DIR}')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.week:
+            args.dates = week_dates(args.week)
+        elif args.date_from:
+            args.dates = date_range(args.date_from, args.date_to or args.date_from)
+        else:
+            args.dates = [args.date]
+        # Items and the archive go under the week collected, not the week the script runs in
+        weeks = sorted({week_label(d) for d in args.dates})
+    except ValueError as e:
+        parser.error(str(e))
+    if args.week is None:
+        if len(weeks) > 1:
+            parser.error(f"{args.dates[0]} .. {args.dates[-1]} spans {', '.join(weeks)}; "
+                         "collect one week at a time")
+        args.week = weeks[0]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dates = args.dates
+    run_label = dates[0] if len(dates) == 1 else f'{dates[0]}_{dates[-1]}'
+
+    print(f"=== Feed Collector for {run_label.replace('_', ' .. ')} ===\n")
+
+    # Profiles are per thread, so profiled runs execute one stage at a time
+    run_metrics = metrics.start('collect_feed',
+                                profile_dir=PROFILE_DIR / run_label if args.profile else None)
+    metrics.set_value('dates', dates)
+    metrics.set_value('resume', args.resume)
+
+    config = load_config()
+    configure_http_cache(config, enabled=not args.no_cache)
+    checkpoint_dir = CHECKPOINT_DIR / run_label
+
+    # Stages get the deadline minus a reserve for assembling the output
+    deadline = None
+    if args.deadline:
+        deadline = transport.Deadline(args.deadline * (1 - DEADLINE_RESERVE))
+        print(f"  Deadline: {args.deadline:g}s ({deadline.seconds:.1f}s for fetching)\n")
+    # Stays installed until run_stages has drained abandoned stages, so their fetches are refused
+    transport.DEADLINE = deadline
+    try:
+        results = run_stages(build_stages(dates, config), checkpoint_dir=checkpoint_dir,
+                             resume=args.resume, max_age=args.max_age * 3600,
+                             max_workers=1 if args.profile else STAGE_WORKERS,
+                             deadline=deadline, stale_fallback=True)
+    finally:
+        transport.DEADLINE = None
+
+    print("\n── Stages ──")
+    for name, res in results.items():
+        detail = f" ({res.error})" if res.error else ''
+        print(f"  {name}: {res.status} in {res.elapsed:.1f}s{detail}")
+        metrics.set_value('status', res.status, stage=name)
+        if res.error:
+            metrics.set_value('error', res.error, stage=name)
+    if deadline is not None:
+        print(f"  Deadline: {deadline.cancelled} fetch(es) cancelled, "
+              f"{deadline.remaining():.1f}s left")
+        metrics.set_value('deadline', {'seconds': args.deadline, 'cancelled': deadline.cancelled,
+                                       'expired': deadline.expired()})
+    if HTTP_CACHE.enabled:
+        print(f"  HTTP cache: {HTTP_CACHE.summary()}")
+        metrics.set_value('http_cache', dict(HTTP_CACHE.stats))
+    metrics.set_value('rate_limit_wait_seconds', round(RATE_LIMITER.total_wait(), 3))
+
+    week = args.week
+    history = HistoryStore(HISTORY_PATH)
+    stale = {'stages': [name for name, res in results.items() if res.status == 'stale']}
+
+    liturgy_days, stale['liturgy'] = collect_liturgy(dates, results, history)
+    if stale['liturgy']:
+        print(f"  Liturgy from earlier runs: {', '.join(stale['liturgy'])}")
+    for day in liturgy_days:
+        for r in day['readings']:
+            has_text = '✓' if r.get('text') else '✗'
+            print(f"    {day['date']} {r['reference']}: text {has_text}")
+
+    # The single-day block the dashboard shows by default: today if collected, else the first day
+    today = datetime.now().strftime('%Y-%m-%d')
+    liturgy_data = next((d for d in liturgy_days if d['date'] == today),
+                        liturgy_days[0] if liturgy_days else None)
+
+    posts = []
+    for name in ('reddit', 'feeds'):
+        res = results.get(name)
+        if res and res.succeeded:
+            posts.extend(res.result)
+
+    # Remember what was seen; posts already stored with the same content are skipped
+    with metrics.stage('history'):
+        seen = history.record_items([post for post in posts if not post.get('stale')], week)
+        metrics.set_value('items', seen)
+    print(f"  History: {seen['new']} new, {seen['changed']} changed, "
+          f"{seen['unchanged']} unchanged")
+
+    # Sources that returned nothing keep the items they had last time
+    stale_posts, stale['sources'] = fill_missing_sources(posts, config, history)
+    if stale_posts:
+        posts.extend(stale_posts)
+        print(f"  Kept {len(stale_posts)} earlier item(s) for {len(stale['sources'])} source(s) "
+              f"with no data: {', '.join(stale['sources'])}")
+    sections = categorize_posts(posts, config)
+
+    # If nothing at all came back, try to keep the previous sections
+    if not sections:
+        sections = load_previous_sections(history, week)
+        if sections:
+            print("  Reddit returned no data. Keeping previous Reddit posts.")
 
     # Build output
     output = {
         'generated_at': datetime.utcnow().isoformat() + 'Z',
-        'week': datetime.now().strftime('%Y-W%W'),
+        'week': week,
         'liturgy': liturgy_data,
         'sections': sections,
     }
-
-    # Write output
-    DATA_DIR.mkdir(exist_ok=True)
-    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    if len(dates) > 1:
+        output['liturgy_days'] = liturgy_days
+    if any(stale.values()):
+        output['stale'] = stale
+
+    # Write output: the single file for older dashboards, then the shards
+    with metrics.stage('write'):
+        DATA_DIR.mkdir(exist_ok=True)
+        with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
+            json.dump(output, f, ensure_ascii=False, indent=2)
+        write_compressed(OUTPUT_PATH)
+        manifest = write_feed_shards(output, SHARD_DIR)
+        metrics.set_value('output_bytes', OUTPUT_PATH.stat().st_size)
+        metrics.set_value('shard_bytes', shards_size(SHARD_DIR, manifest))
+        history.archive_week(output)
+        metrics.set_value('history', history.stats())
+    history.close()
 
     output_size = OUTPUT_PATH.stat().st_size / 1024
     print(f"\n=== Done! ===")
     print(f"Output: {OUTPUT_PATH} ({output_size:.1f} KB)")
-    print(f"Readings: {len(liturgy_data['readings']) if liturgy_data else 0}")
-    print(f"Patristic comments: {len(liturgy_data['patristic_comments']) if liturgy_data else 0}")
+    print(f"Shards: {SHARD_DIR} ({2 + len(manifest['sections'])} shards, "
+          f"{shards_size(SHARD_DIR, manifest) / 1024:.1f} KB)")
+    print(f"History: {HISTORY_PATH} ({HISTORY_PATH.stat().st_size / 1024:.1f} KB)")
+    print(f"Days: {len(liturgy_days)}")
+    print(f"Readings: {sum(len(d['readings']) for d in liturgy_days)}")
+    if liturgy_days:
+        print(f"Reading store: {len(get_reading_store())} texts ({READING_STORE_PATH})")
+    print(f"Patristic comments: {sum(len(d['patristic_comments']) for d in liturgy_days)}")
     print(f"News sections: {len(sections)}")
     total_items = sum(len(s['items']) for s in sections)
     print(f"Total news items: {total_items}")
+    failed = [name for name, res in results.items() if not res.succeeded]
+    if failed:
+        print(f"Incomplete stages: {', '.join(failed)} (re-run with --resume to retry only these)")
+    if stale['stages']:
+        print(f"Stale stages (earlier results): {', '.join(stale['stages'])}")
+
+    metrics.set_value('days', len(liturgy_days))
+    metrics.set_value('readings', sum(len(d['readings']) for d in liturgy_days))
+    metrics.set_value('patristic_comments', sum(len(d['patristic_comments']) for d in liturgy_days))
+    metrics.set_value('news_items', total_items)
+    metrics.set_value('failed_stages', failed)
+    metrics.set_value('stale', stale)
+    run_metrics.write(METRICS_PATH, args.metrics_history)
+    print(f"Metrics: {METRICS_PATH}" + (f" (+ {args.metrics_history})" if args.metrics_history else ''))
+    if args.profile:
+        print(f"Profiles: {PROFILE_DIR / run_label}")
+    return results
 
 
 if __name__ == '__main__':
-    main()
+    # Non-zero when a stage failed with no earlier result to fall back on,
+    # so the weekly workflow knows to run --resume
+    raise SystemExit(1 if any(not res.succeeded for res in main().values()) else 0)
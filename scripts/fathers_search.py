@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the patristic commentary.
+
+index_fathers.py adds an inverted index to the fathers store
+(data/fathers_index.sqlite) after writing the entries: one `postings`
+row per term, plus the token length of every entry for BM25. Terms are
+the accent-folded words of text_utils.positions(), so
+"Agustín", "agustin" and "AGUSTÍN" are the same term.
+
+A term's postings are unsigned LEB128 varints, for each entry in id
+order:
+
+  id - previous id, tf, byte length of the positions, positions (delta)
+
+Positions count every word, stopwords included, though stopwords are
+not indexed. The byte length lets ranked queries skip positions they
+don't need; quoted phrases ("reino de los cielos") read them to require
+their terms at the same distances as in the phrase ("reino" three words
+before "cielos"). A phrase of stopwords only can't be searched and is
+rejected with QueryError. A query only reads its own terms' rows and decompresses the
+text of the hits it returns, so it takes milliseconds and never loads
+the corpus.
+
+Usage:
+  python3 scripts/fathers_search.py misericordia
+  python3 scripts/fathers_search.py '"pan de vida" Agustín' --limit 5
+"""
+
+import argparse
+import heapq
+import math
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import text_utils
+from text_utils import fold
+
+FORMAT_VERSION = 2
+DEFAULT_PATH = Path(__file__).parent.parent / 'data' / 'fathers_index.sqlite'
+DEFAULT_LIMIT = 10
+SNIPPET_CHARS = 240
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT PRIMARY KEY,
+    df   INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_meta (
+    key   TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+"""
+
+QUERY_RE = re.compile(r'"([^"]*)"?|(\S+)')
+SPACE_RE = re.compile(r'\s+')
+
+
+class QueryError(ValueError):
+    """A query (or one of its phrases) has no searchable words."""
+
+
+# ── Varints ──
+
+def encode_varint(value, out):
+    """Append `value` (>= 0) to the bytearray `out` as a LEB128 varint."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, i):
+    """(value, next offset) of the varint at data[i]."""
+    byte = data[i]
+    if byte < 0x80:
+        return byte, i + 1
+    value, shift = byte & 0x7F, 7
+    while True:
+        i += 1
+        byte = data[i]
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, i + 1
+        shift += 7
+
+
+def decode_varints(data):
+    values, i, end = [], 0, len(data)
+    while i < end:
+        value, i = read_varint(data, i)
+        values.append(value)
+    return values
+
+
+def decode_postings(data, positions=False):
+    """
+    {entry id: tf}. With `positions`, {entry id: (tf, offset, size)}
+    instead, locating each entry's positions for decode_positions().
+    """
+    found = {}
+    i, end, entry_id = 0, len(data), 0
+    while i < end:
+        # The three header varints, with the one-byte case inline (it is nearly every one)
+        delta = data[i]
+        if delta < 0x80:
+            i += 1
+        else:
+            delta, i = read_varint(data, i)
+        tf = data[i]
+        if tf < 0x80:
+            i += 1
+        else:
+            tf, i = read_varint(data, i)
+        size = data[i]
+        if size < 0x80:
+            i += 1
+        else:
+            size, i = read_varint(data, i)
+        entry_id += delta
+        found[entry_id] = (tf, i, size) if positions else tf
+        i += size
+    return found
+
+
+def decode_positions(data, offset, size):
+    positions, pos = set(), 0
+    for gap in decode_varints(data[offset:offset + size]):
+        pos += gap
+        positions.add(pos)
+    return positions
+
+
+# ── Build ──
+
+def build_search_index(path):
+    """
+    Rebuild the inverted index of the store at `path` from its entries.
+    Postings are accumulated compressed in memory, one bytearray per
+    term. Returns (entries, terms, postings bytes).
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(SCHEMA)
+        postings = {}  # term: [data, last entry id, df]
+        lengths = bytearray()
+        documents = total = last_id = 0
+        for entry_id, blob in conn.execute('SELECT id, text FROM entries ORDER BY id'):
+            terms = text_utils.positions(zlib.decompress(blob).decode('utf-8'))
+            positions = {}
+            for pos, term in terms:
+                positions.setdefault(term, []).append(pos)
+            for term, where in positions.items():
+                posting = postings.get(term)
+                if posting is None:
+                    posting = postings[term] = [bytearray(), 0, 0]
+                block, prev = bytearray(), 0
+                for pos in where:
+                    encode_varint(pos - prev, block)
+                    prev = pos
+                data = posting[0]
+                encode_varint(entry_id - posting[1], data)
+                encode_varint(len(where), data)
+                encode_varint(len(block), data)
+                data += block
+                posting[1] = entry_id
+                posting[2] += 1
+            encode_varint(entry_id - last_id, lengths)
+            encode_varint(len(terms), lengths)
+            last_id = entry_id
+            documents += 1
+            total += len(terms)
+
+        conn.execute('DELETE FROM postings')
+        conn.execute('DELETE FROM search_meta')
+        conn.executemany('INSERT INTO postings (term, df, data) VALUES (?, ?, ?)',
+                         ((term, p[2], bytes(p[0])) for term, p in postings.items()))
+        conn.executemany('INSERT INTO search_meta (key, value) VALUES (?, ?)', [
+            ('format_version', FORMAT_VERSION),
+            ('documents', documents),
+            ('avg_length', total / documents if documents else 0.0),
+            ('lengths', bytes(lengths)),
+        ])
+        conn.commit()
+    finally:
+        conn.close()
+    return documents, len(postings), sum(len(p[0]) for p in postings.values())
+
+
+def has_search_index(path):
+    """True if the store at `path` has an inverted index of the current format."""
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            row = conn.execute(
+                "SELECT value FROM search_meta WHERE key = 'format_version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+    return bool(row) and row[0] == FORMAT_VERSION
+
+
+# ── Query ──
+
+def parse_query(query):
+    """
+    (terms, phrases): every query term, and the quoted phrases of two or
+    more terms as [(offset from the phrase's first term, term)]. Raises
+    QueryError for a quoted phrase, or a whole query, with no searchable
+    words; a blank query is just empty.
+    """
+    terms, phrases = [], []
+    for m in QUERY_RE.finditer(query or ''):
+        quoted = m.group(1)
+        found = text_utils.positions(quoted if quoted is not None else m.group(2))
+        if quoted is not None and not found:
+            raise QueryError(f'phrase "{quoted}" has no searchable words' if quoted.strip()
+                             else 'empty phrase ""')
+        for _pos, term in found:
+            if term not in terms:
+                terms.append(term)
+        if quoted is not None and len(found) > 1:
+            first = found[0][0]
+            phrases.append([(pos - first, term) for pos, term in found])
+    if not terms and (query or '').strip():
+        raise QueryError(f'{query.strip()!r} has no searchable words (only stopwords or numbers)')
+    return terms, phrases
+
+
+def _has_phrase(postings, located, phrase, entry_id):
+    """True if `phrase`'s terms occur in the entry at the phrase's distances."""
+    where = []
+    for offset, term in phrase:
+        spot = located[term].get(entry_id)
+        if spot is None:
+            return False
+        where.append((offset, decode_positions(postings[term][1], spot[1], spot[2])))
+    return any(all(start + offset in found for offset, found in where[1:])
+               for start in where[0][1])
+
+
+def snippet(text, terms, size=SNIPPET_CHARS):
+    """About `size` chars of `text` around the first occurrence of any of `terms`."""
+    text = SPACE_RE.sub(' ', text).strip()
+    start = 0
+    for m in text_utils.TOKEN_RE.finditer(text):
+        if fold(m.group()) in terms:
+            start = max(0, m.start() - size // 3)
+            break
+    piece = text[start:start + size]
+    return ('…' if start else '') + piece + ('…' if start + size < len(text) else '')
+
+
+class FathersSearch:
+    """BM25 queries over a store's inverted index, opened read-only; thread-safe."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True,
+                                     check_same_thread=False)
+        self._lock = threading.Lock()
+        meta = dict(self._conn.execute('SELECT key, value FROM search_meta'))
+        self.documents = int(meta['documents'])
+        self.avg_length = float(meta['avg_length']) or 1.0
+        # BM25's length normalization K1 * (1 - B + B * length / avg) per entry
+        self._norms, entry_id = {}, 0
+        values = decode_varints(meta['lengths'])
+        for delta, length in zip(values[::2], values[1::2]):
+            entry_id += delta
+            self._norms[entry_id] = K1 * (1 - B + B * length / self.avg_length)
+
+    def _postings(self, terms):
+        marks = ','.join('?' * len(terms))
+        with self._lock:
+            return {term: (df, data) for term, df, data in self._conn.execute(
+                f'SELECT term, df, data FROM postings WHERE term IN ({marks})', terms)}
+
+    def _entries(self, ids):
+        marks = ','.join('?' * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT id, ref, father, text FROM entries WHERE id IN ({marks})', ids).fetchall()
+        return {row[0]: row for row in rows}
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Entries matching `query`, best BM25 score first. Bare words are
+        alternatives; every quoted phrase must appear. Returns
+        [{"id", "ref", "father", "score", "snippet"}]; raises QueryError
+        (see parse_query).
+        """
+        terms, phrases = parse_query(query)
+        if not terms:
+            return []
+        postings = self._postings(terms)
+        phrase_terms = {term for phrase in phrases for _offset, term in phrase}
+        if any(term not in postings for term in phrase_terms):
+            return []
+
+        scores, located = {}, {}
+        for term, (df, data) in postings.items():
+            idf = math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+            if term in phrase_terms:
+                located[term] = decode_postings(data, positions=True)
+                tfs = {entry_id: spot[0] for entry_id, spot in located[term].items()}
+            else:
+                tfs = decode_postings(data)
+            weight, norms, get = idf * (K1 + 1), self._norms, scores.get
+            for entry_id, tf in tfs.items():
+                scores[entry_id] = get(entry_id, 0.0) + weight * tf / (tf + norms.get(entry_id, K1))
+
+        if phrases:
+            # Positions are only decoded for entries that could still make the cut
+            best = []
+            for entry_id, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+                if all(_has_phrase(postings, located, phrase, entry_id) for phrase in phrases):
+                    best.append((entry_id, score))
+                    if len(best) == limit:
+                        break
+        else:
+            best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        if not best:
+            return []
+        rows = self._entries([entry_id for entry_id, _score in best])
+        term_set = set(terms)
+        hits = []
+        for entry_id, score in best:
+            _id, ref, father, blob = rows[entry_id]
+            hits.append({
+                'id': entry_id,
+                'ref': ref,
+                'father': father,
+                'score': round(score, 3),
+                'snippet': snippet(zlib.decompress(blob).decode('utf-8'), term_set),
+            })
+        return hits
+
+    def close(self):
+        self._conn.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Search the patristic commentary.')
+    parser.add_argument('query', nargs='+', help='Words, or "quoted phrases" that must all appear')
+    parser.add_argument('--db', default=str(DEFAULT_PATH),
+                        help='Fathers store (default: data/fathers_index.sqlite)')
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f'Hits to show (default: {DEFAULT_LIMIT})')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not has_search_index(args.db):
+        print(f"No search index in {args.db}. Run index_fathers.py first.")
+        return 1
+    search = FathersSearch(args.db)
+    query = ' '.join(args.query)
+    started = time.perf_counter()
+    try:
+        hits = search.search(query, limit=args.limit)
+    except QueryError as e:
+        print(f"Can't search: {e}")
+        search.close()
+        return 1
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{len(hits)} hit(s) for {query!r} in {elapsed:.1f} ms "
+          f"({search.documents} entries)\n")
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank:>3}. {hit['score']:6.2f}  {hit['ref']} — {hit['father']}")
+        print(f"       {hit['snippet']}")
+    search.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
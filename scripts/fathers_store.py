@@ -0,0 +1,408 @@
+"""
+Compact SQLite store for the patristic index.
+
+index_fathers.py writes it next to fathers_index.json. Entries carry
+their verse range as packed verse ids (see verse_ids.py) and are indexed
+by book and start id, and each commentary's full text is stored once,
+zlib-compressed, and only decompressed when asked for. The collector
+therefore reads a few rows instead of parsing the whole JSON.
+
+Overlap queries run on a per-book VerseIntervals (sorted start ids +
+bisect), so entries that run across chapters ("Mark 7:31-8:10") are
+found from either chapter. Each entry also carries features computed
+once at index time (father, text length, verse span).
+"""
+
+import re
+import shutil
+import sqlite3
+import threading
+import zlib
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import verse_ids
+
+FORMAT_VERSION = 8
+
+FATHER_NAMES = (
+    'Agustín', 'Crisóstomo', 'Orígenes', 'Ambrosio', 'Jerónimo', 'Gregorio', 'Basilio',
+    'Cirilo', 'Efrén', 'Tertuliano', 'Atanasio', 'Ireneo', 'Clemente',
+    'Augustine', 'Chrysostom', 'Origen', 'Ambrose', 'Jerome', 'Gregory', 'Basil',
+    'Cyril', 'Ephrem', 'Tertullian', 'Athanasius', 'Irenaeus', 'Clement',
+)
+# Commentaries usually open with "AuthorName: ..." or "AuthorName. ..."
+FATHER_RE = re.compile(
+    r'^(.+?(?:' + '|'.join(FATHER_NAMES) + r')[\w\s]*?)[:.]'
+)
+DEFAULT_FATHER = 'Padre de la Iglesia'
+
+
+def extract_father(text):
+    """Guess the commentary's author from its opening words (max 100 chars)."""
+    m = FATHER_RE.match(text[:200])
+    if m:
+        return m.group(1).strip()[:100]
+    # Fall back to the first line as a title
+    first_line = text.split('\n')[0][:100] if text else ''
+    return first_line or DEFAULT_FATHER
+
+
+def entry_features(text, start_id, end_id):
+    """Per-entry fields precomputed by the indexer."""
+    return {
+        'father': extract_father(text),
+        'length': len(text),
+        'span': verse_ids.verse_count(start_id, end_id),
+    }
+
+
+# ── Interval search ──
+
+class VerseIntervals:
+    """
+    The entries of one book sorted by start verse id.
+
+    An entry [s, e] overlaps a query [qs, qe] iff s <= qe and e >= qs.
+    Since no entry spans more than `max_span` ids, every candidate has
+    qs - max_span <= s <= qe, so two bisects bound the scan. Verse counts
+    of ranges that cross chapters use the last verse of each chapter as
+    far as this book's entries show it.
+    """
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda e: (e['start_id'], e['end_id']))
+        self.starts = [e['start_id'] for e in self.entries]
+        self.max_span = max((e['end_id'] - e['start_id'] for e in self.entries), default=0)
+        self.last_verse = {}
+        for entry in self.entries:
+            for vid in (entry['start_id'], entry['end_id']):
+                verse = vid % verse_ids.CHAPTER_FACTOR
+                if verse != verse_ids.CHAPTER_END:
+                    chapter = verse_ids.chapter_of(vid)
+                    self.last_verse[chapter] = max(self.last_verse.get(chapter, 0), verse)
+
+    def overlapping(self, ranges):
+        """
+        Score every entry overlapping any of `ranges` ([(start_id, end_id)]).
+
+        The score is the Jaccard overlap between the entry's verses and
+        all queried verses, so a comment on exactly the reading scores 1.0
+        and one that only grazes it scores near 0. Returns
+        [(score, entry)] best first.
+        """
+        count = lambda s, e: verse_ids.verse_count(s, e, self.last_verse)
+        overlap = {}
+        query_len = 0
+        for qs, qe in ranges:
+            query_len += count(qs, qe)
+            lo = bisect_left(self.starts, qs - self.max_span)
+            hi = bisect_right(self.starts, qe)
+            for i in range(lo, hi):
+                entry = self.entries[i]
+                if entry['end_id'] >= qs:
+                    overlap[i] = overlap.get(i, 0) + count(max(qs, entry['start_id']),
+                                                           min(qe, entry['end_id']))
+
+        scored = []
+        for i, shared in overlap.items():
+            entry = self.entries[i]
+            span = count(entry['start_id'], entry['end_id'])
+            scored.append((shared / max(span + query_len - shared, 1), i))
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        return [(score, self.entries[i]) for score, i in scored]
+
+
+class _IntervalCache:
+    """Builds each book's VerseIntervals once and keeps it."""
+
+    def intervals(self, book):
+        with self._intervals_lock:
+            cached = self._intervals.get(book)
+        if cached is None:
+            cached = VerseIntervals(self.book_entries(book))
+            with self._intervals_lock:
+                self._intervals[book] = cached
+        return cached
+
+
+# ── Store ──
+
+SCHEMA = """
+CREATE TABLE meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE entries (
+    id       INTEGER PRIMARY KEY,
+    chapter  TEXT NOT NULL,
+    book     INTEGER NOT NULL,
+    ref      TEXT NOT NULL,
+    verses   TEXT NOT NULL,
+    start_id INTEGER NOT NULL,
+    end_id   INTEGER NOT NULL,
+    father   TEXT NOT NULL,
+    length   INTEGER NOT NULL,
+    span     INTEGER NOT NULL,
+    text     BLOB NOT NULL,
+    segment  TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX entries_book ON entries (book, start_id);
+CREATE INDEX entries_chapter ON entries (chapter, start_id);
+CREATE UNIQUE INDEX entries_ref ON entries (ref);
+CREATE INDEX entries_segment ON entries (segment);
+CREATE TABLE segments (
+    key        TEXT PRIMARY KEY,
+    hash       TEXT NOT NULL,
+    first_line INTEGER NOT NULL,
+    entries    INTEGER NOT NULL
+);
+"""
+
+_INSERT_SQL = (
+    'INSERT OR REPLACE INTO entries '
+    '(chapter, book, ref, verses, start_id, end_id, father, length, span, text, segment) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+
+def _store_version(path):
+    try:
+        conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'format_version'").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return None
+    return int(row[0]) if row else None
+
+
+class StoreWriter:
+    """
+    Builds a store one entry at a time, so the indexer never needs the
+    whole corpus in memory. Rows are buffered in small batches and the
+    file only replaces `path` on a clean close(). A later entry with the
+    same ref replaces the earlier one, like assigning into a dict.
+
+    With `incremental=True` an existing store (of the current format) is
+    updated in place of a rebuild: the `segments` table is the manifest
+    of source segment hashes, and only segments passed to
+    begin_segment() have their entries replaced.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, path, incremental=False):
+        self.path = Path(path)
+        self._tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        if self._tmp.exists():
+            self._tmp.unlink()
+        self.incremental = (incremental and self.path.exists()
+                            and _store_version(self.path) == FORMAT_VERSION)
+        if self.incremental:
+            shutil.copyfile(self.path, self._tmp)
+            self._conn = sqlite3.connect(self._tmp)
+            # A store built without segments (e.g. from the PDF) has no manifest to diff against
+            if self._conn.execute("SELECT 1 FROM entries WHERE segment = '' LIMIT 1").fetchone():
+                self._conn.close()
+                self._tmp.unlink()
+                self.incremental = False
+        if self.incremental:
+            self._conn.execute('DELETE FROM meta')
+        else:
+            self._conn = sqlite3.connect(self._tmp)
+            self._conn.executescript(SCHEMA)
+        self._batch = []
+        self._segment = ''
+        self._segment_count = 0
+        self.count = 0
+
+    def add(self, chapter, entry):
+        self._batch.append((
+            chapter, verse_ids.book_of(entry['start_id']), entry['ref'], entry['verses'],
+            entry['start_id'], entry['end_id'],
+            entry['father'], entry['length'], entry['span'],
+            zlib.compress(entry['text'].encode('utf-8'), 6),
+            self._segment,
+        ))
+        self._segment_count += 1
+        if len(self._batch) >= self.BATCH_SIZE:
+            self._flush()
+
+    # ── Segments (incremental builds) ──
+
+    def segment_hashes(self):
+        """Manifest of the store being updated: {segment key: content hash}."""
+        return dict(self._conn.execute('SELECT key, hash FROM segments'))
+
+    def begin_segment(self, key):
+        """Drop a segment's old entries; following add() calls belong to it."""
+        self._flush()
+        self._conn.execute('DELETE FROM entries WHERE segment = ?', (key,))
+        self._segment = key
+        self._segment_count = 0
+
+    def end_segment(self, key, content_hash, first_line):
+        self._flush()
+        self._conn.execute(
+            'INSERT OR REPLACE INTO segments (key, hash, first_line, entries) VALUES (?, ?, ?, ?)',
+            (key, content_hash, first_line, self._segment_count))
+        self._segment = ''
+
+    def keep_segment(self, key, first_line):
+        """Record that an unchanged segment is still present (it may have moved)."""
+        self._conn.execute('UPDATE segments SET first_line = ? WHERE key = ?', (first_line, key))
+
+    def retain_segments(self, keys):
+        """Delete segments (and their entries) that are no longer in the source."""
+        keys = set(keys)
+        stale = [k for k in self.segment_hashes() if k not in keys]
+        for key in stale:
+            self._conn.execute('DELETE FROM entries WHERE segment = ?', (key,))
+            self._conn.execute('DELETE FROM segments WHERE key = ?', (key,))
+        return stale
+
+    def _flush(self):
+        if self._batch:
+            self._conn.executemany(_INSERT_SQL, self._batch)
+            self._batch = []
+
+    def close(self):
+        """Finish the store and move it into place. Returns the entry count."""
+        self._flush()
+        conn = self._conn
+        self.count, chapters = conn.execute(
+            'SELECT COUNT(*), COUNT(DISTINCT chapter) FROM entries').fetchone()
+        conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+            ('format_version', str(FORMAT_VERSION)),
+            ('entries', str(self.count)),
+            ('chapters', str(chapters)),
+        ])
+        conn.commit()
+        if not self.incremental:
+            conn.execute('VACUUM')
+        conn.close()
+        self._tmp.replace(self.path)
+        return self.count
+
+    def abort(self):
+        self._conn.close()
+        self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_store(path, lookup):
+    """
+    Write a lookup dict ({"Mark 7": [{"ref", "verses", "start_id", "end_id",
+    "father", "length", "span", "text"}, ...]}) to a fresh SQLite store
+    at `path`.
+    """
+    with StoreWriter(path) as writer:
+        for chapter, entries in lookup.items():
+            for entry in entries:
+                writer.add(chapter, entry)
+    return writer.count
+
+
+class FathersStore(_IntervalCache):
+    """
+    Read-only view of the store. `get(chapter)` mirrors dict.get on the
+    JSON index and `book_entries(book)` returns a whole book, both
+    without the text; call `text()` with an entry to decompress it.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True,
+                                     check_same_thread=False)
+        self._lock = threading.Lock()
+        self._intervals = {}
+        self._intervals_lock = threading.Lock()
+
+    def __bool__(self):
+        return True
+
+    def meta(self):
+        with self._lock:
+            return dict(self._conn.execute('SELECT key, value FROM meta'))
+
+    def chapters(self):
+        """Chapter keys in source order (segment position, then insertion order)."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                'SELECT e.chapter FROM entries e LEFT JOIN segments s ON s.key = e.segment '
+                'GROUP BY e.chapter ORDER BY MIN(COALESCE(s.first_line, 0)), MIN(e.id)')]
+
+    def _select(self, where, params):
+        with self._lock:
+            cursor = self._conn.execute(
+                'SELECT id, ref, verses, start_id, end_id, father, length, span '
+                f'FROM entries WHERE {where} ORDER BY id', params)
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get(self, chapter, default=None):
+        return self._select('chapter = ?', (chapter,)) or default
+
+    def book_entries(self, book):
+        return self._select('book = ?', (book,))
+
+    def text(self, entry):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text FROM entries WHERE id = ?', (entry['id'],)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else ''
+
+    def close(self):
+        self._conn.close()
+
+
+class JsonFathersIndex(_IntervalCache):
+    """Same interface as FathersStore over the legacy fathers_index.json dict."""
+
+    def __init__(self, lookup):
+        self._lookup = lookup
+        self._books = None
+        self._intervals = {}
+        self._intervals_lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self._lookup)
+
+    def get(self, chapter, default=None):
+        entries = self._lookup.get(chapter)
+        if not entries:
+            return default
+        # Indexes built by older versions lack the verse ids and features
+        for entry in entries:
+            if 'start_id' not in entry:
+                ranges = verse_ids.parse(f"{chapter}:{entry.get('verses', '')}")
+                if ranges:
+                    entry['start_id'], entry['end_id'] = ranges[0]
+            if 'start_id' in entry and 'father' not in entry:
+                entry.update(entry_features(entry.get('text', ''), entry['start_id'], entry['end_id']))
+        return [e for e in entries if 'start_id' in e]
+
+    def book_entries(self, book):
+        with self._intervals_lock:
+            if self._books is None:
+                self._books = {}
+                for chapter in self._lookup:
+                    ranges = verse_ids.parse(chapter)
+                    if ranges:
+                        self._books.setdefault(verse_ids.book_of(ranges[0][0]), []).append(chapter)
+            chapters = self._books.get(book, [])
+        return [entry for chapter in chapters for entry in self.get(chapter, [])]
+
+    def text(self, entry):
+        return entry.get('text', '')
@@ -0,0 +1,179 @@
+"""
+Split feed output for the dashboard.
+
+weekly-feed.json has to be downloaded again in full whenever anything in
+it changes. The same data is also written here as small minified shards
+named after a hash of their content, plus a manifest that lists them:
+
+  data/feed/manifest.json             -> which shards make up the feed
+  data/feed/liturgy.<hash>.json       -> readings, comment previews
+  data/feed/patristic.<hash>.json     -> full comment texts by id
+  data/feed/news-<section>.<hash>.json
+
+A shard's name changes whenever its content does, so the dashboard can
+cache shards forever and only has to revalidate the manifest. Every file
+also gets a gzipped `.gz` sibling for scripts/serve.py to send as-is.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+HASH_CHARS = 12
+# Comments longer than this ship a preview; the rest lives in the patristic shard
+PREVIEW_CHARS = 300
+
+SHARD_RE = re.compile(r'^[\w-]+\.[0-9a-f]{%d}\.json(\.gz)?$' % HASH_CHARS)
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_compressed(path, payload=None):
+    """
+    Write a gzipped sibling next to `path` (path + '.gz'). mtime=0 keeps
+    the bytes identical for identical content.
+    """
+    path = Path(path)
+    if payload is None:
+        payload = path.read_bytes()
+    gz_path = path.with_name(path.name + '.gz')
+    tmp = gz_path.with_name(gz_path.name + '.tmp')
+    tmp.write_bytes(gzip.compress(payload, compresslevel=9, mtime=0))
+    os.replace(tmp, gz_path)
+
+
+def text_id(text):
+    """Stable id for a comment text, shared by every day that quotes it."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:HASH_CHARS]
+
+
+def _preview(text):
+    cut = text[:PREVIEW_CHARS]
+    space = cut.rfind(' ')
+    return cut[:space] if space > PREVIEW_CHARS // 2 else cut
+
+
+def split_comments(comments, texts):
+    """Replace long comment texts with a preview + text_id, collecting the full texts."""
+    out = []
+    for comment in comments:
+        text = comment.get('text') or ''
+        if len(text) <= PREVIEW_CHARS:
+            out.append(comment)
+            continue
+        tid = text_id(text)
+        texts[tid] = text
+        slim = {k: v for k, v in comment.items() if k != 'text'}
+        slim['preview'] = _preview(text)
+        slim['text_id'] = tid
+        slim['length'] = len(text)
+        out.append(slim)
+    return out
+
+
+def _slim_day(day, texts):
+    if not day:
+        return day
+    day = dict(day)
+    day['patristic_comments'] = split_comments(day.get('patristic_comments') or [], texts)
+    return day
+
+
+def write_shard(directory, kind, data):
+    """Write one minified shard and return its file name."""
+    payload = _dumps(data).encode('utf-8')
+    digest = hashlib.sha256(payload).hexdigest()[:HASH_CHARS]
+    name = f'{kind}.{digest}.json'
+    path = Path(directory) / name
+    if not path.exists():
+        tmp = path.with_suffix('.json.tmp')
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+    if not path.with_name(name + '.gz').exists():
+        write_compressed(path, payload)
+    return name
+
+
+def _section_kind(section_id):
+    return 'news-' + re.sub(r'[^\w-]+', '-', str(section_id)).strip('-').lower()
+
+
+def read_manifest(directory):
+    try:
+        with open(Path(directory) / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def manifest_files(manifest):
+    if not manifest:
+        return set()
+    files = {manifest.get('liturgy'), manifest.get('patristic')}
+    files.update(s.get('file') for s in manifest.get('sections', []))
+    files.discard(None)
+    return files
+
+
+def write_feed_shards(output, directory):
+    """
+    Write the collector output as hashed shards plus manifest.json.
+
+    Shards referenced by neither the new nor the previous manifest are
+    removed, so a dashboard that loaded the old manifest a moment ago can
+    still fetch its shards. Returns the new manifest.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = read_manifest(directory)
+
+    texts = {}
+    days = [_slim_day(d, texts) for d in output.get('liturgy_days') or []]
+    liturgy = output.get('liturgy')
+    if liturgy:
+        liturgy = next((d for d in days if d['date'] == liturgy['date']), None) \
+            or _slim_day(liturgy, texts)
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generated_at': output.get('generated_at'),
+        'week': output.get('week'),
+        'liturgy': write_shard(directory, 'liturgy', {'liturgy': liturgy, 'liturgy_days': days}),
+        'patristic': write_shard(directory, 'patristic', texts),
+        'sections': [],
+    }
+    if output.get('stale'):
+        manifest['stale'] = output['stale']
+    for section in output.get('sections', []):
+        manifest['sections'].append({
+            'id': section['id'],
+            'title': section['title'],
+            'items': len(section['items']),
+            'file': write_shard(directory, _section_kind(section['id']), section),
+        })
+
+    payload = _dumps(manifest).encode('utf-8')
+    tmp = directory / (MANIFEST_NAME + '.tmp')
+    tmp.write_bytes(payload)
+    os.replace(tmp, directory / MANIFEST_NAME)
+    write_compressed(directory / MANIFEST_NAME, payload)
+
+    keep = manifest_files(manifest) | manifest_files(previous)
+    for path in directory.iterdir():
+        if SHARD_RE.match(path.name) and path.name.removesuffix('.gz') not in keep:
+            path.unlink()
+    return manifest
+
+
+def shards_size(directory, manifest):
+    """Total bytes of the manifest and the shards it lists."""
+    directory = Path(directory)
+    names = manifest_files(manifest) | {MANIFEST_NAME}
+    return sum((directory / n).stat().st_size for n in names if (directory / n).exists())
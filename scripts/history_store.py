@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Item history for the collector.
+
+An embedded SQLite store (data/history.sqlite) that remembers every news
+item the collector has seen, keyed by permalink:
+
+  items      -> latest title / summary / score of each permalink, plus
+                the first and last week it was seen
+  snapshots  -> (score, comments) each time either of them changed
+  weeks      -> every weekly output, zlib-compressed, one row per week
+  week_items -> which items made which week's sections, and at what rank
+
+Each run upserts only posts that are new or whose content or score
+changed; posts seen before with nothing new are not written at all.
+Items are indexed by source and last week, and the archive by week, so
+history lookups stay cheap as the store grows. The dashboard reads past
+weeks through scripts/serve.py (/api/history/...) instead of the repo
+keeping a JSON copy of every week. The store itself is not committed
+either: the weekly workflow keeps it as an asset of the `data-stores`
+release (`gh release download data-stores -p history.sqlite -D data`).
+
+Usage:
+  python3 scripts/history_store.py                   # Archived weeks
+  python3 scripts/history_store.py --week 2026-W06   # One week's items
+  python3 scripts/history_store.py --source r/Catholicism
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+FORMAT_VERSION = 1
+DEFAULT_PATH = Path(__file__).parent.parent / 'data' / 'history.sqlite'
+
+# Well below SQLite's limit on host parameters per statement
+LOOKUP_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    permalink   TEXT PRIMARY KEY,
+    source      TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    title       TEXT NOT NULL,
+    summary     TEXT NOT NULL,
+    thumbnail   TEXT NOT NULL,
+    created_utc INTEGER NOT NULL,
+    score       INTEGER NOT NULL,
+    comments    INTEGER NOT NULL,
+    first_week  TEXT NOT NULL,
+    last_week   TEXT NOT NULL,
+    digest      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_source ON items (source, last_week);
+CREATE INDEX IF NOT EXISTS items_last_week ON items (last_week);
+CREATE TABLE IF NOT EXISTS snapshots (
+    permalink TEXT NOT NULL,
+    taken_at  TEXT NOT NULL,
+    week      TEXT NOT NULL,
+    score     INTEGER NOT NULL,
+    comments  INTEGER NOT NULL,
+    PRIMARY KEY (permalink, taken_at)
+);
+CREATE INDEX IF NOT EXISTS snapshots_week ON snapshots (week);
+CREATE TABLE IF NOT EXISTS weeks (
+    week         TEXT PRIMARY KEY,
+    generated_at TEXT NOT NULL,
+    items        INTEGER NOT NULL,
+    output       BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS week_items (
+    week      TEXT NOT NULL,
+    section   TEXT NOT NULL,
+    rank      INTEGER NOT NULL,
+    permalink TEXT NOT NULL,
+    PRIMARY KEY (week, section, rank)
+);
+CREATE INDEX IF NOT EXISTS week_items_permalink ON week_items (permalink);
+"""
+
+_ITEM_COLUMNS = ('permalink', 'source', 'kind', 'title', 'summary', 'thumbnail',
+                 'created_utc', 'score', 'comments', 'first_week', 'last_week')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+def _post_row(post):
+    """Fields kept for a collector post (see fetch_subreddit / fetch_feed)."""
+    return {
+        'permalink': post['url'],
+        'source': post.get('source', ''),
+        'kind': post.get('kind', 'reddit'),
+        'title': post.get('title', ''),
+        'summary': (post.get('selftext') or '')[:200],
+        'thumbnail': post.get('thumbnail', ''),
+        'created_utc': int(post.get('created_utc') or 0),
+        'score': int(post.get('score') or 0),
+        'comments': int(post.get('num_comments') or 0),
+    }
+
+
+def _digest(row):
+    key = '\x1f'.join(str(row[k]) for k in ('title', 'summary', 'thumbnail', 'score', 'comments'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+class HistoryStore:
+    """
+    Read/write handle on the history store; the schema is created on
+    first use. With `readonly=True` (scripts/serve.py) the file must
+    already exist.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, readonly=False):
+        self.path = Path(path)
+        self.readonly = readonly
+        if readonly:
+            self._conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True,
+                                         check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+            self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                               ('format_version', str(FORMAT_VERSION)))
+            self._conn.commit()
+        self._lock = threading.Lock()
+
+    # ── Writing ──
+
+    def _known(self, permalinks):
+        known = {}
+        for i in range(0, len(permalinks), LOOKUP_BATCH):
+            batch = permalinks[i:i + LOOKUP_BATCH]
+            marks = ','.join('?' * len(batch))
+            for permalink, digest, last_week, score, comments in self._conn.execute(
+                    'SELECT permalink, digest, last_week, score, comments FROM items '
+                    f'WHERE permalink IN ({marks})', batch):
+                known[permalink] = (digest, last_week, score, comments)
+        return known
+
+    def record_items(self, posts, week, taken_at=None):
+        """
+        Upsert collector posts seen in `week`. Only new posts and posts
+        whose content, score or last week changed are written; a score
+        snapshot is added whenever the score or comment count moved.
+        Returns {'new', 'changed', 'unchanged'} counts.
+        """
+        taken_at = taken_at or _now()
+        rows = {}
+        for post in posts:
+            if post.get('url'):
+                rows[post['url']] = _post_row(post)
+
+        counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+        inserts, updates, snapshots = [], [], []
+        with self._lock:
+            known = self._known(list(rows))
+            for permalink, row in rows.items():
+                row['digest'] = _digest(row)
+                previous = known.get(permalink)
+                if previous is None:
+                    counts['new'] += 1
+                    inserts.append(tuple(row[k] for k in _ITEM_COLUMNS[:-2])
+                                   + (week, week, row['digest']))
+                    snapshots.append((permalink, taken_at, week, row['score'], row['comments']))
+                    continue
+                digest, last_week, score, comments = previous
+                if digest == row['digest'] and last_week >= week:
+                    counts['unchanged'] += 1
+                    continue
+                counts['changed'] += 1
+                updates.append((row['source'], row['kind'], row['title'], row['summary'],
+                                row['thumbnail'], row['score'], row['comments'],
+                                week, week, row['digest'], permalink))
+                if (score, comments) != (row['score'], row['comments']):
+                    snapshots.append((permalink, taken_at, week, row['score'], row['comments']))
+
+            conn = self._conn
+            conn.executemany(
+                f'INSERT INTO items ({", ".join(_ITEM_COLUMNS)}, digest) '
+                f'VALUES ({", ".join("?" * (len(_ITEM_COLUMNS) + 1))})', inserts)
+            conn.executemany(
+                'UPDATE items SET source = ?, kind = ?, title = ?, summary = ?, thumbnail = ?, '
+                'score = ?, comments = ?, first_week = MIN(first_week, ?), '
+                'last_week = MAX(last_week, ?), digest = ? '
+                'WHERE permalink = ?', updates)
+            conn.executemany(
+                'INSERT OR REPLACE INTO snapshots (permalink, taken_at, week, score, comments) '
+                'VALUES (?, ?, ?, ?, ?)', snapshots)
+            conn.commit()
+        return counts
+
+    def archive_week(self, output):
+        """Store a collector output as its week's archive entry (replacing a previous run's)."""
+        week = output['week']
+        sections = output.get('sections') or []
+        payload = json.dumps(output, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        ranks = [(week, section['id'], rank, item['url'])
+                 for section in sections
+                 for rank, item in enumerate(section.get('items', []))
+                 if item.get('url')]
+        with self._lock:
+            conn = self._conn
+            conn.execute(
+                'INSERT OR REPLACE INTO weeks (week, generated_at, items, output) VALUES (?, ?, ?, ?)',
+                (week, output.get('generated_at') or _now(), len(ranks), zlib.compress(payload, 9)))
+            conn.execute('DELETE FROM week_items WHERE week = ?', (week,))
+            conn.executemany(
+                'INSERT OR REPLACE INTO week_items (week, section, rank, permalink) VALUES (?, ?, ?, ?)',
+                ranks)
+            conn.commit()
+
+    # ── Reading ──
+
+    def weeks(self):
+        """Archived weeks, newest first: [{'week', 'generated_at', 'items'}]."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT week, generated_at, items FROM weeks ORDER BY week DESC').fetchall()
+        return [{'week': w, 'generated_at': g, 'items': n} for w, g, n in rows]
+
+    def week_output(self, week):
+        """The archived collector output for `week`, or None."""
+        with self._lock:
+            row = self._conn.execute('SELECT output FROM weeks WHERE week = ?', (week,)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def latest_sections(self, before=None):
+        """News sections of the newest archived week (older than `before`, if given)."""
+        with self._lock:
+            if before:
+                row = self._conn.execute(
+                    'SELECT week FROM weeks WHERE week < ? AND items > 0 ORDER BY week DESC LIMIT 1',
+                    (before,)).fetchone()
+            else:
+                row = self._conn.execute(
+                    'SELECT week FROM weeks WHERE items > 0 ORDER BY week DESC LIMIT 1').fetchone()
+        if not row:
+            return []
+        return (self.week_output(row[0]) or {}).get('sections', [])
+
+    def items(self, week=None, source=None, limit=100):
+        """
+        Items seen in `week` and/or from `source`, best score first. With
+        a week, only the items that made that week's sections.
+        """
+        columns = ', '.join('i.' + c for c in _ITEM_COLUMNS)
+        if week:
+            sql = (f'SELECT {columns}, w.section, w.rank FROM week_items w '
+                   'JOIN items i ON i.permalink = w.permalink WHERE w.week = ?')
+            params = [week]
+            if source:
+                sql += ' AND i.source = ?'
+                params.append(source)
+            sql += ' ORDER BY w.section, w.rank'
+        elif source:
+            sql = f'SELECT {columns} FROM items i WHERE i.source = ? ORDER BY i.last_week DESC, i.score DESC'
+            params = [source]
+        else:
+            sql = f'SELECT {columns} FROM items i ORDER BY i.last_week DESC, i.score DESC'
+            params = []
+        sql += ' LIMIT ?'
+        params.append(limit)
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        return [dict(zip(names, row)) for row in rows]
+
+    def last_seen(self, source=None, host=None, since=0, limit=10):
+        """
+        The items of `source` (or with a permalink on `host`) from the
+        newest week it had any created at or after `since`, best score
+        first, as collector posts (see _post_row).
+        """
+        if source:
+            where, params = 'source = ?', [source]
+        else:
+            where, params = '(permalink LIKE ? OR permalink LIKE ?)', [f'https://{host}/%',
+                                                                     f'http://{host}/%']
+        where += ' AND created_utc >= ?'
+        params.append(int(since))
+        with self._lock:
+            week, = self._conn.execute(f'SELECT MAX(last_week) FROM items WHERE {where}',
+                                       params).fetchone()
+            if week is None:
+                return []
+            rows = self._conn.execute(
+                'SELECT permalink, source, kind, title, summary, thumbnail, created_utc, score, '
+                f'comments FROM items WHERE {where} AND last_week = ? '
+                'ORDER BY score DESC, comments DESC LIMIT ?', params + [week, limit]).fetchall()
+        return [{
+            'title': title,
+            'url': permalink,
+            'source': item_source,
+            'kind': kind,
+            'score': score,
+            'num_comments': comments,
+            'created_utc': created_utc,
+            'selftext': summary,
+            'thumbnail': thumbnail,
+        } for permalink, item_source, kind, title, summary, thumbnail, created_utc, score, comments
+            in rows]
+
+    def score_history(self, permalink):
+        """[{'taken_at', 'week', 'score', 'comments'}] for one item, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT taken_at, week, score, comments FROM snapshots '
+                'WHERE permalink = ? ORDER BY taken_at', (permalink,)).fetchall()
+        return [{'taken_at': t, 'week': w, 'score': s, 'comments': c} for t, w, s, c in rows]
+
+    def stats(self):
+        with self._lock:
+            items, = self._conn.execute('SELECT COUNT(*) FROM items').fetchone()
+            snapshots, = self._conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()
+            weeks, = self._conn.execute('SELECT COUNT(*) FROM weeks').fetchone()
+        return {'items': items, 'snapshots': snapshots, 'weeks': weeks}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# ── CLI ──
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect the collector item history.')
+    parser.add_argument('--db', default=str(DEFAULT_PATH), help='History store path')
+    parser.add_argument('--week', help="Items that made a week's sections (YYYY-Www)")
+    parser.add_argument('--source', help='Items from one source (e.g. r/Catholicism)')
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if not Path(args.db).exists():
+        print(f"  No history store at {args.db}")
+        return 1
+    with HistoryStore(args.db, readonly=True) as store:
+        if not args.week and not args.source:
+            print(f"  {store.stats()}")
+            for week in store.weeks():
+                print(f"  {week['week']}: {week['items']} items (generated {week['generated_at']})")
+            return 0
+        for item in store.items(week=args.week, source=args.source, limit=args.limit):
+            where = f"[{item['section']} #{item['rank'] + 1}] " if 'section' in item else ''
+            print(f"  {where}{item['score']:>6} {item['source']}: {item['title'][:80]}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
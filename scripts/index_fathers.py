@@ -6,102 +6,183 @@ Reads the full-text extraction and produces a JSON index mapping
 Bible references (e.g. "Genesis 2:7", "Mark 7:14-23") to the
 patristic commentary text found under each heading.
 
+The text is streamed: sections go into the SQLite store as soon as
+they are read, and the JSON index is exported from the store chapter
+by chapter, so memory use does not grow with the corpus.
+
+Re-runs are incremental: the source is split into per-book segments
+whose content hashes are kept in the store, and only segments that
+changed are re-parsed (--full forces a complete rebuild).
+
+The source can also be the PDF itself (extracted with poppler's
+pdftotext) or a directory of per-page .txt files; those are split into
+page ranges and indexed on a process pool.
+
+Usage:
+  python3 scripts/index_fathers.py [/tmp/padres_iglesia_full.txt] [--full]
+  python3 scripts/index_fathers.py padres_iglesia.pdf [--workers 8]
+  python3 scripts/index_fathers.py pages/ [--pages-per-chunk 20]
+
 Output: data/fathers_index.json
+        data/fathers_index.sqlite (full texts, compressed, read by the collector,
+                                   with the full-text index of fathers_search.py)
+        data/index-run-metrics.json (timings and sizes of this run)
 """
 
+import argparse
+import hashlib
+import os
 import re
 import json
+import subprocess
 import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from collections import defaultdict
 
-# ── Bible book names (Spanish) mapped to canonical English keys ──
-# We use English keys so the lectionary API references match
-BOOK_MAP = {
+import fathers_search
+import metrics
+import verse_ids
+from fathers_store import FathersStore, StoreWriter, entry_features
+
+# ── Bible book names as they head sections in the source ──
+# Mostly Spanish; verse_ids resolves each one to its book, and the canonical
+# English name keeps the index keys matching the lectionary references
+HEADING_BOOK_NAMES = (
     # Old Testament
-    'Génesis': 'Genesis', 'Genesis': 'Genesis',
-    'Éxodo': 'Exodus', 'Exodo': 'Exodus', 'Exodus': 'Exodus',
-    'Levítico': 'Leviticus', 'Levitico': 'Leviticus',
-    'Números': 'Numbers', 'Numeros': 'Numbers',
-    'Deuteronomio': 'Deuteronomy',
-    'Josué': 'Joshua', 'Josue': 'Joshua',
-    'Jueces': 'Judges',
-    'Rut': 'Ruth', 'Ruth': 'Ruth',
-    '1 Samuel': '1 Samuel', '2 Samuel': '2 Samuel',
-    '1 Reyes': '1 Kings', '2 Reyes': '2 Kings',
-    '1 Crónicas': '1 Chronicles', '2 Crónicas': '2 Chronicles',
-    'Esdras': 'Ezra', 'Nehemías': 'Nehemiah', 'Nehemias': 'Nehemiah',
-    'Tobías': 'Tobit', 'Tobias': 'Tobit',
-    'Judit': 'Judith', 'Judith': 'Judith',
-    'Ester': 'Esther', 'Esther': 'Esther',
-    'Job': 'Job',
-    'Salmos': 'Psalms', 'Salmo': 'Psalms', 'Psalm': 'Psalms', 'Psalms': 'Psalms',
-    'Proverbios': 'Proverbs',
-    'Eclesiastés': 'Ecclesiastes', 'Eclesiastes': 'Ecclesiastes',
-    'Cantar de los Cantares': 'Song of Solomon', 'Cantar': 'Song of Solomon',
-    'Sabiduría': 'Wisdom', 'Sabiduria': 'Wisdom', 'Wisdom': 'Wisdom',
-    'Eclesiástico': 'Sirach', 'Eclesiastico': 'Sirach', 'Sirach': 'Sirach',
-    'Isaías': 'Isaiah', 'Isaias': 'Isaiah', 'Isaiah': 'Isaiah',
-    'Jeremías': 'Jeremiah', 'Jeremias': 'Jeremiah',
-    'Lamentaciones': 'Lamentations',
-    'Baruc': 'Baruch', 'Baruch': 'Baruch',
-    'Ezequiel': 'Ezekiel',
-    'Daniel': 'Daniel',
-    'Oseas': 'Hosea',
-    'Joel': 'Joel',
-    'Amós': 'Amos', 'Amos': 'Amos',
-    'Abdías': 'Obadiah', 'Abdias': 'Obadiah',
-    'Jonás': 'Jonah', 'Jonas': 'Jonah',
-    'Miqueas': 'Micah',
-    'Nahún': 'Nahum', 'Nahum': 'Nahum',
-    'Habacuc': 'Habakkuk',
-    'Sofonías': 'Zephaniah', 'Sofonias': 'Zephaniah',
-    'Ageo': 'Haggai',
-    'Zacarías': 'Zechariah', 'Zacarias': 'Zechariah',
-    'Malaquías': 'Malachi', 'Malaquias': 'Malachi',
+    'Génesis', 'Genesis',
+    'Éxodo', 'Exodo', 'Exodus',
+    'Levítico', 'Levitico',
+    'Números', 'Numeros',
+    'Deuteronomio',
+    'Josué', 'Josue',
+    'Jueces',
+    'Rut', 'Ruth',
+    '1 Samuel', '2 Samuel',
+    '1 Reyes', '2 Reyes',
+    '1 Crónicas', '2 Crónicas',
+    'Esdras', 'Nehemías', 'Nehemias',
+    'Tobías', 'Tobias',
+    'Judit', 'Judith',
+    'Ester', 'Esther',
+    'Job',
+    'Salmos', 'Salmo', 'Psalm', 'Psalms',
+    'Proverbios',
+    'Eclesiastés', 'Eclesiastes',
+    'Cantar de los Cantares', 'Cantar',
+    'Sabiduría', 'Sabiduria', 'Wisdom',
+    'Eclesiástico', 'Eclesiastico', 'Sirach',
+    'Isaías', 'Isaias', 'Isaiah',
+    'Jeremías', 'Jeremias',
+    'Lamentaciones',
+    'Baruc', 'Baruch',
+    'Ezequiel',
+    'Daniel',
+    'Oseas',
+    'Joel',
+    'Amós', 'Amos',
+    'Abdías', 'Abdias',
+    'Jonás', 'Jonas',
+    'Miqueas',
+    'Nahún', 'Nahum',
+    'Habacuc',
+    'Sofonías', 'Sofonias',
+    'Ageo',
+    'Zacarías', 'Zacarias',
+    'Malaquías', 'Malaquias',
     # New Testament
-    'Mateo': 'Matthew', 'Matthew': 'Matthew',
-    'Marcos': 'Mark', 'Mark': 'Mark',
-    'Lucas': 'Luke', 'Luke': 'Luke',
-    'Juan': 'John', 'John': 'John',
-    'Hechos': 'Acts', 'Acts': 'Acts',
-    'Romanos': 'Romans', 'Romans': 'Romans',
-    '1 Corintios': '1 Corinthians', '2 Corintios': '2 Corinthians',
-    'Gálatas': 'Galatians', 'Galatas': 'Galatians',
-    'Efesios': 'Ephesians',
-    'Filipenses': 'Philippians',
-    'Colosenses': 'Colossians',
-    '1 Tesalonicenses': '1 Thessalonians', '2 Tesalonicenses': '2 Thessalonians',
-    '1 Timoteo': '1 Timothy', '2 Timoteo': '2 Timothy',
-    'Tito': 'Titus',
-    'Filemón': 'Philemon', 'Filemon': 'Philemon',
-    'Hebreos': 'Hebrews', 'Hebrews': 'Hebrews',
-    'Santiago': 'James', 'James': 'James',
-    '1 Pedro': '1 Peter', '2 Pedro': '2 Peter',
-    '1 Juan': '1 John', '2 Juan': '2 John', '3 Juan': '3 John',
-    'Judas': 'Jude',
-    'Apocalipsis': 'Revelation', 'Revelation': 'Revelation',
-}
+    'Mateo', 'Matthew',
+    'Marcos', 'Mark',
+    'Lucas', 'Luke',
+    'Juan', 'John',
+    'Hechos', 'Acts',
+    'Romanos', 'Romans',
+    '1 Corintios', '2 Corintios',
+    'Gálatas', 'Galatas',
+    'Efesios',
+    'Filipenses',
+    'Colosenses',
+    '1 Tesalonicenses', '2 Tesalonicenses',
+    '1 Timoteo', '2 Timoteo',
+    'Tito',
+    'Filemón', 'Filemon',
+    'Hebreos', 'Hebrews',
+    'Santiago', 'James',
+    '1 Pedro', '2 Pedro',
+    '1 Juan', '2 Juan', '3 Juan',
+    'Judas',
+    'Apocalipsis', 'Revelation',
+)
+BOOK_MAP = {name: verse_ids.book_name(verse_ids.resolve_book(name)) for name in HEADING_BOOK_NAMES}
+
+# Bump when heading/section parsing changes: every segment hash changes with it,
+# so the next incremental run re-parses everything.
+PARSER_VERSION = 2
 
 # Build sorted list of book names for regex (longest first to avoid partial matches)
 ALL_BOOK_NAMES = sorted(BOOK_MAP.keys(), key=len, reverse=True)
 BOOK_PATTERN = '|'.join(re.escape(b) for b in ALL_BOOK_NAMES)
 
-# Pattern to match verse headings like "Génesis 1:1" or "Génesis 1:1-3" or "1 Reyes 10:1-10"
-# Must be at the start of a line and be the entire line (or nearly)
+# The old single-regex heading matcher ("Génesis 1:1", "1 Reyes 10:1-10").
+# Headings are found by HeadingDetector now; this is only kept as the
+# baseline benchmark_headings() compares it against.
 HEADING_RE = re.compile(
     rf'^({BOOK_PATTERN})\s+(\d+)[:\.](\d+(?:\s*[-–]\s*\d+)?)\s*$'
 )
 
-# Also match range headings like "Génesis 2:8-9"
-HEADING_RANGE_RE = re.compile(
-    rf'^({BOOK_PATTERN})\s+(\d+)[:\.](\d+)\s*[-–]\s*(\d+)\s*$'
+# What follows the book name in a heading: "7:14", "7:14-23" or the
+# cross-chapter "7:31-8:10"
+HEADING_TAIL_RE = re.compile(
+    r'\s+(\d+)[:\.](\d+(?:\s*[-–]\s*(?:\d+[:\.])?\d+)?)\s*$'
 )
 
-# Pattern for chapter-level headings like "Génesis 2:4-7" (range spanning verses)
-HEADING_CHAPTER_RANGE_RE = re.compile(
-    rf'^({BOOK_PATTERN})\s+(\d+)[:\.](\d+)\s*[-–]\s*(\d+)\s*$'
-)
+
+class HeadingDetector:
+    """
+    Verse heading detection without the big book-name alternation.
+
+    Almost no line is a heading, so two cheap checks run first: the
+    line must end in a digit, and its first token (first two for
+    numbered books like "1 Reyes") must start some BOOK_MAP name. Only
+    lines passing both are checked against the candidate names and the
+    small HEADING_TAIL_RE. Also accepts cross-chapter headings.
+    """
+
+    def __init__(self, book_names):
+        self.by_prefix = defaultdict(list)
+        for name in sorted(book_names, key=len, reverse=True):
+            self.by_prefix[self._prefix(name)].append(name)
+
+    @staticmethod
+    def _prefix(text):
+        parts = text.split(None, 2)
+        if not parts:
+            return ''
+        if len(parts) > 1 and parts[0].isdigit():
+            return f'{parts[0]} {parts[1]}'
+        return parts[0]
+
+    def match(self, line):
+        """
+        Match a stripped line. Returns (book_es, chapter, verse_str), like
+        HEADING_RE's three groups, or None.
+        """
+        if not line or not line[-1].isdigit():
+            return None
+        names = self.by_prefix.get(self._prefix(line))
+        if not names:
+            return None
+        for name in names:
+            if line.startswith(name):
+                m = HEADING_TAIL_RE.match(line, len(name))
+                if m:
+                    return name, m.group(1), m.group(2)
+        return None
+
+
+HEADINGS = HeadingDetector(BOOK_MAP)
 
 
 def normalize_reference(book_es, chapter, verse_str):
@@ -112,150 +193,486 @@ def normalize_reference(book_es, chapter, verse_str):
     return f"{book_en} {chapter}:{verse_clean}"
 
 
-def parse_verse_range(chapter, verse_str):
-    """Parse a verse string like '14-23' into a list of individual verse refs."""
-    verse_str = verse_str.strip()
-    refs = []
-
-    match = re.match(r'(\d+)\s*[-–]\s*(\d+)', verse_str)
-    if match:
-        start, end = int(match.group(1)), int(match.group(2))
-        for v in range(start, end + 1):
-            refs.append(f"{chapter}:{v}")
-        # Also add the range itself
-        refs.append(f"{chapter}:{start}-{end}")
-    else:
-        refs.append(f"{chapter}:{verse_str}")
-
-    return refs
-
-
-def index_text(text_path):
-    """Parse the full text and build the index."""
-
-    print(f"Reading {text_path}...")
-    with open(text_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    print(f"Total lines: {len(lines)}")
-
-    # Index: { "Genesis 1:1": { "text": "...", "overview": "...", "line": N } }
-    index = {}
+def split_sections(lines, stats=None, keep_lead=False):
+    """
+    Split an iterable of lines at verse headings.
+
+    Yields (ref, text_lines, line) for every heading's section, in order,
+    as soon as the next heading (or the end of input) closes it. With
+    `keep_lead`, the lines before the first heading are yielded first
+    with ref None (a parallel chunk needs them: they continue the
+    previous chunk's last section). Text lines are stripped; blank
+    lines are kept as ''. `stats`, if given, receives 'lines' and
+    'headings' counts.
+    """
     current_ref = None
     current_text_lines = []
-    current_overview = None
+    section_line = 0
     heading_count = 0
+    line_count = 0
 
     for i, line in enumerate(lines):
+        line_count = i + 1
         line_stripped = line.strip()
 
-        # Skip empty lines at the start of a section
         if not line_stripped:
-            if current_ref:
+            if current_ref or keep_lead:
                 current_text_lines.append('')
             continue
 
         # Check if this line is a verse heading
-        m = HEADING_RE.match(line_stripped)
-        if m:
-            # Save previous section
-            if current_ref and current_text_lines:
-                text = '\n'.join(current_text_lines).strip()
-                if text and len(text) > 50:  # Skip very short/empty entries
-                    index[current_ref] = {
-                        'text': text,
-                        'line': i - len(current_text_lines),
-                    }
-
-            book_es = m.group(1)
-            chapter = m.group(2)
-            verse_str = m.group(3)
+        heading = HEADINGS.match(line_stripped)
+        if heading:
+            # Close the previous section
+            if current_ref or keep_lead:
+                yield current_ref, current_text_lines, section_line
+
+            book_es, chapter, verse_str = heading
 
             current_ref = normalize_reference(book_es, chapter, verse_str)
             current_text_lines = []
+            section_line = i + 1
             heading_count += 1
 
             if heading_count % 500 == 0:
                 print(f"  Processed {heading_count} headings... (currently at {current_ref})")
-        else:
-            if current_ref:
-                current_text_lines.append(line_stripped)
-
-    # Save last section
-    if current_ref and current_text_lines:
-        text = '\n'.join(current_text_lines).strip()
-        if text and len(text) > 50:
-            index[current_ref] = {
-                'text': text,
-                'line': len(lines) - len(current_text_lines),
-            }
-
-    print(f"\nTotal verse headings found: {heading_count}")
+        elif current_ref or keep_lead:
+            current_text_lines.append(line_stripped)
+
+    # Close the last section
+    if current_ref or keep_lead:
+        yield current_ref, current_text_lines, section_line
+
+    if stats is not None:
+        stats['lines'] = line_count
+        stats['headings'] = heading_count
+
+
+def section_text(text_lines):
+    """Join a section's lines, or None if it is too short to be a real entry."""
+    text = '\n'.join(text_lines).strip()
+    if text and len(text) > 50:  # Skip very short/empty entries
+        return text
+    return None
+
+
+def iter_sections(lines, stats=None):
+    """
+    Stream (ref, text, line) sections out of an iterable of lines.
+
+    Only the section being read is held in memory; each one is yielded
+    as soon as the next heading (or the end of input) closes it.
+    """
+    for ref, text_lines, line in split_sections(lines, stats):
+        text = section_text(text_lines)
+        if text:
+            yield ref, text, line
+
+
+def index_text(text_path):
+    """Parse the full text and build the index in memory."""
+
+    print(f"Reading {text_path}...")
+    stats = {}
+    # Index: { "Genesis 1:1": { "text": "...", "line": N } }
+    index = {}
+    with open(text_path, 'r', encoding='utf-8') as f:
+        for ref, text, line in iter_sections(f, stats):
+            index[ref] = {'text': text, 'line': line}
+
+    print(f"Total lines: {stats['lines']}")
+    print(f"\nTotal verse headings found: {stats['headings']}")
     print(f"Index entries with content: {len(index)}")
 
     return index
 
 
-def build_lookup_index(index):
+def lookup_entry(ref, text, max_text=2000):
+    """
+    Turn one indexed section into (chapter_key, entry), or None if the
+    reference can't be resolved to verse ids.
+
+    Each entry gets its packed verse ids (see verse_ids.py) and
+    precomputed features (father, length, span) so the collector only
+    has to filter and sort stored values. The text is capped at
+    `max_text` chars (None keeps it whole, as the SQLite store does).
+    """
+    m = re.match(r'(.+?)\s+(\d+):(.+)', ref)
+    ranges = verse_ids.parse(ref) if m else None
+    if not ranges:
+        return None
+    start_id, end_id = ranges[0][0], ranges[-1][1]
+    return verse_ids.chapter_key(start_id), {
+        'ref': ref,
+        'verses': m.group(3),
+        'start_id': start_id,
+        'end_id': end_id,
+        # Author, length and span come from the full text, once
+        **entry_features(text, start_id, end_id),
+        'text': text[:max_text],  # Capped to keep the JSON index manageable
+    }
+
+
+def build_lookup_index(index, max_text=2000):
     """
     Build a lookup-friendly index where we can find content by:
     - Exact reference: "Mark 7:14-23"
     - Individual verse: "Mark 7:14", "Mark 7:15", etc.
     - Chapter: "Mark 7"
 
-    Returns a more compact format for the JSON output.
+    Returns a more compact format for the JSON output (see lookup_entry).
     """
     # Group by book and chapter for efficient lookup
     by_book_chapter = defaultdict(list)
 
     for ref, data in index.items():
-        # Parse reference
-        m = re.match(r'(.+?)\s+(\d+):(.+)', ref)
-        if m:
-            book = m.group(1)
-            chapter = m.group(2)
-            verses = m.group(3)
-
-            by_book_chapter[f"{book} {chapter}"].append({
-                'ref': ref,
-                'verses': verses,
-                'text': data['text'][:2000],  # Cap at 2000 chars to keep index manageable
-            })
+        item = lookup_entry(ref, data['text'], max_text)
+        if item:
+            chapter_key, entry = item
+            by_book_chapter[chapter_key].append(entry)
+
+    # Sorted by start verse so lookups can bisect
+    for entries in by_book_chapter.values():
+        entries.sort(key=lambda e: (e['start_id'], e['end_id']))
 
     return dict(by_book_chapter)
 
 
-def main():
-    text_path = '/tmp/padres_iglesia_full.txt'
+def segment_source(lines):
+    """
+    Split the source at book boundaries (a heading whose canonical book
+    differs from the previous one) and hash each segment.
+
+    Returns [(key, hash, first_line, line_count)]. Keys are "Mark#1"
+    style (book + occurrence), so editing one book leaves every other
+    key and hash unchanged. The hash is seeded with PARSER_VERSION so
+    parser changes invalidate everything.
+    """
+    segments = []
+    seen = defaultdict(int)
+    seed = f'parser-v{PARSER_VERSION}\n'.encode('utf-8')
+    key, first_line, digest, current_book = 'preamble#1', 0, hashlib.sha256(seed), None
+    line_count = 0
+
+    for i, line in enumerate(lines):
+        line_count = i + 1
+        heading = HEADINGS.match(line.strip())
+        if heading:
+            book = BOOK_MAP.get(heading[0], heading[0])
+            if book != current_book:
+                if i > first_line:
+                    segments.append((key, digest.hexdigest(), first_line, i - first_line))
+                seen[book] += 1
+                key, first_line, digest, current_book = f'{book}#{seen[book]}', i, hashlib.sha256(seed), book
+        digest.update(line.encode('utf-8'))
+
+    if line_count > first_line:
+        segments.append((key, digest.hexdigest(), first_line, line_count - first_line))
+    return segments
+
+
+def build_store(text_path, store_path, full=False):
+    """
+    Parse `text_path` into the SQLite store, section by section, so
+    memory stays flat regardless of corpus size.
+
+    Unless `full`, an existing store is updated incrementally: only
+    segments whose content hash differs from the store's manifest are
+    re-parsed and rewritten. Returns build stats.
+    """
+    print(f"Segmenting {text_path}...")
+    started = time.perf_counter()
+    with open(text_path, 'r', encoding='utf-8') as f:
+        segments = segment_source(f)
+    total_lines = sum(seg[3] for seg in segments)
+
+    stats = {'lines': total_lines, 'segments': len(segments), 'changed': 0, 'headings': 0}
+    with StoreWriter(store_path, incremental=not full) as writer:
+        previous = writer.segment_hashes() if writer.incremental else {}
+        mode = 'incremental' if writer.incremental else 'full'
+        print(f"Building {store_path} ({mode}, {len(segments)} segments)...")
+
+        with open(text_path, 'r', encoding='utf-8') as f:
+            for key, digest, first_line, line_count in segments:
+                chunk = islice(f, line_count)
+                if previous.get(key) == digest:
+                    deque(chunk, maxlen=0)  # skip the unchanged segment's lines
+                    writer.keep_segment(key, first_line)
+                    continue
+
+                writer.begin_segment(key)
+                seg_stats = {}
+                for ref, text, _line in iter_sections(chunk, seg_stats):
+                    item = lookup_entry(ref, text, max_text=None)
+                    if item:
+                        writer.add(*item)
+                writer.end_segment(key, digest, first_line)
+                stats['changed'] += 1
+                stats['headings'] += seg_stats.get('headings', 0)
+
+        removed = writer.retain_segments(seg[0] for seg in segments)
+    stats['removed'] = len(removed)
+    stats['entries'] = writer.count
+
+    elapsed = time.perf_counter() - started
+    print(f"Total lines: {stats['lines']} ({stats['lines'] / max(elapsed, 1e-9):,.0f} lines/s)")
+    print(f"Segments re-parsed: {stats['changed']}/{stats['segments']}"
+          + (f", removed: {stats['removed']}" if removed else ''))
+    print(f"Verse headings parsed: {stats['headings']}")
+    print(f"Index entries with content: {stats['entries']}")
+    return stats
+
+
+def benchmark_headings(text_path, rounds=3):
+    """
+    Time HeadingDetector against the legacy HEADING_RE over every line of
+    `text_path` and report lines/second for both (best of `rounds`).
+    """
+    with open(text_path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    print(f"Benchmarking heading detection on {len(lines):,} lines of {text_path}")
+
+    def best_time(fn):
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            found = sum(1 for line in lines if line and fn(line))
+            best = min(best, time.perf_counter() - start)
+        return best, found
+
+    regex_time, regex_found = best_time(HEADING_RE.match)
+    fast_time, fast_found = best_time(HEADINGS.match)
+    print(f"  HEADING_RE:      {len(lines) / regex_time:>14,.0f} lines/s  ({regex_found} headings)")
+    print(f"  HeadingDetector: {len(lines) / fast_time:>14,.0f} lines/s  ({fast_found} headings)")
+    print(f"  Speedup: {regex_time / fast_time:.1f}x"
+          + (f" (+{fast_found - regex_found} cross-chapter)" if fast_found > regex_found else ''))
+
+
+# ── Parallel build from the PDF ──
+
+def _natural_key(path):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path.name)]
+
+
+def list_pages(source):
+    """
+    Page units of `source`: page numbers of a PDF (via poppler's pdfinfo),
+    or the .txt files of a directory of extracted pages in natural order.
+    """
+    source = Path(source)
+    if source.is_dir():
+        return sorted((p for p in source.iterdir() if p.suffix == '.txt'), key=_natural_key)
+    out = subprocess.run(['pdfinfo', str(source)], capture_output=True, text=True,
+                         check=True).stdout
+    m = re.search(r'^Pages:\s+(\d+)', out, re.MULTILINE)
+    if not m:
+        raise ValueError(f"Could not read the page count of {source}")
+    return list(range(1, int(m.group(1)) + 1))
+
+
+def extract_pages(source, pages):
+    """Text lines of a run of pages (pdftotext for a PDF, file reads for a directory)."""
+    if isinstance(pages[0], Path):
+        lines = []
+        for page in pages:
+            with open(page, 'r', encoding='utf-8') as f:
+                lines.extend(f)
+        return lines
+    out = subprocess.run(
+        ['pdftotext', '-f', str(pages[0]), '-l', str(pages[-1]), '-enc', 'UTF-8', str(source), '-'],
+        capture_output=True, check=True).stdout
+    return out.decode('utf-8', errors='replace').splitlines()
+
+
+def index_chunk(task):
+    """
+    Process-pool worker: extract one page range and parse it.
+
+    Returns the chunk's lead lines (before its first heading), the
+    entries of every section that closes inside the chunk, and the
+    still-open last section as `tail`. The parent stitches each tail
+    to the next chunk's lead, so sections crossing a chunk boundary
+    come out exactly as in a sequential parse.
+    """
+    source, pages = task
+    stats = {}
+    parts = list(split_sections(extract_pages(source, pages), stats, keep_lead=True))
+    lead = parts.pop(0)[1] if parts and parts[0][0] is None else []
+    tail = parts.pop() if parts else None
+
+    entries = []
+    for ref, text_lines, _line in parts:
+        text = section_text(text_lines)
+        item = lookup_entry(ref, text, max_text=None) if text else None
+        if item:
+            entries.append(item)
+    return {
+        'lead': lead,
+        'entries': entries,
+        'tail': tail[:2] if tail else None,
+        'lines': stats.get('lines', 0),
+        'headings': stats.get('headings', 0),
+    }
+
+
+def build_store_parallel(source, store_path, workers=None, pages_per_chunk=None):
+    """
+    Build the store straight from a PDF or a directory of page files.
+
+    Page ranges are extracted and parsed on a process pool; results are
+    merged strictly in page order, so the store is identical to a
+    sequential parse of the concatenated text. Always a full build.
+    """
+    pages = list_pages(source)
+    if not pages:
+        raise ValueError(f"No pages found in {source}")
+    workers = workers or os.cpu_count() or 1
+    if not pages_per_chunk:
+        # A few chunks per worker keeps the pool busy when page costs vary
+        pages_per_chunk = max(1, -(-len(pages) // (workers * 4)))
+    tasks = [(str(source), pages[i:i + pages_per_chunk])
+             for i in range(0, len(pages), pages_per_chunk)]
+    print(f"Indexing {len(pages)} pages of {source} in {len(tasks)} chunks on {workers} processes...")
+    started = time.perf_counter()
+
+    stats = {'lines': 0, 'headings': 0, 'segments': 0, 'changed': 0, 'removed': 0}
+    pending = None  # (ref, text_lines) of a section still open at the last chunk's end
+
+    def close_pending(writer):
+        text = section_text(pending[1])
+        item = lookup_entry(pending[0], text, max_text=None) if text else None
+        if item:
+            writer.add(*item)
+
+    with StoreWriter(store_path) as writer, ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(index_chunk, tasks):
+            stats['lines'] += result['lines']
+            stats['headings'] += result['headings']
+            if pending:
+                pending[1].extend(result['lead'])
+            if result['tail'] is None:
+                continue  # no heading in this chunk: the open section goes on
+            if pending:
+                close_pending(writer)
+            for chapter, entry in result['entries']:
+                writer.add(chapter, entry)
+            pending = result['tail']
+        if pending:
+            close_pending(writer)
+    stats['entries'] = writer.count
+
+    elapsed = time.perf_counter() - started
+    print(f"Total lines: {stats['lines']} ({stats['lines'] / max(elapsed, 1e-9):,.0f} lines/s)")
+    print(f"Verse headings parsed: {stats['headings']}")
+    print(f"Index entries with content: {stats['entries']}")
+    return stats
+
+
+def export_json(store, out_path, max_text=2000):
+    """
+    Write fathers_index.json from the store one chapter at a time
+    (one chapter per line), so the full lookup dict never exists in RAM.
+    """
+    tmp = out_path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write('{')
+        for i, chapter in enumerate(store.chapters()):
+            entries = sorted(store.get(chapter), key=lambda e: (e['start_id'], e['end_id']))
+            for entry in entries:
+                entry['text'] = store.text(entry)[:max_text]
+                del entry['id']
+            f.write('\n' if i == 0 else ',\n')
+            f.write(json.dumps(chapter, ensure_ascii=False))
+            f.write(': ')
+            f.write(json.dumps(entries, ensure_ascii=False))
+        f.write('\n}\n')
+    tmp.replace(out_path)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Index the patristic commentary text.')
+    parser.add_argument('source', nargs='?', default='/tmp/padres_iglesia_full.txt',
+                        help='The book as a PDF, a directory of per-page .txt files, '
+                             'or a full-text extraction (default: %(default)s)')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild every segment instead of only the changed ones')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes for PDF/page-directory builds (default: CPU count)')
+    parser.add_argument('--pages-per-chunk', type=int, default=None,
+                        help='Pages per worker task (default: about 4 chunks per worker)')
+    parser.add_argument('--bench-headings', action='store_true',
+                        help='Only compare heading detection speed against HEADING_RE on a text file')
+    parser.add_argument('--metrics-history', metavar='PATH',
+                        help='Also append the run metrics to this JSONL file')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the build and export steps with cProfile (data/.profiles/index)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    source = Path(args.source)
+    if args.bench_headings:
+        benchmark_headings(source)
+        return
 
     # Output directory
     out_dir = Path(__file__).parent.parent / 'data'
     out_dir.mkdir(exist_ok=True)
+    run_metrics = metrics.start('index_fathers',
+                                profile_dir=out_dir / '.profiles' / 'index' if args.profile else None)
+    metrics.set_value('source', str(source))
+
+    # Step 1: Parse and stream entries into the store (full texts)
+    store_path = out_dir / 'fathers_index.sqlite'
+    with metrics.stage('build'):
+        if source.is_dir() or source.suffix.lower() == '.pdf':
+            stats = build_store_parallel(source, store_path, args.workers, args.pages_per_chunk)
+        else:
+            stats = build_store(source, store_path, full=args.full)
+        for key, value in stats.items():
+            metrics.set_value(key, value)
+
+    # Step 1b: Rebuild the full-text index if any entry changed
+    if stats['changed'] or stats['removed'] or not fathers_search.has_search_index(store_path):
+        with metrics.stage('search_index'):
+            documents, terms, postings_bytes = fathers_search.build_search_index(store_path)
+            metrics.set_value('terms', terms)
+            metrics.set_value('postings_bytes', postings_bytes)
+        print(f"Search index: {terms} terms over {documents} entries "
+              f"({postings_bytes / 1024:.0f} KB of postings)")
+    else:
+        print("No segment changed; search index left as is")
 
-    # Step 1: Parse and index
-    index = index_text(text_path)
-
-    # Step 2: Build lookup-friendly structure
-    lookup = build_lookup_index(index)
+    store = FathersStore(store_path)
+    store_size = store_path.stat().st_size / (1024 * 1024)
+    print(f"\nStore saved to {store_path} ({store_size:.1f} MB)")
+    metrics.set_value('store_bytes', store_path.stat().st_size)
 
-    # Step 3: Save full index
+    # Step 2: Export the JSON index (capped texts) chapter by chapter
     out_path = out_dir / 'fathers_index.json'
-    with open(out_path, 'w', encoding='utf-8') as f:
-        json.dump(lookup, f, ensure_ascii=False, indent=1)
+    if stats['changed'] or stats['removed'] or stats['segments'] == 0 or not out_path.exists():
+        with metrics.stage('export_json'):
+            export_json(store, out_path)
+    else:
+        print("No segment changed; JSON index left as is")
+    metrics.set_value('json_bytes', out_path.stat().st_size)
+    run_metrics.write(out_dir / 'index-run-metrics.json', args.metrics_history)
 
     file_size = out_path.stat().st_size / (1024 * 1024)
-    print(f"\nIndex saved to {out_path}")
+    print(f"Index saved to {out_path}")
     print(f"File size: {file_size:.1f} MB")
-    print(f"Books/chapters indexed: {len(lookup)}")
 
-    # Step 4: Show some stats
+    chapter_keys = store.chapters()
+    print(f"Books/chapters indexed: {len(chapter_keys)}")
+
+    # Step 3: Show some stats
     print("\n── Sample entries ──")
-    sample_keys = list(lookup.keys())[:5]
-    for key in sample_keys:
-        entries = lookup[key]
+    for key in chapter_keys[:5]:
+        entries = store.get(key)
         print(f"  {key}: {len(entries)} verse(s)")
         for entry in entries[:2]:
-            print(f"    - {entry['ref']}: {entry['text'][:100]}...")
+            print(f"    - {entry['ref']}: {store.text(entry)[:100]}...")
 
     # Show NT coverage (most relevant for daily Mass readings)
     nt_books = ['Matthew', 'Mark', 'Luke', 'John', 'Acts', 'Romans',
@@ -267,9 +684,9 @@ def main():
 
     print("\n── New Testament coverage ──")
     for book in nt_books:
-        chapters = [k for k in lookup.keys() if k.startswith(book + ' ')]
+        chapters = [k for k in chapter_keys if k.startswith(book + ' ')]
         if chapters:
-            total_verses = sum(len(lookup[c]) for c in chapters)
+            total_verses = sum(len(store.get(c)) for c in chapters)
             print(f"  {book}: {len(chapters)} chapters, {total_verses} verse entries")
 
 
@@ -0,0 +1,143 @@
+"""
+Run metrics for the collector and the indexer.
+
+One RunMetrics per process (see start()). Code anywhere below it calls
+the module-level count() / add_time() / set_value() helpers; they are
+no-ops until a run is started. Values are filed under the stage that is
+running in the current context (stage() sets it), so HTTP bytes, status
+codes, retries, backoff and cache hits end up next to the stage that
+caused them. Runs are written as JSON, optionally appended to a JSONL
+history for week-over-week graphs.
+
+With profiling on, stage() also runs the block under cProfile and dumps
+a .prof file per stage (`python3 -m pstats FILE` to read it).
+"""
+
+import contextvars
+import cProfile
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+RUN_SCOPE = 'run'
+
+_current_stage = contextvars.ContextVar('metrics_stage', default=None)
+_run = None
+
+
+class RunMetrics:
+    """Counters, timings and values for one run, grouped by stage."""
+
+    def __init__(self, script, profile_dir=None):
+        self.script = script
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self.scopes = {RUN_SCOPE: {}}
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self._lock = threading.Lock()
+
+    def _scope(self, stage):
+        return self.scopes.setdefault(stage or _current_stage.get() or RUN_SCOPE, {})
+
+    def count(self, key, n=1, stage=None):
+        with self._lock:
+            scope = self._scope(stage)
+            scope[key] = scope.get(key, 0) + n
+
+    def add_time(self, key, seconds, stage=None):
+        with self._lock:
+            scope = self._scope(stage)
+            scope[key] = round(scope.get(key, 0.0) + seconds, 6)
+
+    def set_value(self, key, value, stage=None):
+        with self._lock:
+            self._scope(stage)[key] = value
+
+    def to_dict(self):
+        with self._lock:
+            run = dict(self.scopes[RUN_SCOPE])
+            stages = {name: dict(values) for name, values in self.scopes.items()
+                      if name != RUN_SCOPE}
+        return {
+            'script': self.script,
+            'started_at': self.started_at.isoformat().replace('+00:00', 'Z'),
+            'seconds': round(time.perf_counter() - self._started, 3),
+            'run': run,
+            'stages': stages,
+        }
+
+    def write(self, path, history=None):
+        """Write the run to `path` and, if given, append it to a JSONL `history`."""
+        data = self.to_dict()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        tmp.replace(path)
+        if history:
+            history = Path(history)
+            history.parent.mkdir(parents=True, exist_ok=True)
+            with open(history, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n')
+        return data
+
+
+def start(script, profile_dir=None):
+    """Begin collecting metrics for this process and return the RunMetrics."""
+    global _run
+    _run = RunMetrics(script, profile_dir)
+    return _run
+
+
+def current():
+    return _run
+
+
+def count(key, n=1, stage=None):
+    if _run is not None:
+        _run.count(key, n, stage)
+
+
+def add_time(key, seconds, stage=None):
+    if _run is not None:
+        _run.add_time(key, seconds, stage)
+
+
+def set_value(key, value, stage=None):
+    if _run is not None:
+        _run.set_value(key, value, stage)
+
+
+def copy_context():
+    """Context to run work in on another thread so it counts towards this stage."""
+    return contextvars.copy_context()
+
+
+@contextmanager
+def stage(name):
+    """
+    File everything recorded inside the block under stage `name` and
+    time it. Profiles the block when the run has a profile_dir.
+    """
+    token = _current_stage.set(name)
+    profiler = None
+    if _run is not None and _run.profile_dir:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time('seconds', time.perf_counter() - started)
+        if profiler:
+            profiler.disable()
+            _run.profile_dir.mkdir(parents=True, exist_ok=True)
+            path = _run.profile_dir / (re.sub(r'[^\w.-]+', '_', name) + '.prof')
+            profiler.dump_stats(path)
+            set_value('profile', str(path))
+        _current_stage.reset(token)
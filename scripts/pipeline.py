@@ -0,0 +1,209 @@
+"""
+Tiny stage graph runner for the collector.
+
+Stages declare the stages they depend on; independent stages run at the
+same time on a thread pool. Every successful result is written to a JSON
+checkpoint so a later `resume` run only re-executes stages that failed,
+are missing, are older than `max_age`, or whose inputs were re-executed.
+
+A failed stage's checkpoint keeps the last good result it replaces, and
+with `stale_fallback` a stage that fails (or is still running when the
+run's `deadline` passes) is given that result with status 'stale'.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import metrics
+
+
+class StageFailed(Exception):
+    """Raised by a stage function when it produced nothing usable."""
+
+
+class Stage:
+    """
+    A named unit of work. `fn` receives a dict of dependency results
+    keyed by stage name and returns a JSON-serializable result.
+    """
+
+    def __init__(self, name, fn, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class StageResult:
+    """Outcome of a stage: status is 'ok', 'cached', 'stale', 'failed' or 'skipped'."""
+
+    def __init__(self, name, status, result=None, elapsed=0.0, error=''):
+        self.name = name
+        self.status = status
+        self.result = result
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def succeeded(self):
+        return self.status in ('ok', 'cached', 'stale')
+
+
+# ── Checkpoints ──
+
+def _checkpoint_path(checkpoint_dir, name):
+    return Path(checkpoint_dir) / f'{name}.json'
+
+
+def load_checkpoint(checkpoint_dir, name, max_age=None):
+    """Return the checkpointed result for a stage, or None if missing/stale."""
+    path = _checkpoint_path(checkpoint_dir, name)
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('status') != 'ok':
+        return None
+    if max_age is not None and time.time() - data.get('saved_at', 0) > max_age:
+        return None
+    return data
+
+
+def load_last_good(checkpoint_dir, name):
+    """The newest successful checkpoint of a stage, however old: {'saved_at', 'result'} or None."""
+    data = load_checkpoint(checkpoint_dir, name)
+    if data is not None:
+        return {'saved_at': data.get('saved_at', 0), 'result': data.get('result')}
+    path = _checkpoint_path(checkpoint_dir, name)
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('last_good')
+    except (OSError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint_dir, name, status, result=None, error=''):
+    """Write a stage checkpoint atomically. A failure keeps the last good result."""
+    path = _checkpoint_path(checkpoint_dir, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    last_good = None if status == 'ok' else load_last_good(checkpoint_dir, name)
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({
+            'stage': name,
+            'status': status,
+            'saved_at': time.time(),
+            'error': error,
+            'result': result,
+            **({'last_good': last_good} if last_good else {}),
+        }, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+# ── Runner ──
+
+def _run_one(stage, inputs):
+    start = time.perf_counter()
+    try:
+        with metrics.stage(stage.name):
+            result = stage.fn(inputs)
+        return StageResult(stage.name, 'ok', result, time.perf_counter() - start)
+    except Exception as e:
+        return StageResult(stage.name, 'failed', None, time.perf_counter() - start, str(e))
+
+
+def _fall_back(outcome, checkpoint_dir):
+    """A failed outcome replaced by the stage's last good result, if there is one."""
+    last_good = load_last_good(checkpoint_dir, outcome.name) if checkpoint_dir else None
+    if last_good is None:
+        return outcome
+    return StageResult(outcome.name, 'stale', last_good['result'], outcome.elapsed, outcome.error)
+
+
+def run_stages(stages, checkpoint_dir=None, resume=False, max_age=None, max_workers=4,
+               deadline=None, stale_fallback=False):
+    """
+    Run stages in dependency order, in parallel where possible.
+
+    Returns {name: StageResult}. A stage whose dependency failed is
+    marked 'skipped'. With `resume`, fresh checkpoints are reused
+    instead of re-running the stage.
+
+    With a `deadline` (transport.Deadline), stages still running when it
+    passes are abandoned and stages not started yet are not started;
+    both count as failed with the error 'deadline exceeded'. Only
+    network time is bounded: abandoned stages are still waited for
+    before returning, and while every fetch they make past the deadline
+    is refused at once, local work already under way (loading the
+    fathers index, writing to a store) runs to completion. With
+    `stale_fallback`, failed stages get their last good checkpoint.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Stage {s.name!r} depends on unknown stage(s): {missing}")
+
+    results = {}
+    pending = list(stages)
+    running = {}
+
+    def finish(outcome, save=True):
+        if save and checkpoint_dir:
+            save_checkpoint(checkpoint_dir, outcome.name, outcome.status,
+                            outcome.result, outcome.error)
+        if stale_fallback and outcome.status in ('failed', 'skipped'):
+            outcome = _fall_back(outcome, checkpoint_dir)
+        results[outcome.name] = outcome
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while pending or running:
+            progressed = False
+            for stage in list(pending):
+                if not all(d in results for d in stage.deps):
+                    continue
+                pending.remove(stage)
+                progressed = True
+                deps = [results[d] for d in stage.deps]
+                if not all(d.succeeded for d in deps):
+                    finish(StageResult(stage.name, 'skipped', error='dependency failed'), save=False)
+                    continue
+                # Reuse a checkpoint only if none of the inputs changed this run
+                if resume and checkpoint_dir and all(d.status == 'cached' for d in deps):
+                    cached = load_checkpoint(checkpoint_dir, stage.name, max_age)
+                    if cached is not None:
+                        results[stage.name] = StageResult(stage.name, 'cached', cached['result'])
+                        continue
+                if deadline is not None and deadline.expired():
+                    finish(StageResult(stage.name, 'failed', error='deadline exceeded'))
+                    continue
+                inputs = {d.name: d.result for d in deps}
+                running[pool.submit(_run_one, stage, inputs)] = (stage, time.perf_counter())
+
+            if not running:
+                if pending and not progressed:
+                    names = [s.name for s in pending]
+                    raise ValueError(f"Dependency cycle between stages: {names}")
+                continue
+            timeout = deadline.remaining() if deadline is not None else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.pop(future)
+                finish(future.result())
+            if not done and deadline is not None and deadline.expired():
+                # Their results are dropped; shutdown() below waits for the threads
+                for future, (stage, started) in running.items():
+                    future.cancel()
+                    finish(StageResult(stage.name, 'failed', elapsed=time.perf_counter() - started,
+                                       error='deadline exceeded'))
+                running.clear()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return results
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Fill the reading text store (data/readings.sqlite) for a whole
+liturgical year in one job.
+
+Every day's references come from cpbjr; USCCB is only scraped for days
+with a reading the store doesn't have yet, so re-running is cheap and
+picks up where a failed run stopped. Psalms are stored under their
+date, so once a year is in, the weekly collector finds every text of
+its week in the store and makes no USCCB request.
+
+Usage:
+  python3 scripts/prefill_readings.py                  # Current liturgical year
+  python3 scripts/prefill_readings.py --year 2027      # Advent 2026 .. Advent 2027
+  python3 scripts/prefill_readings.py --from 2026-01-01 --to 2026-03-31
+"""
+
+import argparse
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+import collect_feed
+import transport
+
+DEFAULT_WORKERS = 4
+
+
+def advent_sunday(year):
+    """First Sunday of Advent of `year` (the Sunday between Nov 27 and Dec 3)."""
+    nov27 = date(year, 11, 27)
+    return nov27 + timedelta(days=(6 - nov27.weekday()) % 7)
+
+
+def liturgical_year(today=None):
+    """The liturgical year `today` falls in, named after the year it ends in."""
+    today = today or date.today()
+    return today.year + 1 if today >= advent_sunday(today.year) else today.year
+
+
+def liturgical_year_dates(year):
+    """Every date from the First Sunday of Advent of year-1 to the day before the next one."""
+    day, end = advent_sunday(year - 1), advent_sunday(year)
+    dates = []
+    while day < end:
+        dates.append(day.isoformat())
+        day += timedelta(days=1)
+    return dates
+
+
+def prefill_day(date_str, store):
+    """Store one day's reading texts. Returns what happened, for the summary."""
+    api_data = collect_feed.fetch_readings(date_str)
+    readings = collect_feed.build_readings_list(api_data)
+    if not readings:
+        return 'no readings'
+    if all(store.get(r['reference'], r['type'], date_str) for r in readings):
+        return 'already stored'
+    usccb_link = api_data.get('usccbLink', '')
+    if not usccb_link:
+        return 'no USCCB link'
+    scraped = collect_feed.fetch_reading_texts(usccb_link)
+    if not collect_feed.store_reading_texts(readings, scraped, store, usccb_link, date_str):
+        print(f"  {date_str}: no texts scraped")
+        return 'failed'
+    return 'scraped'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Prefill the reading text store.')
+    parser.add_argument('--year', type=int,
+                        help='Liturgical year, named after the year it ends in (default: current)')
+    parser.add_argument('--from', dest='date_from', metavar='DATE',
+                        help='Prefill every day from DATE (YYYY-MM-DD) instead of a whole year...')
+    parser.add_argument('--to', dest='date_to', metavar='DATE',
+                        help='...up to and including DATE (default: --from)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Days fetched in parallel (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk HTTP cache')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.date_from:
+        dates = collect_feed.date_range(args.date_from, args.date_to or args.date_from)
+        label = f'{dates[0]} .. {dates[-1]}'
+    else:
+        year = args.year or liturgical_year()
+        dates = liturgical_year_dates(year)
+        label = f'liturgical year {year} ({dates[0]} .. {dates[-1]})'
+
+    print(f"=== Prefilling reading texts for {label} ===\n")
+    collect_feed.configure_http_cache(collect_feed.load_config(), enabled=not args.no_cache)
+    store = collect_feed.get_reading_store()
+    before = len(store)
+    started = time.perf_counter()
+
+    outcomes = transport.map_concurrent(lambda d: prefill_day(d, store), dates,
+                                        max_workers=args.workers)
+
+    summary = Counter(outcomes)
+    print(f"\n  Days: {len(dates)} in {time.perf_counter() - started:.1f}s")
+    for outcome, n in summary.most_common():
+        print(f"    {outcome}: {n}")
+    print(f"  Reading store: {len(store)} texts (+{len(store) - before}) in "
+          f"{collect_feed.READING_STORE_PATH}")
+    return 1 if summary.get('failed') else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
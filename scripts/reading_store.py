@@ -0,0 +1,151 @@
+"""
+Permanent store of cleaned reading texts.
+
+Lectionary readings repeat across the Sunday (A/B/C) and weekday (I/II)
+cycles, so a text scraped once from USCCB is kept in
+data/readings.sqlite under its reading type and canonical reference:
+the merged verse id ranges from verse_ids, down to verse letters
+("Psalm 23:1-3a, 3b-4, 5, 6" and "Ps 23:1-6" share a key, "Ps 23:1-3a"
+does not). The type keeps a canticle sung as the psalm apart from the
+same passage read as a reading.
+
+A Responsorial Psalm carries the day's refrain ("R. (30a) ..."), which
+differs between days with the same verses, so psalms are keyed by date
+instead ("psalm:2026-02-09") and only match a lookup for the same
+reference. The collector looks texts up here before scraping and adds
+every successful scrape; a day whose readings are all stored needs no
+USCCB request. scripts/prefill_readings.py fills a whole liturgical
+year in one go. Like the history store, the file lives outside git, as
+an asset of the `data-stores` release the weekly workflow updates.
+"""
+
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+
+import verse_ids
+
+FORMAT_VERSION = 2
+
+# Reading types whose text depends on the day, not only on the reference
+DATED_KINDS = frozenset({'psalm'})
+
+# Rank of a verse letter within its verse; a whole verse ends after any letter
+_WHOLE = 99
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS texts (
+    key        TEXT PRIMARY KEY,
+    reference  TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    text       BLOB NOT NULL,
+    source     TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+"""
+
+
+def _merge_parts(parts):
+    """
+    Merge verse_ids.parse_parts() ranges that overlap or touch, letters
+    included: "1-3a, 3b-4" -> 1-4, but "1-3a" stays 1-3a. Returns
+    [((start id, rank), (end id, rank))].
+    """
+    points = sorted(((start, ord(first) - 97 if first else 0),
+                     (end, ord(last) - 97 if last else _WHOLE))
+                    for start, end, first, last in parts)
+    merged = []
+    for start, end in points:
+        if merged:
+            last_end = merged[-1][1]
+            touches = (start <= last_end or start == (last_end[0], last_end[1] + 1)
+                       or (last_end[1] == _WHOLE and start == (last_end[0] + 1, 0)))
+            if touches:
+                merged[-1] = (merged[-1][0], max(last_end, end))
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def _point(vid, rank, whole):
+    return str(vid) if rank == whole else f'{vid}{chr(97 + rank)}'
+
+
+def reference_key(reference, kind, date=None):
+    """
+    Canonical key of a reading, or None if it has no verses. A psalm's
+    key is its date (YYYY-MM-DD); without one it has no key.
+    """
+    ranges = _merge_parts(verse_ids.parse_parts(reference or ''))
+    if not ranges:
+        return None
+    if kind in DATED_KINDS:
+        return f'{kind}:{date}' if date else None
+    return kind + ':' + ','.join(f'{_point(*start, 0)}-{_point(*end, _WHOLE)}'
+                                 for start, end in ranges)
+
+
+class ReadingStore:
+    """Reading texts by type and canonical reference; safe to share between stage threads."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'format_version'").fetchone()
+        if not row or row[0] != str(FORMAT_VERSION):
+            # Keys of an older format never match again; those texts are scraped anew
+            self._conn.execute('DELETE FROM texts')
+            self._conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+                               ('format_version', str(FORMAT_VERSION)))
+            self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, reference, kind, date=None):
+        """The stored text of a reading (a psalm needs its `date`), or None."""
+        key = reference_key(reference, kind, date)
+        if key is None:
+            return None
+        with self._lock:
+            row = self._conn.execute('SELECT reference, text FROM texts WHERE key = ?',
+                                     (key,)).fetchone()
+        if not row or (kind in DATED_KINDS and row[0] != reference):
+            return None
+        return zlib.decompress(row[1]).decode('utf-8')
+
+    def get_many(self, readings, date=None):
+        """{reference: text} for the (reference, kind) pairs of one day that are stored."""
+        found = {}
+        for reference, kind in readings:
+            text = self.get(reference, kind, date)
+            if text:
+                found[reference] = text
+        return found
+
+    def put(self, reference, kind, text, source='', date=None):
+        """Store a cleaned text (a psalm under its `date`). False if it has no key."""
+        key = reference_key(reference, kind, date)
+        if key is None or not text:
+            return False
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO texts (key, reference, kind, text, source, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, reference, kind, zlib.compress(text.encode('utf-8'), 9), source, fetched_at))
+            self._conn.commit()
+        return True
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM texts').fetchone()[0]
+
+    def close(self):
+        self._conn.close()
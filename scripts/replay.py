@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Record / replay HTTP fixtures for the collector.
+
+A fixture set is a directory with an index.json (URL -> status, headers,
+delay, throttling) and one body file per URL. StandInServer serves it on
+localhost; `replaying()` points transport.ROUTE at that server so the
+collector runs its real code path (buckets, retries, cache, streaming)
+without touching cpbjr, USCCB or Reddit. Fixtures can be recorded from a
+live run or generated synthetically.
+
+Usage:
+  python3 scripts/replay.py record DIR [collector args]   # live run, saved to DIR
+  python3 scripts/replay.py synth DIR [--from D --to D]   # generated fixtures
+  python3 scripts/replay.py serve DIR [--port N]          # stand-in server only
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import transport
+
+FIXTURE_VERSION = 1
+CHUNK_SIZE = 8 * 1024
+
+
+# ── Fixtures ──
+
+class FixtureSet:
+    """Saved responses keyed by the original URL."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.responses = {}
+        self.collector_args = []  # what the recorded run was asked to collect
+        index = self.directory / 'index.json'
+        if index.exists():
+            with open(index, encoding='utf-8') as f:
+                data = json.load(f)
+            self.responses = data.get('responses', {})
+            self.collector_args = data.get('collector_args', [])
+        self._lock = threading.Lock()
+
+    def _body_path(self, name):
+        return self.directory / 'bodies' / name
+
+    def add(self, url, body, status=200, headers=(), delay=0.0, throttle_first=0):
+        """
+        Save a response. `delay` seconds pass before it is sent and the
+        first `throttle_first` requests for it get a 429 instead.
+        """
+        name = hashlib.sha256(url.encode('utf-8')).hexdigest()[:24] + '.body'
+        path = self._body_path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        with self._lock:
+            self.responses[url] = {
+                'status': status,
+                'headers': [list(h) for h in headers],
+                'body': name,
+                'delay': delay,
+                'throttle_first': throttle_first,
+            }
+
+    def get(self, url):
+        """Return (spec, body) for a URL, or None."""
+        spec = self.responses.get(url)
+        if spec is None:
+            return None
+        return spec, self._body_path(spec['body']).read_bytes()
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump({'version': FIXTURE_VERSION, 'collector_args': self.collector_args,
+                       'responses': self.responses}, f, indent=2, sort_keys=True)
+
+
+# ── Stand-in server ──
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = server.original_url(self.path)
+        found = server.fixtures.get(url) if url else None
+        server.count('requests')
+        if found is None:
+            server.count('missing')
+            self.send_error(404, 'No fixture for this URL')
+            return
+        spec, body = found
+
+        seen = server.count(url)
+        if seen <= spec.get('throttle_first', 0):
+            server.count('throttled')
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if spec.get('delay'):
+            time.sleep(spec['delay'])
+
+        etag = next((v for k, v in spec.get('headers', []) if k.lower() == 'etag'), None)
+        if etag and etag == self.headers.get('If-None-Match'):
+            server.count('not_modified')
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(spec.get('status', 200))
+        for name, value in spec.get('headers', []):
+            if name.lower() not in ('content-length', 'transfer-encoding', 'content-encoding'):
+                self.send_header(name, value)
+        # Like the live servers, compress for clients that ask for it
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 1024:
+            body = gzip.compress(body, compresslevel=6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(body), CHUNK_SIZE):
+                self.wfile.write(body[i:i + CHUNK_SIZE])
+                server.count('bytes', len(body[i:i + CHUNK_SIZE]))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # streaming readers hang up early
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Serves a FixtureSet on localhost. Requests arrive as
+    /<scheme>/<host>/<path>?<query>; see route().
+    """
+
+    daemon_threads = True
+
+    def __init__(self, fixtures, retry_after=1, port=0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.fixtures = fixtures
+        self.retry_after = retry_after
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def route(self, url):
+        """Map a live URL onto this server."""
+        parts = urllib.parse.urlsplit(url)
+        query = f'?{parts.query}' if parts.query else ''
+        return f'{self.base_url}/{parts.scheme}/{parts.netloc}{parts.path}{query}'
+
+    def original_url(self, path):
+        scheme, _, rest = path.lstrip('/').partition('/')
+        if not rest:
+            return None
+        return f'{scheme}://{rest}'
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up on a kept-alive connection is business as usual
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def count(self, key, n=1):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + n
+            return self.stats[key]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def replaying(fixtures, retry_after=1):
+    """Run the block with every transport request answered from `fixtures`."""
+    if not isinstance(fixtures, FixtureSet):
+        fixtures = FixtureSet(fixtures)
+    server = StandInServer(fixtures, retry_after=retry_after).start()
+    previous = transport.ROUTE
+    transport.ROUTE = server.route
+    try:
+        yield server
+    finally:
+        transport.ROUTE = previous
+        transport.POOL.close()
+        server.stop()
+
+
+@contextmanager
+def recording(fixtures):
+    """
+    Run the block against the live network, saving every successful
+    response. Streaming readers save only the part they read, which is
+    all a replay of the same code needs.
+    """
+    if not isinstance(fixtures, FixtureSet):
+        fixtures = FixtureSet(fixtures)
+    live_get = transport.get
+
+    def recording_get(url, *args, **kwargs):
+        resp = live_get(url, *args, **kwargs)
+        if resp.status == 200:
+            headers = [(h, resp.headers[h]) for h in ('Content-Type', 'ETag', 'Last-Modified')
+                       if resp.headers.get(h)]
+            fixtures.add(url, resp.body, headers=headers)
+        return resp
+
+    transport.get = recording_get
+    try:
+        yield fixtures
+    finally:
+        transport.get = live_get
+        fixtures.save()
+
+
+# ── Synthetic fixtures ──
+
+SYNTH_READINGS = [
+    ('1 Kings 10:1-10', 'Psalm 37:5-6, 30-31, 39-40', 'Mark 7:14-23'),
+    ('Genesis 2:4-9, 15-17', 'Psalm 104:1-2, 27-28, 29-30', 'Mark 7:24-30'),
+    ('1 Kings 11:29-32; 12:19', 'Psalm 81:10-11, 12-13, 14-15', 'Mark 7:31-37'),
+    ('Genesis 3:1-8', 'Psalm 32:1-2, 5, 6, 7', 'Matthew 5:13-16'),
+    ('1 Kings 12:26-32', 'Psalm 106:6-7, 19-20, 21-22', 'Luke 6:17, 20-26'),
+    ('Genesis 4:1-15, 25', 'Psalm 50:1, 8, 16-17, 20-21', 'John 4:43-54'),
+    ('1 Kings 3:4-13', 'Psalm 119:9-14', 'Mark 8:1-10'),
+]
+SYNTH_WORDS = ('the lord said to his disciples hear me all of you and understand '
+               'nothing that enters one from outside can defile that person').split()
+
+
+def _synth_paragraph(rng, n):
+    return ' '.join(rng.choice(SYNTH_WORDS) for _ in range(n)).capitalize() + '.'
+
+
+def synth_usccb_page(rng, readings, filler=400):
+    """A USCCB-like page: navigation chrome, the readings, then a long tail."""
+    first, psalm, gospel = readings
+    nav = ''.join(f'<li class="menu-item"><a href="/p/{i}" data-id="{i}">Link {i}</a></li>'
+                  for i in range(filler))
+    parts = ['<html><head><script>window.dataLayer=[];</script></head><body>',
+             f'<nav><ul>{nav}</ul></nav>', '<div class="content">']
+    for title, ref in (('Reading 1', first), ('Responsorial Psalm', psalm), ('Gospel', gospel)):
+        paras = ''.join(f'<p>{_synth_paragraph(rng, 40)}<br/>{_synth_paragraph(rng, 30)}</p>'
+                        for _ in range(4))
+        parts.append(f'<h3 class="name">{title}</h3><div class="address"><p>{ref}</p></div>'
+                     f'<div class="content-body">{paras}</div>')
+    parts.append('<h3>Related Content</h3>')
+    parts.extend(f'<p>{_synth_paragraph(rng, 25)}</p>' for _ in range(filler * 2))
+    parts.append('<div class="site-footer">Footer</div></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def synth_reddit_listing(rng, subreddit, limit):
+    children = []
+    for i in range(limit):
+        children.append({'data': {
+            'title': f'{subreddit} post {i}: {_synth_paragraph(rng, 8)}',
+            'permalink': f'/r/{subreddit}/comments/{i:06x}/post_{i}/',
+            'url': f'https://example.com/{subreddit}/{i}',
+            'score': rng.randint(10, 3000),
+            'num_comments': rng.randint(0, 400),
+            'selftext': _synth_paragraph(rng, 60),
+            'created_utc': 1770000000 + i * 3600,
+            'subreddit': subreddit,
+            'thumbnail': 'self',
+        }})
+    return json.dumps({'kind': 'Listing', 'data': {'children': children}}).encode('utf-8')
+
+
+def synth_rss(rng, title, items, newest):
+    """An RSS 2.0 feed with `items` entries, newest first, one a day."""
+    entries = []
+    for i in range(items):
+        when = (newest - timedelta(days=i)).strftime('%a, %d %b %Y %H:%M:%S +0000')
+        entries.append(f'<item><title>{title} #{i}</title><link>https://example.com/{i}</link>'
+                       f'<pubDate>{when}</pubDate><description><![CDATA[<p>{_synth_paragraph(rng, 80)}'
+                       f'</p>]]></description></item>')
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>{title}</title>{"".join(entries)}</channel></rss>').encode('utf-8')
+
+
+def synthetic_fixtures(directory, dates, subreddits, limit=5, seed=1,
+                       slow=0.3, throttled=1, feeds=()):
+    """
+    Generate fixtures for `dates`, `subreddits` and feed URLs that look
+    like the live endpoints. The first subreddit is answered with
+    `throttled` 429s before it succeeds and every second one is `slow`
+    seconds late. Feeds carry 200 items so early stopping shows.
+    """
+    import collect_feed
+
+    rng = random.Random(seed)
+    fixtures = FixtureSet(directory)
+    fixtures.collector_args = ['--from', dates[0], '--to', dates[-1]]
+    json_headers = [('Content-Type', 'application/json')]
+    for i, date_str in enumerate(dates):
+        readings = SYNTH_READINGS[i % len(SYNTH_READINGS)]
+        usccb = f'https://bible.usccb.org/bible/readings/{date_str[5:7]}{date_str[8:10]}{date_str[2:4]}.cfm'
+        api = {
+            'date': date_str,
+            'season': 'Ordinary Time',
+            'readings': {'firstReading': readings[0], 'psalm': readings[1], 'gospel': readings[2]},
+            'usccbLink': usccb,
+        }
+        fixtures.add(collect_feed.readings_url(date_str), json.dumps(api).encode('utf-8'),
+                     headers=json_headers)
+        fixtures.add(usccb, synth_usccb_page(rng, readings),
+                     headers=[('Content-Type', 'text/html; charset=utf-8')])
+    for i, sub in enumerate(subreddits):
+        fixtures.add(collect_feed.subreddit_url(sub, limit), synth_reddit_listing(rng, sub, limit),
+                     headers=json_headers, delay=slow if i % 2 else 0.0,
+                     throttle_first=throttled if i == 0 else 0)
+    newest = datetime.strptime(dates[-1], '%Y-%m-%d')
+    for url in feeds:
+        fixtures.add(url, synth_rss(rng, urllib.parse.urlsplit(url).netloc, 200, newest),
+                     headers=[('Content-Type', 'application/rss+xml'), ('ETag', f'"{seed}"')])
+    fixtures.save()
+    return fixtures
+
+
+# ── CLI ──
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Record or replay collector HTTP fixtures')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='Run the collector live and save its responses')
+    record.add_argument('directory')
+    record.add_argument('collector_args', nargs=argparse.REMAINDER)
+
+    synth = sub.add_parser('synth', help='Generate synthetic fixtures')
+    synth.add_argument('directory')
+    synth.add_argument('--from', dest='start', help='First date (default: today)')
+    synth.add_argument('--to', dest='end', help='Last date (default: --from + 6 days)')
+
+    serve = sub.add_parser('serve', help='Serve fixtures until interrupted')
+    serve.add_argument('directory')
+    serve.add_argument('--port', type=int, default=8081)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import collect_feed
+
+    if args.command == 'record':
+        # Bypass the HTTP cache so every response really comes from the network
+        with recording(args.directory) as fixtures:
+            fixtures.collector_args = [a for a in args.collector_args if a != '--resume']
+            collect_feed.main(['--no-cache', *fixtures.collector_args])
+        print(f"Recorded {len(fixtures.responses)} responses to {args.directory}")
+
+    elif args.command == 'synth':
+        start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else datetime.now()
+        end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else start + timedelta(days=6)
+        dates = collect_feed.date_range(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+        config = collect_feed.load_config()
+        feeds = [url for url, _kind in collect_feed.feed_sources(config)]
+        fixtures = synthetic_fixtures(args.directory, dates, config.get('subreddits', []),
+                                      feeds=feeds)
+        print(f"Wrote {len(fixtures.responses)} synthetic responses to {args.directory}")
+
+    elif args.command == 'serve':
+        server = StandInServer(FixtureSet(args.directory), port=args.port)
+        print(f"Serving {len(server.fixtures.responses)} fixtures at {server.base_url}")
+        print(f"  e.g. {server.route(next(iter(server.fixtures.responses), 'https://example.com/'))}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Static file server for the dashboard (what serve.sh runs).
+
+Same job as `python3 -m http.server`, but:
+  - one thread per request
+  - strong ETags (content hash) and If-None-Match -> 304
+  - hashed file names (feed shards) are cached by the browser for a year,
+    everything else is revalidated on every load
+  - a precompressed `.br` / `.gz` sibling is sent instead of the file when
+    the browser accepts it and the sibling is not older than the file
+  - /api/history/... answers from the collector's history store
+    (data/history.sqlite), so the dashboard can browse past weeks:
+
+      /api/history/weeks                  archived weeks, newest first
+      /api/history/weeks/2026-W06         that week's collector output
+      /api/history/items?week=&source=    items seen (limit=, default 100)
+      /api/history/score?url=PERMALINK    score snapshots of one item
+
+  - /api/fathers/search?q=misericordia&limit=10 searches the patristic
+    commentary (the full-text index in data/fathers_index.sqlite)
+
+Usage:
+  python3 scripts/serve.py [port] [--dir DIR] [--history DB] [--fathers DB]
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.parse
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from fathers_search import FathersSearch, QueryError, has_search_index
+from history_store import HistoryStore
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_PORT = 8080
+DEFAULT_HISTORY = PROJECT_DIR / 'data' / 'history.sqlite'
+DEFAULT_FATHERS = PROJECT_DIR / 'data' / 'fathers_index.sqlite'
+API_PREFIX = '/api/history/'
+SEARCH_PREFIX = '/api/fathers/'
+MAX_ITEMS = 500
+MAX_HITS = 50
+
+# e.g. liturgy.c7e1c566e2d7.json: the name changes whenever the content does
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{8,}\.\w+$')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+# Preferred first
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+class DigestCache:
+    """Content hashes keyed by (path, size, mtime), so files are hashed once per change."""
+
+    def __init__(self):
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def etag(self, path, st):
+        key = (path, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(key)
+        if digest is None:
+            h = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 16), b''):
+                    h.update(chunk)
+            digest = h.hexdigest()[:32]
+            with self._lock:
+                self._digests[key] = digest
+        return f'"{digest}"'
+
+
+DIGESTS = DigestCache()
+
+
+class HistoryApi:
+    """JSON views of the history store, opened read-only on first use."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._store = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        with self._lock:
+            if self._store is None and self.path.exists():
+                self._store = HistoryStore(self.path, readonly=True)
+            return self._store
+
+    def handle(self, route, query):
+        """(status, data) for a route below API_PREFIX."""
+        store = self._open()
+        if store is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'no history store'}
+        arg = lambda name: (query.get(name) or [None])[0]
+        try:
+            if route == 'weeks':
+                return HTTPStatus.OK, store.weeks()
+            if route.startswith('weeks/'):
+                output = store.week_output(route[len('weeks/'):])
+                if output is None:
+                    return HTTPStatus.NOT_FOUND, {'error': 'unknown week'}
+                return HTTPStatus.OK, output
+            if route == 'items':
+                limit = min(int(arg('limit') or 100), MAX_ITEMS)
+                return HTTPStatus.OK, store.items(week=arg('week'), source=arg('source'), limit=limit)
+            if route == 'score' and arg('url'):
+                return HTTPStatus.OK, store.score_history(arg('url'))
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': 'bad parameter'}
+        except sqlite3.Error as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(e)}
+        return HTTPStatus.NOT_FOUND, {'error': 'unknown route'}
+
+
+class SearchApi:
+    """
+    Full-text search of the fathers store, opened read-only on first use
+    and again whenever the file changes: index_fathers.py replaces the
+    store with a new file, so a handle on the old one would keep
+    answering from it. Like DigestCache, changes are told by inode and
+    mtime.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._search = None
+        self._key = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        key = (st.st_ino, st.st_mtime_ns)
+        with self._lock:
+            if key != self._key:
+                # Requests still using the old handle finish on it; it closes once unreferenced
+                self._search = self._key = None
+                if has_search_index(self.path):
+                    self._search, self._key = FathersSearch(self.path), key
+            return self._search
+
+    def handle(self, route, query):
+        """(status, data) for a route below SEARCH_PREFIX."""
+        if route != 'search':
+            return HTTPStatus.NOT_FOUND, {'error': 'unknown route'}
+        search = self._open()
+        if search is None:
+            return HTTPStatus.NOT_FOUND, {'error': 'no search index'}
+        arg = lambda name: (query.get(name) or [None])[0]
+        try:
+            limit = min(int(arg('limit') or 10), MAX_HITS)
+            return HTTPStatus.OK, search.search(arg('q') or '', limit=limit)
+        except QueryError as e:
+            return HTTPStatus.BAD_REQUEST, {'error': str(e)}
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, {'error': 'bad parameter'}
+        except sqlite3.Error as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'error': str(e)}
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if params.strip().replace(' ', '') in ('q=0', 'q=0.0'):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class CachingRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler with ETags, 304s, Cache-Control and precompressed siblings."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(self, *args, history=None, search=None, **kwargs):
+        # Set before super().__init__, which handles the request right away
+        self.history = history
+        self.search = search
+        super().__init__(*args, **kwargs)
+
+    def _etag_matches(self, etag):
+        return etag in (t.strip() for t in self.headers.get('If-None-Match', '').split(','))
+
+    def send_api(self, api, prefix):
+        parsed = urllib.parse.urlsplit(self.path)
+        status, data = api.handle(parsed.path[len(prefix):], urllib.parse.parse_qs(parsed.query))
+        payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        etag = f'"{hashlib.sha256(payload).hexdigest()[:32]}"'
+        if status == HTTPStatus.OK and self._etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', REVALIDATE_CACHE)
+            self.end_headers()
+            return None
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', REVALIDATE_CACHE)
+        self.end_headers()
+        return io.BytesIO(payload)
+
+    def send_head(self):
+        if self.history is not None and self.path.startswith(API_PREFIX):
+            return self.send_api(self.history, API_PREFIX)
+        if self.search is not None and self.path.startswith(SEARCH_PREFIX):
+            return self.send_api(self.search, SEARCH_PREFIX)
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) or not os.path.isfile(path):
+            # Directory listings, index.html redirects and 404s as before
+            return super().send_head()
+
+        ctype = self.guess_type(path)
+        accepted = _accepted_encodings(self.headers.get('Accept-Encoding'))
+        send_path, encoding = path, None
+        st = os.stat(path)
+        for name, suffix in PRECOMPRESSED:
+            if name not in accepted:
+                continue
+            try:
+                sibling = os.stat(path + suffix)
+            except OSError:
+                continue
+            if sibling.st_mtime_ns >= st.st_mtime_ns:
+                send_path, encoding, st = path + suffix, name, sibling
+                break
+
+        etag = DIGESTS.etag(send_path, st)
+        cache_control = IMMUTABLE_CACHE if HASHED_NAME_RE.search(path) else REVALIDATE_CACHE
+
+        if self._etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', cache_control)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        try:
+            f = open(send_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, 'File not found')
+            return None
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', ctype)
+        self.send_header('Content-Length', str(st.st_size))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(st.st_mtime))
+        self.send_header('Cache-Control', cache_control)
+        self.end_headers()
+        return f
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('port', nargs='?', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--bind', default='', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--dir', default=str(PROJECT_DIR), help='Directory to serve')
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY),
+                        help='History store behind /api/history/ (default: data/history.sqlite)')
+    parser.add_argument('--fathers', default=str(DEFAULT_FATHERS),
+                        help='Fathers store behind /api/fathers/ (default: data/fathers_index.sqlite)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    handler = partial(CachingRequestHandler, directory=args.dir,
+                      history=HistoryApi(args.history), search=SearchApi(args.fathers))
+    with ThreadingHTTPServer((args.bind, args.port), handler) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Incremental RSS / Atom parsing.
+
+FeedParser is fed the response body chunk by chunk (it works as a
+transport.get on_chunk callback) and builds items as their closing tags
+arrive. Finished elements are cleared right away, and once `limit`
+recent items have been read, or `max_old` items in a row are older than
+`since`, it reports done so the download can stop. A huge feed is never
+held in memory in full.
+
+Handles RSS 2.0, RSS 1.0 (RDF) and Atom, including Substack's feeds.
+"""
+
+import html
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+ITEM_TAGS = {'item', 'entry'}
+DATE_TAGS = ('pubDate', 'published', 'updated', 'date')
+TEXT_TAGS = ('description', 'summary', 'encoded', 'content')
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_date(value):
+    """RFC 822 (RSS) or ISO 8601 (Atom) date as an aware datetime, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when
+
+
+def plain_text(markup, limit=200):
+    """Strip tags and entities from an item description."""
+    text = html.unescape(TAG_RE.sub(' ', markup or ''))
+    return SPACE_RE.sub(' ', text).strip()[:limit]
+
+
+def _item_link(elem):
+    """RSS <link>text</link>, or Atom's rel=alternate (or first) <link href>."""
+    fallback = ''
+    for child in elem:
+        if _local(child.tag) != 'link':
+            continue
+        href = child.get('href')
+        if href is None:
+            if child.text and child.text.strip():
+                return child.text.strip()
+            continue
+        if child.get('rel', 'alternate') == 'alternate':
+            return href
+        fallback = fallback or href
+    guid = next((c for c in elem if _local(c.tag) in ('guid', 'id')), None)
+    if not fallback and guid is not None and (guid.text or '').startswith('http'):
+        return guid.text.strip()
+    return fallback
+
+
+def _item_thumbnail(elem):
+    for child in elem.iter():
+        name = _local(child.tag)
+        url = child.get('url') or ''
+        if not url:
+            continue
+        if name == 'thumbnail':
+            return url
+        if name in ('content', 'enclosure') and (
+                child.get('medium') == 'image' or child.get('type', '').startswith('image/')):
+            return url
+    return ''
+
+
+class FeedParser:
+    """
+    Push parser for one feed. Call feed(bytes) until it returns True (or
+    the body ends), then close(); finished items are in `items`.
+    """
+
+    def __init__(self, limit=20, since=None, max_old=5):
+        self.limit = limit
+        self.since = since
+        self.max_old = max_old
+        self.title = ''
+        self.items = []
+        self.done = False
+        self.error = None
+        self._old_in_row = 0
+        self._depth_in_item = 0
+        self._parser = XMLPullParser(events=('start', 'end'))
+
+    def feed(self, data):
+        """Parse another chunk; returns True once no more input is needed."""
+        if self.done:
+            return True
+        try:
+            self._parser.feed(data)
+            self._drain()
+        except ParseError as e:
+            # Keep what was read before the feed turned malformed
+            self.error = str(e)
+            self.done = True
+        return self.done
+
+    def close(self):
+        if not self.done:
+            try:
+                self._parser.close()
+                self._drain()
+            except ParseError as e:
+                self.error = str(e)
+            self.done = True
+        return self.items
+
+    def _drain(self):
+        for event, elem in self._parser.read_events():
+            name = _local(elem.tag)
+            if event == 'start':
+                if name in ITEM_TAGS:
+                    self._depth_in_item += 1
+                continue
+            if name in ITEM_TAGS:
+                self._depth_in_item -= 1
+                self._finish_item(elem)
+                elem.clear()
+                if self.done:
+                    return
+            elif name == 'title' and not self._depth_in_item and not self.title:
+                self.title = (elem.text or '').strip()
+
+    def _finish_item(self, elem):
+        fields = {}
+        for child in elem:
+            name = _local(child.tag)
+            if name not in fields and (child.text or '').strip():
+                fields[name] = child.text
+        published = next((parse_date(fields[t]) for t in DATE_TAGS if t in fields), None)
+
+        if self.since and published and published < self.since:
+            self._old_in_row += 1
+            if self._old_in_row >= self.max_old:
+                self.done = True
+            return
+        self._old_in_row = 0
+
+        text = next((fields[t] for t in TEXT_TAGS if t in fields), '')
+        self.items.append({
+            'title': plain_text(fields.get('title', ''), limit=300),
+            'url': _item_link(elem),
+            'published': published,
+            'summary': plain_text(text),
+            'thumbnail': _item_thumbnail(elem),
+        })
+        if len(self.items) >= self.limit:
+            self.done = True
@@ -0,0 +1,66 @@
+"""
+Text normalization shared by topic classification and full-text search.
+
+fold() makes "Agustín", "agustin" and "AGUSTÍN" compare equal; words()
+and positions() split a text into folded words of two or more letters,
+which is how the search index (fathers_search.py) sees the commentary.
+Spanish and English stopwords are dropped from positions() but still
+counted, so the words around them keep their distance.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+SPACE_RE = re.compile(r'\s+')
+TOKEN_RE = re.compile(r'[^\W\d_]{2,}')
+
+STOPWORDS = frozenset('''
+    al de el en es ha he la le lo me mi ni no os se si su te tu un ya
+    an as at be by do if in is it my of on or so to up us we
+    ante bajo con contra desde durante entre hacia hasta mediante para por segun sin sobre tras
+    del las los una unos unas como cual cuales cuando donde que quien quienes cuyo
+    pero mas sino porque pues aunque ademas tambien tampoco asi aun muy tan tanto
+    este esta esto estos estas ese esa eso esos esas aquel aquella aquello aquellos aquellas
+    sus suyo suya nos nosotros vosotros ellos ellas ella mis tus mio mia nuestro nuestra
+    ser son era eran fue fueron sea sean sera seran siendo sido estar esta estan estaba estuvo
+    haber has hay habia han hemos hubo hace hacer hizo dice dijo decir
+    todo toda todos todas otro otra otros otras mismo misma mismos mismas cada algo alguno
+    nada ninguno solo sola entonces luego despues antes ahora aqui alli donde dos tres
+    the and for that this with from but not are was were been being have has had
+    who whom which what when where why how all any each his her hers him its our ours
+    their theirs them they you your yours shall will would should could may might must
+    into unto upon than then there these those also very said says say
+'''.split())
+
+
+def fold(text):
+    """Lower-case, strip accents and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', (text or '').casefold())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return SPACE_RE.sub(' ', text).strip()
+
+
+@lru_cache(maxsize=1 << 16)
+def _term(word):
+    """Folded form of a word, or None for a stopword."""
+    term = fold(word)
+    return None if term in STOPWORDS else term
+
+
+def words(text):
+    """The words of `text`, lower-cased but not folded, stopwords included."""
+    return TOKEN_RE.findall(unicodedata.normalize('NFC', text or '').casefold())
+
+
+def positions(text):
+    """
+    (position, term) of the terms of `text`. Stopwords are dropped but
+    still counted, so a phrase's terms keep their distance.
+    """
+    found = []
+    for pos, word in enumerate(words(text)):
+        term = _term(word)
+        if term:
+            found.append((pos, term))
+    return found
@@ -0,0 +1,140 @@
+"""
+Topic classification for news posts.
+
+config.json's "topics" become news sections. A topic is either a plain
+string, which is also its only keyword, or an object:
+
+  {"id": "ai", "title": "Inteligencia Artificial",
+   "keywords": ["AI", "ChatGPT", "LLM"], "sources": ["r/OpenAI", "ChatGPT"]}
+
+TopicClassifier is built once per run. Keywords of every topic go into a
+single Aho-Corasick automaton over accent-folded, lower-cased text, so a
+post is scanned once whatever the number of topics; sources are a dict
+lookup. A post from a listed source always goes to that source's topic.
+Keywords only classify the rest (feeds, Substacks, unlisted subreddits):
+title hits count double, and ties go to the topic listed first.
+"""
+
+import re
+from collections import deque
+
+from text_utils import fold
+
+TITLE_WEIGHT = 2
+BODY_WEIGHT = 1
+
+SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_source(source):
+    """'r/Catholicism', 'Catholicism' and 'R/catholicism' are the same source."""
+    source = fold(source)
+    return source[2:] if source.startswith('r/') else source
+
+
+def _is_word_char(c):
+    return c.isalnum() or c == '_'
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over folded keywords. Matches only count on
+    word boundaries, so "ai" does not fire inside "said".
+    """
+
+    def __init__(self, keywords):
+        # keywords: {folded keyword: value}
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for keyword, value in keywords.items():
+            node = 0
+            for c in keyword:
+                nxt = self._goto[node].get(c)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][c] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((len(keyword), value))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for c, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and c not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(c, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def find(self, text):
+        """Yield the value of every whole-word keyword occurrence in folded `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        end = len(text)
+        for i, c in enumerate(text):
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            if not out[node]:
+                continue
+            after_ok = i + 1 == end or not _is_word_char(text[i + 1])
+            if not after_ok:
+                continue
+            for length, value in out[node]:
+                start = i - length + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    yield value
+
+
+def _parse_topic(topic):
+    if isinstance(topic, str):
+        return {'id': SLUG_RE.sub('-', fold(topic)).strip('-'), 'title': topic,
+                'keywords': [topic], 'sources': []}
+    title = topic.get('title') or topic.get('id', '')
+    return {
+        'id': topic.get('id') or SLUG_RE.sub('-', fold(title)).strip('-'),
+        'title': title,
+        'keywords': list(topic.get('keywords', [])) or [title],
+        'sources': list(topic.get('sources', [])),
+    }
+
+
+class TopicClassifier:
+    """Assigns posts to the configured topics; see the module docstring."""
+
+    def __init__(self, topics):
+        self.topics = [t for t in (_parse_topic(t) for t in topics or []) if t['id']]
+        keywords, self._sources = {}, {}
+        for index, topic in enumerate(self.topics):
+            for keyword in topic['keywords']:
+                keywords.setdefault(fold(keyword), index)
+            for source in topic['sources']:
+                self._sources.setdefault(normalize_source(source), index)
+        self._matcher = KeywordMatcher({k: v for k, v in keywords.items() if k})
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('topics', []))
+
+    def classify(self, title, text='', source=''):
+        """Index into self.topics of the source's topic or best matching topic, or None."""
+        index = self._sources.get(normalize_source(source))
+        if index is not None:
+            return index
+        scores = {}
+        for index in self._matcher.find(fold(title)):
+            scores[index] = scores.get(index, 0) + TITLE_WEIGHT
+        if text:
+            for index in self._matcher.find(fold(text)):
+                scores[index] = scores.get(index, 0) + BODY_WEIGHT
+        if not scores:
+            return None
+        return min(scores, key=lambda i: (-scores[i], i))
@@ -0,0 +1,744 @@
+"""
+Shared HTTP transport for the collector scripts.
+
+Keeps one token bucket per host so concurrent fetches stay within the
+server's limits. The buckets listen to what the server says
+(Retry-After, x-ratelimit-remaining / x-ratelimit-reset) instead of
+sleeping for fixed amounts of time.
+
+Responses can also go through an on-disk HttpCache: fresh entries are
+served without touching the network, stale ones are revalidated with
+If-None-Match / If-Modified-Since so unchanged resources come back as
+a body-less 304.
+
+Callers that only need the start of a page can pass `on_chunk` to get
+the body as it arrives and hang up once they have what they want.
+
+Requests go over a shared pool of keep-alive http.client connections
+(one TLS handshake per host, not per request) and ask for gzip/deflate,
+which is decoded as the body streams in.
+
+A run can set DEADLINE to a Deadline: every fetch then gets a share of
+the time left, and is cancelled with DeadlineExceeded once it overruns
+that share, whether it is connecting, reading, or waiting on a rate
+limit or backoff.
+"""
+
+import email.message
+import hashlib
+import http.client
+import json
+import os
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.parse
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import metrics
+
+DEFAULT_USER_AGENT = 'DashboardCollector/1.0'
+# One policy for every request unless a caller has a reason to differ
+DEFAULT_TIMEOUT = 20
+DEFAULT_RETRIES = 2
+CHUNK_SIZE = 16 * 1024
+
+# Optional url -> url function applied just before a request goes out
+# (buckets and cache keys still use the original URL). scripts/replay.py
+# sets it to send the collector to a local stand-in server.
+ROUTE = None
+
+# Optional run-level Deadline shared by every request (see Deadline)
+DEADLINE = None
+
+
+# ── Deadline ──
+
+class DeadlineExceeded(Exception):
+    """A fetch ran out of its share of the run's time budget. Never retried."""
+
+
+class Deadline:
+    """
+    A time budget for a whole run. Each fetch, when it starts, gets the
+    time left divided by the fetches then in flight (itself included),
+    but never less than `min_share` unless less than that is left. A
+    fetch past its share is cancelled, so one slow endpoint can't hold
+    up the rest of the run.
+    """
+
+    def __init__(self, seconds, min_share=3.0):
+        self.seconds = seconds
+        self.min_share = min_share
+        self.expires_at = time.monotonic() + seconds
+        self.in_flight = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def refuse(self):
+        """Count a fetch that was never started because the deadline had passed."""
+        with self._lock:
+            self.cancelled += 1
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    @contextmanager
+    def fetch(self):
+        """Register a fetch; yields the monotonic time by which it must be done."""
+        with self._lock:
+            now = time.monotonic()
+            left = self.expires_at - now
+            if left <= 0:
+                self.cancelled += 1
+                raise DeadlineExceeded('run deadline already passed')
+            self.in_flight += 1
+            share = min(left, max(left / self.in_flight, self.min_share))
+        try:
+            yield now + share
+        except DeadlineExceeded:
+            with self._lock:
+                self.cancelled += 1
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _check_deadline(until, what):
+    if until is not None and time.monotonic() >= until:
+        metrics.count('deadline_cancelled')
+        raise DeadlineExceeded(f'{what} overran its share of the deadline')
+
+
+# ── Rate limiting ──
+
+def _header_float(headers, name):
+    """Read a numeric header, returning None if missing or malformed."""
+    if headers is None:
+        return None
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def parse_retry_after(headers):
+    """Parse Retry-After (delta-seconds or HTTP date) into seconds to wait."""
+    if headers is None:
+        return None
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket for a single host.
+
+    `rate` tokens are added per second up to `burst`. On top of that the
+    server can impose a quota (x-ratelimit-remaining until
+    x-ratelimit-reset) or a hard pause (Retry-After); both are honored.
+    """
+
+    def __init__(self, rate=1.0, burst=4):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.quota = None
+        self.quota_reset_at = 0.0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.quota is not None and now >= self.quota_reset_at:
+            self.quota = None
+
+    def acquire(self, until=None):
+        """
+        Block until a request may be sent. Raises DeadlineExceeded instead
+        of waiting past the monotonic time `until`.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.quota is not None and self.quota < 1:
+                    wait = self.quota_reset_at - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    if self.quota is not None:
+                        self.quota -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+                if until is not None and now + wait > until:
+                    metrics.count('deadline_cancelled')
+                    raise DeadlineExceeded(f'rate limit wait of {wait:.1f}s is past the deadline')
+                self.waited += wait
+            time.sleep(wait)
+
+    def observe(self, headers):
+        """Update the bucket from a response's rate-limit headers."""
+        remaining = _header_float(headers, 'x-ratelimit-remaining')
+        reset = _header_float(headers, 'x-ratelimit-reset')
+        retry_after = parse_retry_after(headers)
+        with self._lock:
+            now = time.monotonic()
+            if remaining is not None and reset is not None:
+                self.quota = remaining
+                self.quota_reset_at = now + reset
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def pause(self, seconds):
+        """Hold every request to this host for `seconds`."""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """One TokenBucket per host, created on first use."""
+
+    def __init__(self, default_rate=2.0, default_burst=4, hosts=None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.hosts = dict(hosts or {})  # host -> (rate, burst)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                rate, burst = self.hosts.get(host, (self.default_rate, self.default_burst))
+                self._buckets[host] = TokenBucket(rate, burst)
+            return self._buckets[host]
+
+    def total_wait(self):
+        """Seconds spent waiting on buckets, across all hosts."""
+        with self._lock:
+            return sum(b.waited for b in self._buckets.values())
+
+
+# ── Cache ──
+
+def _make_headers(items):
+    """Case-insensitive header mapping from (name, value) pairs."""
+    msg = email.message.Message()
+    for name, value in items:
+        msg[name] = value
+    return msg
+
+
+# Only these response headers are kept on disk
+_CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class HttpCache:
+    """
+    On-disk response cache, one body file + one metadata file per URL.
+
+    Entries younger than the caller's TTL are served as-is. Older ones
+    are revalidated with their ETag / Last-Modified. Once the bodies
+    exceed `max_bytes` the least recently used entries are evicted
+    (file mtime doubles as the LRU clock).
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024, enabled=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.stats = {'hit': 0, 'miss': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.directory / f'{key}.json', self.directory / f'{key}.body'
+
+    def record(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def lookup(self, url):
+        """Return (meta, body) for a cached URL, or None."""
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return meta, body
+
+    def lookup_complete(self, url):
+        """Like lookup(), but ignore bodies a streaming reader cut short."""
+        cached = self.lookup(url)
+        if cached and not cached[0].get('complete', True):
+            return None
+        return cached
+
+    def touch(self, url, revalidated=False):
+        """Mark an entry as recently used (and fresh again, after a 304)."""
+        meta_path, body_path = self._paths(url)
+        now = time.time()
+        try:
+            os.utime(body_path, (now, now))
+            if revalidated:
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta['stored_at'] = now
+                self._write_json(meta_path, meta)
+        except (OSError, ValueError):
+            pass
+
+    def store(self, url, headers, body, complete=True):
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'stored_at': time.time(),
+            'headers': [(h, headers[h]) for h in _CACHED_HEADERS if headers.get(h)],
+            'complete': complete,
+        }
+        tmp = body_path.with_suffix('.body.tmp')
+        tmp.write_bytes(body)
+        os.replace(tmp, body_path)
+        self._write_json(meta_path, meta)
+        self.record('stored')
+        self._evict()
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _evict(self):
+        with self._lock:
+            bodies = []
+            for path in self.directory.glob('*.body'):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                bodies.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in bodies)
+            for _, size, path in sorted(bodies):
+                if total <= self.max_bytes:
+                    break
+                for victim in (path, path.with_suffix('.json')):
+                    try:
+                        victim.unlink()
+                    except OSError:
+                        pass
+                total -= size
+                self.stats['evicted'] += 1
+
+    def summary(self):
+        s = self.stats
+        return (f"{s['hit']} hit, {s['miss']} miss, {s['revalidated']} revalidated"
+                + (f", {s['evicted']} evicted" if s['evicted'] else ''))
+
+
+# ── Connections ──
+
+# Everything that means "the request did not produce a response"
+NETWORK_ERRORS = (OSError, http.client.HTTPException)
+_REDIRECTS = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 5
+
+
+class _Decoded:
+    """
+    An open response whose body is read as decompressed chunks. Closing
+    it hands the connection back to the pool if the body was read to the
+    end, and drops it otherwise.
+    """
+
+    def __init__(self, pool, key, conn, resp):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.status = resp.status
+        self.reason = resp.reason
+        self.headers = resp.msg
+        encoding = (self.headers.get('Content-Encoding') or '').strip().lower()
+        if encoding in ('gzip', 'x-gzip'):
+            self._decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._decoder = _DeflateDecoder()
+        else:
+            self._decoder = None
+        if self._decoder is not None:
+            # The body handed out is decoded, so its headers must not say otherwise
+            del self.headers['Content-Encoding']
+            del self.headers['Content-Length']
+
+    def iter_decoded(self, chunk_size=CHUNK_SIZE):
+        while True:
+            raw = self._resp.read(chunk_size)
+            if not raw:
+                break
+            metrics.count('bytes_downloaded', len(raw))
+            chunk = self._decoder.decompress(raw) if self._decoder else raw
+            if chunk:
+                yield chunk
+        if self._decoder is not None:
+            tail = self._decoder.flush()
+            if tail:
+                yield tail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        reusable = self._resp.isclosed() and not self._resp.will_close
+        if not reusable and not self._resp.isclosed() and self.status >= 300:
+            # Error bodies are small; read them so the connection stays usable
+            try:
+                self._resp.read(64 * 1024)
+                reusable = self._resp.isclosed() and not self._resp.will_close
+            except NETWORK_ERRORS:
+                pass
+        self._pool.release(self._key, self._conn, reusable)
+
+
+class _DeflateDecoder:
+    """'deflate' is zlib-wrapped by the spec but raw deflate on some servers."""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data):
+        if self._first:
+            self._first = False
+            try:
+                return self._obj.decompress(data)
+            except zlib.error:
+                self._obj = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._obj.decompress(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+
+class ConnectionPool:
+    """
+    Persistent HTTP/1.1 connections, kept per (scheme, host, port).
+
+    A connection is checked out for one request at a time and returned
+    once its response body has been read to the end; up to
+    `max_idle_per_host` idle connections are kept for reuse. Redirects
+    are followed here, since http.client does not.
+    """
+
+    def __init__(self, max_idle_per_host=4):
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        metrics.count('connections_opened')
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _connect(self, key, timeout):
+        """An idle connection for `key` if there is one, else a new one. Returns (conn, reused)."""
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self._new_connection(key, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        metrics.count('connections_reused')
+        return conn, True
+
+    def release(self, key, conn, reusable=True):
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(self, key, target, headers, timeout):
+        """Send one request, retrying once on a fresh connection if a reused one went stale."""
+        conn, reused = self._connect(key, timeout)
+        try:
+            conn.request('GET', target, headers=headers)
+            return conn, conn.getresponse()
+        except NETWORK_ERRORS as e:
+            conn.close()
+            # A timeout is a slow server, not a dropped connection, and has used up the time
+            if not reused or isinstance(e, TimeoutError):
+                raise
+        # The server dropped an idle connection; that is not a failed request
+        conn = self._new_connection(key, timeout)
+        try:
+            conn.request('GET', target, headers=headers)
+            return conn, conn.getresponse()
+        except NETWORK_ERRORS:
+            conn.close()
+            raise
+
+    def open(self, url, headers, timeout):
+        """GET `url` and return the open response (a context manager)."""
+        headers = dict(headers)
+        headers.setdefault('Accept-Encoding', 'gzip, deflate')
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(ROUTE(url) if ROUTE else url)
+            scheme = parts.scheme or 'http'
+            port = parts.port or (443 if scheme == 'https' else 80)
+            key = (scheme, parts.hostname, port)
+            target = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+            conn, resp = self._send(key, target, headers, timeout)
+            response = _Decoded(self, key, conn, resp)
+            location = resp.getheader('Location')
+            if resp.status not in _REDIRECTS or not location:
+                return response
+            response.close()
+            url = urllib.parse.urljoin(url, location)
+        raise urllib.error.HTTPError(url, 310, 'Too many redirects', resp.msg, None)
+
+
+POOL = ConnectionPool()
+
+
+# ── Requests ──
+
+class Response:
+    """
+    Minimal response record: status, headers and the body. `complete` is
+    False when an `on_chunk` reader stopped before the end of the body.
+    """
+
+    def __init__(self, url, status, headers, body, complete=True):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.complete = complete
+
+    def text(self, encoding='utf-8', errors='strict'):
+        return self.body.decode(encoding, errors=errors)
+
+
+def _replay(url, headers, body, on_chunk, chunk_size):
+    """Serve a cached body, through on_chunk if the caller streams."""
+    if on_chunk is not None:
+        for i in range(0, len(body), chunk_size):
+            if on_chunk(body[i:i + chunk_size]):
+                break
+    return Response(url, 200, headers, body)
+
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, limiter=None,
+        cache=None, ttl=0, on_chunk=None, chunk_size=CHUNK_SIZE):
+    """
+    GET a URL through the host's token bucket.
+
+    429 and 5xx responses are retried after the server's Retry-After (or
+    a short exponential backoff if it sends none), as are dropped
+    connections and timeouts. Raises urllib.error.HTTPError for error
+    statuses, or the last network error, once retries are exhausted.
+
+    With a `cache`, entries younger than `ttl` seconds are returned
+    without a request and older ones are revalidated conditionally.
+
+    With `on_chunk`, the body is handed over `chunk_size` bytes at a time
+    as it is read; once on_chunk returns True the connection is closed
+    and the rest of the body is never downloaded. Such a truncated body
+    is still cached, but only for other streaming readers.
+    """
+    headers = dict(headers or {})
+    headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+
+    if not cache:
+        cached = None
+    elif on_chunk is None:
+        cached = cache.lookup_complete(url)
+    else:
+        cached = cache.lookup(url)
+    if cached:
+        meta, body = cached
+        cached_headers = _make_headers(meta['headers'])
+        if time.time() - meta['stored_at'] < ttl:
+            cache.touch(url)
+            cache.record('hit')
+            metrics.count('cache_hit')
+            return _replay(url, cached_headers, body, on_chunk, chunk_size)
+        if cached_headers.get('ETag'):
+            headers['If-None-Match'] = cached_headers['ETag']
+        if cached_headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = cached_headers['Last-Modified']
+
+    try:
+        resp = _get_with_retries(url, headers, timeout, retries, limiter,
+                                 on_chunk, chunk_size)
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached:
+            cache.touch(url, revalidated=True)
+            cache.record('revalidated')
+            metrics.count('cache_revalidated')
+            return _replay(url, cached_headers, body, on_chunk, chunk_size)
+        raise
+    if cache:
+        cache.record('miss')
+        metrics.count('cache_miss')
+        if resp.status == 200:
+            cache.store(url, resp.headers, resp.body, resp.complete)
+    return resp
+
+
+def _read_chunks(body, on_chunk, until=None):
+    """Collect a decoded body until it ends, on_chunk asks to stop, or `until` passes."""
+    parts = []
+    for chunk in body:
+        parts.append(chunk)
+        if on_chunk is not None and on_chunk(chunk):
+            return b''.join(parts), False
+        _check_deadline(until, 'download')
+    return b''.join(parts), True
+
+
+def _get_with_retries(url, headers, timeout, retries, limiter, on_chunk=None,
+                      chunk_size=CHUNK_SIZE):
+    if DEADLINE is None:
+        return _attempts(url, headers, timeout, retries, limiter, on_chunk, chunk_size)
+    with DEADLINE.fetch() as until:
+        return _attempts(url, headers, timeout, retries, limiter, on_chunk, chunk_size, until)
+
+
+def _sleep(seconds, until):
+    if until is not None and time.monotonic() + seconds > until:
+        metrics.count('deadline_cancelled')
+        raise DeadlineExceeded(f'backoff of {seconds:.1f}s is past the deadline')
+    time.sleep(seconds)
+
+
+def _attempts(url, headers, timeout, retries, limiter, on_chunk, chunk_size, until=None):
+    bucket = limiter.bucket(url) if limiter else None
+    streaming = False
+
+    for attempt in range(retries + 1):
+        if attempt:
+            metrics.count('retries')
+        if bucket:
+            waited = time.perf_counter()
+            bucket.acquire(until)
+            metrics.add_time('rate_limit_wait_seconds', time.perf_counter() - waited)
+        _check_deadline(until, 'request')
+        # Socket operations may not block past the fetch's share either
+        attempt_timeout = timeout if until is None else min(timeout, until - time.monotonic())
+        metrics.count('http_requests')
+        try:
+            with POOL.open(url, headers, attempt_timeout) as resp:
+                if bucket:
+                    bucket.observe(resp.headers)
+                metrics.count(f'http_{resp.status}')
+                if resp.status >= 300:
+                    raise urllib.error.HTTPError(url, resp.status, resp.reason,
+                                                 resp.headers, None)
+                streaming = on_chunk is not None
+                body, complete = _read_chunks(resp.iter_decoded(chunk_size), on_chunk, until)
+                return Response(url, resp.status, resp.headers, body, complete)
+        except urllib.error.HTTPError as e:
+            if bucket:
+                bucket.observe(e.headers)
+            retryable = e.code == 429 or e.code >= 500
+            if not retryable or attempt >= retries:
+                raise
+            retry_after = parse_retry_after(e.headers)
+            if retry_after is None:
+                backoff = 2 ** attempt
+                if bucket:
+                    bucket.pause(backoff)
+                else:
+                    _sleep(backoff, until)
+            else:
+                backoff = retry_after  # waited out by the bucket before the next attempt
+            metrics.add_time('backoff_seconds', backoff)
+        except NETWORK_ERRORS:
+            metrics.count('http_errors')
+            # A socket timeout at the end of the fetch's share is the deadline, not the network
+            _check_deadline(until, 'request')
+            # Chunks already handed to on_chunk can't be taken back
+            if streaming or attempt >= retries:
+                raise
+            metrics.add_time('backoff_seconds', 2 ** attempt)
+            _sleep(2 ** attempt, until)
+
+
+def map_concurrent(fn, items, max_workers=4, skipped=None):
+    """
+    Apply fn to every item on a bounded thread pool, keeping input order.
+    Each call runs in a copy of the caller's context, so its metrics go
+    to the caller's stage. Once DEADLINE has passed, items still waiting
+    for a worker are not run and get `skipped` as their result.
+    """
+    items = list(items)
+    if not items:
+        return []
+    deadline = DEADLINE
+    contexts = [metrics.copy_context() for _ in items]
+
+    def call(ctx, item):
+        if deadline is not None and deadline.expired():
+            deadline.refuse()
+            return skipped
+        return ctx.run(fn, item)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(call, contexts, items))
@@ -0,0 +1,285 @@
+"""
+Canonical Bible references as packed integer verse ids.
+
+Shared by the indexer (section headings from the Spanish commentary)
+and the collector (lectionary references such as "Psalm 37:5-6, 30-31"
+or "1 Kgs 10:1-10"), so both sides agree on what a reference means:
+
+  verse_id(book, chapter, verse) = book * 1_000_000 + chapter * 1000 + verse
+
+Books are numbered in the order of the Catholic canon (Genesis = 1,
+Revelation = 73). Ids sort in canonical order, so a range is just
+(start_id, end_id) and overlap tests are integer comparisons, also for
+ranges that run across chapters ("Mark 7:31-8:10"). Verse CHAPTER_END
+stands for "to the end of the chapter" (a bare "Psalm 23").
+
+Book names resolve from English, Spanish and the usual abbreviations,
+ignoring case, accents, dots and the space in "1Kgs".
+"""
+
+import re
+import unicodedata
+
+BOOK_FACTOR = 1_000_000
+CHAPTER_FACTOR = 1000
+CHAPTER_END = 999
+
+# (canonical name, aliases...) in canonical order; the canonical names are
+# the ones the index has always used for its chapter keys
+BOOKS = (
+    ('Genesis', 'Gen', 'Gn', 'Ge', 'Génesis'),
+    ('Exodus', 'Exod', 'Ex', 'Éxodo'),
+    ('Leviticus', 'Lev', 'Lv', 'Levítico'),
+    ('Numbers', 'Num', 'Nm', 'Nu', 'Números'),
+    ('Deuteronomy', 'Deut', 'Dt', 'Deuteronomio'),
+    ('Joshua', 'Josh', 'Jos', 'Josué'),
+    ('Judges', 'Judg', 'Jgs', 'Jue', 'Jueces'),
+    ('Ruth', 'Ru', 'Rt', 'Rut'),
+    ('1 Samuel', '1 Sam', '1 Sm', '1 S'),
+    ('2 Samuel', '2 Sam', '2 Sm', '2 S'),
+    ('1 Kings', '1 Kgs', '1 Kg', '1 Ki', '1 Reyes', '1 Re', '1 R'),
+    ('2 Kings', '2 Kgs', '2 Kg', '2 Ki', '2 Reyes', '2 Re', '2 R'),
+    ('1 Chronicles', '1 Chr', '1 Chron', '1 Crónicas', '1 Cr', '1 Cro'),
+    ('2 Chronicles', '2 Chr', '2 Chron', '2 Crónicas', '2 Cr', '2 Cro'),
+    ('Ezra', 'Ezr', 'Esdras', 'Esd'),
+    ('Nehemiah', 'Neh', 'Ne', 'Nehemías'),
+    ('Tobit', 'Tob', 'Tb', 'Tobías'),
+    ('Judith', 'Jdt', 'Judit'),
+    ('Esther', 'Esth', 'Est', 'Ester'),
+    ('1 Maccabees', '1 Macc', '1 Mac', '1 Mc', '1 Macabeos'),
+    ('2 Maccabees', '2 Macc', '2 Mac', '2 Mc', '2 Macabeos'),
+    ('Job', 'Jb'),
+    ('Psalms', 'Psalm', 'Ps', 'Pss', 'Psa', 'Salmos', 'Salmo', 'Sal', 'Sl'),
+    ('Proverbs', 'Prov', 'Prv', 'Pr', 'Proverbios'),
+    ('Ecclesiastes', 'Eccl', 'Eccles', 'Ecc', 'Qo', 'Qoheleth', 'Eclesiastés', 'Ecl'),
+    ('Song of Solomon', 'Song of Songs', 'Song', 'Sg', 'Canticle of Canticles',
+     'Cantar de los Cantares', 'Cantar', 'Cant', 'Ct'),
+    ('Wisdom', 'Wis', 'Ws', 'Sabiduría', 'Sab', 'Sb'),
+    ('Sirach', 'Sir', 'Ecclesiasticus', 'Eclesiástico', 'Eclo'),
+    ('Isaiah', 'Isa', 'Is', 'Isaías'),
+    ('Jeremiah', 'Jer', 'Jr', 'Jeremías'),
+    ('Lamentations', 'Lam', 'Lm', 'Lamentaciones'),
+    ('Baruch', 'Bar', 'Ba', 'Baruc'),
+    ('Ezekiel', 'Ezek', 'Ezk', 'Ez', 'Ezequiel'),
+    ('Daniel', 'Dan', 'Dn'),
+    ('Hosea', 'Hos', 'Os', 'Oseas'),
+    ('Joel', 'Jl'),
+    ('Amos', 'Am', 'Amós'),
+    ('Obadiah', 'Obad', 'Ob', 'Abdías', 'Abd'),
+    ('Jonah', 'Jon', 'Jonás'),
+    ('Micah', 'Mic', 'Mi', 'Miqueas', 'Miq'),
+    ('Nahum', 'Nah', 'Na', 'Nahún'),
+    ('Habakkuk', 'Hab', 'Hb', 'Habacuc'),
+    ('Zephaniah', 'Zeph', 'Zep', 'Sofonías', 'Sof'),
+    ('Haggai', 'Hag', 'Hg', 'Ageo', 'Ag'),
+    ('Zechariah', 'Zech', 'Zec', 'Zacarías', 'Zac', 'Za'),
+    ('Malachi', 'Mal', 'Ml', 'Malaquías'),
+    ('Matthew', 'Matt', 'Mt', 'Mateo'),
+    ('Mark', 'Mk', 'Mr', 'Marcos', 'Mc'),
+    ('Luke', 'Lk', 'Lucas', 'Lc'),
+    ('John', 'Jn', 'Joh', 'Juan'),
+    ('Acts', 'Act', 'Acts of the Apostles', 'Hechos', 'Hch', 'Hech'),
+    ('Romans', 'Rom', 'Rm', 'Ro', 'Romanos'),
+    ('1 Corinthians', '1 Cor', '1 Co', '1 Corintios'),
+    ('2 Corinthians', '2 Cor', '2 Co', '2 Corintios'),
+    ('Galatians', 'Gal', 'Ga', 'Gálatas'),
+    ('Ephesians', 'Eph', 'Ef', 'Efesios'),
+    ('Philippians', 'Phil', 'Php', 'Filipenses', 'Flp', 'Fil'),
+    ('Colossians', 'Col', 'Colosenses'),
+    ('1 Thessalonians', '1 Thess', '1 Thes', '1 Th', '1 Tesalonicenses', '1 Tes', '1 Ts'),
+    ('2 Thessalonians', '2 Thess', '2 Thes', '2 Th', '2 Tesalonicenses', '2 Tes', '2 Ts'),
+    ('1 Timothy', '1 Tim', '1 Tm', '1 Ti', '1 Timoteo'),
+    ('2 Timothy', '2 Tim', '2 Tm', '2 Ti', '2 Timoteo'),
+    ('Titus', 'Tit', 'Ti', 'Tt', 'Tito'),
+    ('Philemon', 'Phlm', 'Philem', 'Filemón', 'Flm'),
+    ('Hebrews', 'Heb', 'Hebreos', 'Hbr'),
+    ('James', 'Jas', 'Jm', 'Santiago', 'Sant', 'St', 'Stg'),
+    ('1 Peter', '1 Pet', '1 Pt', '1 Pe', '1 Pedro', '1 P'),
+    ('2 Peter', '2 Pet', '2 Pt', '2 Pe', '2 Pedro', '2 P'),
+    ('1 John', '1 Jn', '1 Jo', '1 Juan'),
+    ('2 John', '2 Jn', '2 Jo', '2 Juan'),
+    ('3 John', '3 Jn', '3 Jo', '3 Juan'),
+    ('Jude', 'Jud', 'Jd', 'Judas', 'Jds'),
+    ('Revelation', 'Rev', 'Rv', 'Apocalypse', 'Apocalipsis', 'Apoc', 'Ap'),
+)
+
+BOOK_NAMES = [names[0] for names in BOOKS]
+
+ROMAN_PREFIX_RE = re.compile(r'^(i{1,3})\s+(?=[a-z])')
+DIGIT_PREFIX_RE = re.compile(r'^([1-3])\s*(?=[a-z])')
+NAME_SPACE_RE = re.compile(r'[\s.]+')
+
+DASH_RE = re.compile(r'\s*[-–—‒]\s*')
+ALTERNATIVE_RE = re.compile(r'\s+(?:or|o)\s+', re.IGNORECASE)
+# "Mt 5, 1-12": Spanish style, comma between chapter and verse
+SPANISH_CHAPTER_RE = re.compile(r'^((?:[1-3]\s*)?[^\W\d][^\d:]*?\s*\d+)\s*,\s*(?=\d)')
+PIECE_RE = re.compile(
+    r'^(?P<book>(?:[1-3]\s*)?[^\W\d][^\d:-]*?)?\s*'
+    r'(?:(?P<c1>\d+)\s*[:.]\s*)?(?P<v1>\d+)(?P<l1>[a-z]*)'
+    r'(?:-(?:(?P<c2>\d+)\s*[:.]\s*)?(?P<v2>\d+)(?P<l2>[a-z]*))?\s*$',
+    re.IGNORECASE
+)
+
+
+def fold_name(name):
+    """'1Kgs.', '1 kgs' and 'I Kings'-style prefixes fold alike; accents are dropped."""
+    name = unicodedata.normalize('NFKD', name.casefold())
+    name = ''.join(c for c in name if not unicodedata.combining(c))
+    name = NAME_SPACE_RE.sub(' ', name).strip()
+    m = ROMAN_PREFIX_RE.match(name)
+    if m:
+        name = f'{len(m.group(1))} {name[m.end():]}'
+    return DIGIT_PREFIX_RE.sub(r'\1 ', name)
+
+
+_ALIASES = {}
+for _number, _names in enumerate(BOOKS, 1):
+    for _name in _names:
+        _ALIASES.setdefault(fold_name(_name), _number)
+
+
+def resolve_book(name):
+    """Book number (1-73) for any known name or abbreviation, or None."""
+    return _ALIASES.get(fold_name(name or ''))
+
+
+def book_name(book):
+    return BOOK_NAMES[book - 1]
+
+
+def verse_id(book, chapter, verse):
+    return book * BOOK_FACTOR + chapter * CHAPTER_FACTOR + verse
+
+
+def split_id(vid):
+    """(book, chapter, verse) of a verse id."""
+    book, rest = divmod(vid, BOOK_FACTOR)
+    chapter, verse = divmod(rest, CHAPTER_FACTOR)
+    return book, chapter, verse
+
+
+def book_of(vid):
+    return vid // BOOK_FACTOR
+
+
+def chapter_of(vid):
+    """Chapter id (book * 1000 + chapter), the key of a chapter's verses."""
+    return vid // CHAPTER_FACTOR
+
+
+def chapter_key(vid):
+    """Display key of a verse id's chapter, e.g. 'Mark 7'."""
+    book, chapter, _verse = split_id(vid)
+    return f'{book_name(book)} {chapter}'
+
+
+def format_range(start, end):
+    """'Mark 7:31-37', 'Mark 7:31-8:10' or 'Psalms 23'."""
+    book, chapter, verse = split_id(start)
+    _book, end_chapter, end_verse = split_id(end)
+    if verse == 1 and end_verse == CHAPTER_END:
+        if end_chapter == chapter:
+            return f'{book_name(book)} {chapter}'
+        return f'{book_name(book)} {chapter}-{end_chapter}'
+    text = f'{book_name(book)} {chapter}:{verse}'
+    if end_chapter != chapter:
+        return f'{text}-{end_chapter}:{end_verse}'
+    return text if end_verse == verse else f'{text}-{end_verse}'
+
+
+def parse(reference):
+    """
+    Every (start_id, end_id) range of a reference, in order. Handles
+    "Psalm 37:5-6, 30-31, 39-40", "Is 52:13—53:12", "1 Kgs 10:1-10",
+    "Mt 5, 1-12", whole chapters ("Ps 23") and "; 2:3" continuations.
+    Only the first of several alternatives ("... or ...") is kept.
+    Returns [] if no book can be resolved.
+    """
+    return [(start, end) for start, end, _first, _last in parse_parts(reference)]
+
+
+def parse_parts(reference):
+    """
+    parse() keeping verse letters: (start_id, end_id, start letter, end
+    letter) per range, '' where the reference names a whole verse
+    ("Ps 23:1-3a" -> (.., .., '', 'a')).
+    """
+    reference = ALTERNATIVE_RE.split(reference.strip(), 1)[0]
+    reference = DASH_RE.sub('-', reference)
+    if ':' not in reference:
+        reference = SPANISH_CHAPTER_RE.sub(r'\1:', reference, count=1)
+
+    ranges = []
+    book = chapter = None
+    for piece, separator in _pieces(reference):
+        m = PIECE_RE.match(piece)
+        if not m:
+            continue
+        if m.group('book'):
+            book = resolve_book(m.group('book'))
+            chapter = None
+        if book is None:
+            continue
+        c1, v1, c2, v2 = (int(g) if g else None for g in m.group('c1', 'v1', 'c2', 'v2'))
+        if max(n or 0 for n in (c1, v1, c2, v2)) >= CHAPTER_END:
+            continue
+        if c1 is None and (m.group('book') or separator == ';' or chapter is None):
+            # A bare number after the book (or after ';') is a chapter: "Ps 23", "Ps 23-24"
+            chapter = v2 or v1
+            start, end = verse_id(book, v1, 1), verse_id(book, v2 or v1, CHAPTER_END)
+        else:
+            if c1 is not None:
+                chapter = c1
+            end_chapter = c2 or chapter
+            start = verse_id(book, chapter, v1)
+            end = verse_id(book, end_chapter, v2 if v2 is not None else v1)
+            chapter = end_chapter
+        if start <= end and start % CHAPTER_FACTOR and chapter_of(start) % CHAPTER_FACTOR:
+            first, last = ((m.group(g) or '').lower() for g in ('l1', 'l2'))
+            ranges.append((start, end, first, last if v2 is not None else first))
+    return ranges
+
+
+def _pieces(reference):
+    """Split at ',' and ';', pairing each piece with the separator before it."""
+    separator = None
+    for part in re.split(r'([,;])', reference):
+        if part in (',', ';'):
+            separator = part
+            continue
+        if part.strip():
+            yield part.strip(), separator
+
+
+def verse_count(start, end, last_verse=None):
+    """
+    Number of verses in [start, end]. For ranges that run across
+    chapters (or to CHAPTER_END) each chapter's last verse comes from
+    `last_verse` ({chapter id: verse}) when known; otherwise a chapter is
+    taken to end at the last verse the range itself names in it.
+    """
+    if end < start:
+        return 0
+    lookup = last_verse or {}
+    first, last = chapter_of(start), chapter_of(end)
+    start_verse, end_verse = start % CHAPTER_FACTOR, end % CHAPTER_FACTOR
+    if end_verse == CHAPTER_END:
+        end_verse = max(lookup.get(last, 1), 1 if first != last else start_verse)
+    if first == last:
+        return end_verse - start_verse + 1
+    total = max(lookup.get(first, start_verse), start_verse) - start_verse + 1
+    for chapter in range(first + 1, last):
+        total += lookup.get(chapter, 1)
+    return total + end_verse
+
+
+def merge(ranges):
+    """Sort ranges and merge the ones that overlap or touch ("1-3a, 3b-4" -> 1-4)."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
@@ -0,0 +1,134 @@
+"""
+Unit tests for the parsing and encoding helpers under scripts/.
+
+Run from the repository root:
+  python3 -m unittest discover -s tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+import fathers_search  # noqa: E402
+import verse_ids  # noqa: E402
+from reading_store import reference_key  # noqa: E402
+from topics import KeywordMatcher  # noqa: E402
+
+JOHN_1 = verse_ids.verse_id(verse_ids.resolve_book('John'), 1, 0)
+
+
+class VerseIdsTest(unittest.TestCase):
+
+    def test_letter_parts_merge(self):
+        ranges = verse_ids.parse('John 1:1-3a, 3b-4')
+        self.assertEqual(ranges, [(JOHN_1 + 1, JOHN_1 + 3), (JOHN_1 + 3, JOHN_1 + 4)])
+        self.assertEqual(verse_ids.merge(ranges), [(JOHN_1 + 1, JOHN_1 + 4)])
+        self.assertEqual(verse_ids.parse_parts('John 1:1-3a, 3b-4'),
+                         [(JOHN_1 + 1, JOHN_1 + 3, '', 'a'), (JOHN_1 + 3, JOHN_1 + 4, 'b', '')])
+
+    def test_cross_chapter(self):
+        isaiah = verse_ids.resolve_book('Isaiah')
+        expected = [(verse_ids.verse_id(isaiah, 52, 13), verse_ids.verse_id(isaiah, 53, 12))]
+        self.assertEqual(verse_ids.parse('Isaiah 52:13—53:12'), expected)
+        self.assertEqual(verse_ids.parse('Isa 52:13-53:12'), expected)
+
+    def test_spanish_chapter_comma(self):
+        matthew_5 = verse_ids.verse_id(verse_ids.resolve_book('Mt'), 5, 0)
+        self.assertEqual(verse_ids.parse('Mt 5, 1-12'), [(matthew_5 + 1, matthew_5 + 12)])
+
+    def test_unparseable(self):
+        self.assertEqual(verse_ids.parse(''), [])
+        self.assertEqual(verse_ids.parse('Responsorial Psalm'), [])
+
+
+class ReferenceKeyTest(unittest.TestCase):
+
+    def test_letters_that_join_make_the_whole_verse(self):
+        self.assertEqual(reference_key('John 1:1-3a, 3b-4', 'gospel'),
+                         reference_key('John 1:1-4', 'gospel'))
+
+    def test_partial_verse_differs(self):
+        self.assertNotEqual(reference_key('John 1:1-3a', 'gospel'),
+                            reference_key('John 1:1-3', 'gospel'))
+
+    def test_kind_is_part_of_the_key(self):
+        self.assertNotEqual(reference_key('Isa 12:2-6', 'first_reading'),
+                            reference_key('Isa 12:2-6', 'gospel'))
+
+    def test_psalm_is_keyed_by_date(self):
+        self.assertEqual(reference_key('Ps 30:2, 4-6', 'psalm', '2026-02-09'), 'psalm:2026-02-09')
+        self.assertIsNone(reference_key('Ps 30:2, 4-6', 'psalm'))
+
+    def test_no_verses(self):
+        self.assertIsNone(reference_key('', 'gospel'))
+
+
+class KeywordMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = KeywordMatcher({'ai': 'ai', 'papa': 'papa', 'papa francisco': 'francis'})
+
+    def find(self, text):
+        return sorted(self.matcher.find(text))
+
+    def test_whole_words_only(self):
+        self.assertEqual(self.find('he said it'), [])
+        self.assertEqual(self.find('the ai model'), ['ai'])
+        self.assertEqual(self.find('ai'), ['ai'])
+        self.assertEqual(self.find('ai_lab'), [])
+
+    def test_overlapping_keywords(self):
+        self.assertEqual(self.find('el papa francisco dijo'), ['francis', 'papa'])
+        self.assertEqual(self.find('papas'), [])
+
+
+class VarintTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        values = [0, 1, 127, 128, 300, 16383, 16384, 2 ** 32]
+        data = bytearray()
+        for value in values:
+            fathers_search.encode_varint(value, data)
+        self.assertEqual(bytes(data[:5]), b'\x00\x01\x7f\x80\x01')
+        self.assertEqual(fathers_search.decode_varints(bytes(data)), values)
+
+    def test_postings(self):
+        # Entry 3 with positions {2, 9}, then entry 200 with position {0}
+        data = bytearray()
+        for delta, positions in ((3, [2, 7]), (197, [0])):
+            gaps = bytearray()
+            for gap in positions:
+                fathers_search.encode_varint(gap, gaps)
+            for value in (delta, len(positions), len(gaps)):
+                fathers_search.encode_varint(value, data)
+            data += gaps
+        data = bytes(data)
+        self.assertEqual(fathers_search.decode_postings(data), {3: 2, 200: 1})
+        located = fathers_search.decode_postings(data, positions=True)
+        self.assertEqual(fathers_search.decode_positions(data, *located[3][1:]), {2, 9})
+        self.assertEqual(fathers_search.decode_positions(data, *located[200][1:]), {0})
+
+
+class ParseQueryTest(unittest.TestCase):
+
+    def test_terms_and_phrases(self):
+        terms, phrases = fathers_search.parse_query('"reino de los cielos" Agustín')
+        self.assertEqual(terms, ['reino', 'cielos', 'agustin'])
+        self.assertEqual(phrases, [[(0, 'reino'), (3, 'cielos')]])
+
+    def test_stopwords_only(self):
+        with self.assertRaises(fathers_search.QueryError):
+            fathers_search.parse_query('de la')
+
+    def test_stopword_phrase(self):
+        with self.assertRaises(fathers_search.QueryError):
+            fathers_search.parse_query('pan "de la"')
+
+    def test_empty_query(self):
+        self.assertEqual(fathers_search.parse_query(''), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()